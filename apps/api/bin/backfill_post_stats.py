@@ -0,0 +1,19 @@
+import os
+import sys
+
+from sqlmodel import Session
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.database.engine import engine
+from src.modules.post.post_stats_methods import rebuild_post_stats
+
+
+def backfill_post_stats():
+    # Recompute every counter from the post and reaction tables; safe to rerun
+    with Session(engine) as session:
+        rebuilt = rebuild_post_stats(session)
+        print(f"Rebuilt stats for {rebuilt} posts.")
+
+
+if __name__ == "__main__":
+    backfill_post_stats()
@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+from loguru import logger
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.api.websocket.connection_manager import ConnectionManager
+
+
+class FakeWebSocket:
+    async def accept(self):
+        pass
+
+
+async def open_connection(manager, connection_id, user_id, event_ids):
+    await manager.connect(FakeWebSocket(), connection_id, user_id)
+    manager.subscribe_to_user(connection_id, user_id)
+    for event_id in event_ids:
+        manager.subscribe_to_event(connection_id, event_id)
+
+
+async def benchmark(connections: int, churn: int, users: int, events: int, seed: int):
+    # Simulate sockets without presence writes or logs, so only bookkeeping is timed
+    logger.remove()
+    rng = random.Random(seed)
+    manager = ConnectionManager()
+
+    def random_events():
+        return [f"event-{rng.randrange(events)}" for _ in range(3)]
+
+    started = time.perf_counter()
+    for i in range(connections):
+        await open_connection(
+            manager, f"conn-{i}", f"user-{rng.randrange(users)}", random_events()
+        )
+    connected = time.perf_counter() - started
+    print(f"Connected {connections} sockets in {connected:.2f}s")
+
+    # Replace random sockets one at a time, as during a rolling reconnect storm
+    live = [f"conn-{i}" for i in range(connections)]
+    started = time.perf_counter()
+    for i in range(churn):
+        slot = rng.randrange(len(live))
+        manager.disconnect(live[slot])
+        live[slot] = f"churn-{i}"
+        await open_connection(
+            manager, live[slot], f"user-{rng.randrange(users)}", random_events()
+        )
+    churned = time.perf_counter() - started
+    print(
+        f"Churned {churn} sockets in {churned:.2f}s "
+        f"({churn / churned:.0f} reconnects/s)"
+    )
+
+    started = time.perf_counter()
+    for i in range(churn):
+        manager.get_user_connections(f"user-{rng.randrange(users)}")
+    looked_up = time.perf_counter() - started
+    print(f"Looked up {churn} users in {looked_up:.2f}s")
+
+    started = time.perf_counter()
+    for connection_id in live:
+        manager.disconnect(connection_id)
+    drained = time.perf_counter() - started
+    print(f"Disconnected {connections} sockets in {drained:.2f}s")
+    assert not manager.user_subscriptions and not manager.event_subscriptions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time ConnectionManager bookkeeping under connection churn."
+    )
+    parser.add_argument("--connections", type=int, default=50000)
+    parser.add_argument("--churn", type=int, default=50000)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(
+        benchmark(args.connections, args.churn, args.users, args.events, args.seed)
+    )
@@ -7,6 +7,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.database.engine import engine
 from src.database.models import Media, Post, PostType, Reaction, Role, User
 from src.modules.auth.auth_methods import hash_password
+from src.modules.post.post_stats_methods import rebuild_post_stats
 
 
 def create_users_and_posts():
@@ -449,6 +450,7 @@ def create_users_and_posts():
             session.add(reaction)
 
         session.commit()
+        rebuild_post_stats(session)
         print("Seeded users, posts, comments, and reactions from dummy data.")
 
 
@@ -1,56 +1,108 @@
+from typing import Optional
+
 import jwt
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import joinedload
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.core.settings import settings
+from src.database.engine import get_async_session
 from src.database.engine import get_session as get_db
 from src.database.models import Role, User, UserSettings, UserSocial
-from src.modules.user.user_methods import get_user_by_username
+from src.modules.user.user_methods import get_user_by_username, get_user_principal
 
 from .serializer import UserResponse
 
 router = APIRouter()
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
-    """Get current user from JWT token."""
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def authenticate_token(db: Session, token: str) -> User:
+    """Resolve a JWT into the active user it was issued to.
+
+    Tokens carry the user ID, so the user is looked up by primary key through
+    the principal cache instead of by username on every request. Tokens issued
+    before the ID claim existed fall back to the username lookup.
+    """
     try:
         payload = jwt.decode(
-            credentials.credentials,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
+            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
     except jwt.PyJWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _unauthorized("Could not validate credentials")
 
-    user = get_user_by_username(db, username)
+    user_id: Optional[str] = payload.get("uid")
+    username: Optional[str] = payload.get("sub")
+    if user_id is None and username is None:
+        raise _unauthorized("Could not validate credentials")
+    if payload.get("active") is False:
+        raise _unauthorized("Inactive user")
+
+    if user_id is not None:
+        user = get_user_principal(db, user_id)
+    else:
+        user = get_user_by_username(db, username)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _unauthorized("User not found")
+    if not user.is_active:
+        raise _unauthorized("Inactive user")
     return user
 
 
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> User:
+    """Get current user from JWT token."""
+    return authenticate_token(db, credentials.credentials)
+
+
+def get_current_user_optional(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: Session = Depends(get_db),
+) -> Optional[User]:
+    """Get current user from JWT token if provided, otherwise return None."""
+    if not credentials:
+        return None
+    try:
+        return authenticate_token(db, credentials.credentials)
+    except HTTPException:
+        return None
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    session: AsyncSession = Depends(get_async_session),
+) -> User:
+    """Get current user from JWT token for async endpoints."""
+    return await session.run_sync(authenticate_token, credentials.credentials)
+
+
+async def get_current_user_optional_async(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    session: AsyncSession = Depends(get_async_session),
+) -> Optional[User]:
+    """Get current user from JWT token if provided for async endpoints."""
+    if not credentials:
+        return None
+    try:
+        return await session.run_sync(authenticate_token, credentials.credentials)
+    except HTTPException:
+        return None
+
+
 def get_current_admin(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -8,7 +8,7 @@ from src.database.engine import get_session as get_db
 from src.database.models import Role, User
 from src.modules.appsettings import appsettings_methods
 from src.modules.auth.auth_methods import (
-    create_access_token,
+    create_user_access_token,
     login_user,
     register_user,
     reset_password,
@@ -175,12 +175,7 @@ async def github_callback(
                 detail="Your account has been banned. Please contact support.",
             )
 
-        from datetime import timedelta
-
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user.username}, expires_delta=access_token_expires
-        )
+        access_token = create_user_access_token(user)
 
         return GitHubLoginResponse(
             access_token=access_token,
@@ -248,12 +243,7 @@ async def google_callback(
                 detail="Your account has been banned. Please contact support.",
             )
 
-        from datetime import timedelta
-
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user.username}, expires_delta=access_token_expires
-        )
+        access_token = create_user_access_token(user)
 
         return GoogleLoginResponse(
             access_token=access_token,
@@ -1,13 +1,18 @@
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.api.account.api import get_current_user
+from src.api.account.api import (
+    get_current_user,
+    get_current_user_optional,
+    get_current_user_optional_async,
+)
 from src.api.resources.serializer import ResourceResponse
 from src.database.engine import get_session as get_db
 from src.database.models import User
+from src.database.routing import get_async_read_session
 from src.modules.channels.channels_methods import (
     create_channel,
     delete_channel,
@@ -23,36 +28,6 @@ from src.modules.resources.resources_methods import (
 from .serializer import ChannelCreate, ChannelResponse, ChannelUpdate
 
 router = APIRouter()
-security = HTTPBearer(auto_error=False)
-
-
-def get_current_user_optional(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db),
-) -> Optional[User]:
-    """Get current user from JWT token if provided, otherwise return None."""
-    if not credentials:
-        return None
-
-    try:
-        import jwt
-
-        from src.core.settings import settings
-        from src.modules.user.user_methods import get_user_by_username
-
-        payload = jwt.decode(
-            credentials.credentials,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-        )
-        username: str = payload.get("sub")
-        if username is None:
-            return None
-
-        user = get_user_by_username(db, username)
-        return user
-    except Exception:
-        return None
 
 
 @router.post("/channels/", response_model=ChannelResponse)
@@ -90,14 +65,14 @@ def get_channel_endpoint(
 
 
 @router.get("/channels/", response_model=List[ChannelResponse])
-def get_all_channels_endpoint(
+async def get_all_channels_endpoint(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_current_user_optional),
+    session: AsyncSession = Depends(get_async_read_session),
+    current_user: Optional[User] = Depends(get_current_user_optional_async),
 ):
     user_id = current_user.id if current_user else None
-    return get_all_channels(db, skip, limit, user_id)
+    return await session.run_sync(get_all_channels, skip, limit, user_id)
 
 
 @router.put("/channels/{channel_id}", response_model=ChannelResponse)
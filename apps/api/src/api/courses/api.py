@@ -108,9 +108,10 @@ def update_course_endpoint(
 
 @router.delete("/courses/{course_id}")
 def delete_course_endpoint(course_id: str, db: Session = Depends(get_db)):
-    if not delete_course(db, course_id):
+    deleted = delete_course(db, course_id)
+    if not deleted:
         raise HTTPException(status_code=404, detail="Course not found")
-    return {"message": "Course deleted"}
+    return {"message": "Course deleted", "deleted": deleted}
 
 
 # Section endpoints
@@ -1,48 +1,42 @@
-from fastapi import APIRouter, Depends, Query
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.database.engine import get_session as get_db
+from src.database.engine import get_async_session
 from src.database.models import UrlPreview
-from src.modules.extras.extras_methods import fetch_url_metadata
+from src.modules.extras import extras_methods
 
 from .serializer import UrlPreviewResponse
 
 router = APIRouter()
 
 
-@router.get("/url-preview", response_model=UrlPreviewResponse)
-def get_url_preview(
-    url: str = Query(..., description="URL to preview"), db: Session = Depends(get_db)
-):
-    # Check if already cached
-    preview = db.exec(select(UrlPreview).where(UrlPreview.url == url)).first()
-    if preview:
-        return UrlPreviewResponse(
-            url=preview.url,
-            title=preview.title,
-            description=preview.description,
-            image_url=preview.image_url,
-            created_at=preview.created_at,
-        )
-
-    # Fetch new metadata
-    metadata = fetch_url_metadata(url)
-
-    # Save to DB
-    new_preview = UrlPreview(
-        url=url,
-        title=metadata["title"],
-        description=metadata["description"],
-        image_url=metadata["image_url"],
-    )
-    db.add(new_preview)
-    db.commit()
-    db.refresh(new_preview)
-
+def to_response(preview: UrlPreview) -> UrlPreviewResponse:
     return UrlPreviewResponse(
-        url=new_preview.url,
-        title=new_preview.title,
-        description=new_preview.description,
-        image_url=new_preview.image_url,
-        created_at=new_preview.created_at,
+        url=preview.url,
+        title=preview.title,
+        description=preview.description,
+        image_url=preview.image_url,
+        created_at=preview.created_at,
     )
+
+
+@router.get("/url-preview", response_model=UrlPreviewResponse)
+async def get_url_preview(
+    url: str = Query(..., description="URL to preview"),
+    session: AsyncSession = Depends(get_async_session),
+):
+    # Serve the stored preview until its TTL runs out
+    preview = await session.run_sync(extras_methods.get_url_preview, url)
+    if preview and extras_methods.is_url_preview_fresh(preview):
+        return to_response(preview)
+
+    try:
+        metadata = await extras_methods.get_url_metadata(url)
+    except HTTPException:
+        # Keep serving an outdated preview while its site is failing
+        if preview:
+            return to_response(preview)
+        raise
+
+    preview = await session.run_sync(extras_methods.save_url_preview, url, metadata)
+    return to_response(preview)
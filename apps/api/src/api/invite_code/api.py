@@ -1,11 +1,13 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlmodel import Session
 
+from src.core.pagination import set_next_cursor
 from src.database.engine import get_session as get_db
 from src.database.models import InviteCodeStatus
 from src.modules.invite_code.invite_code_methods import (
+    INVITE_CODE_KEYSET,
     auto_join_user_to_channel,
     create_invite_code,
     deactivate_invite_code,
@@ -60,14 +62,21 @@ def get_invite_code_endpoint(invite_code_id: str, db: Session = Depends(get_db))
 
 @router.get("/invite-codes/", response_model=List[InviteCodeResponse])
 def get_all_invite_codes_endpoint(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     status: Optional[InviteCodeStatus] = None,
     created_by: Optional[str] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
     """Get all invite codes with optional filtering."""
-    return get_all_invite_codes(db, skip, limit, status, created_by)
+    try:
+        invite_codes = get_all_invite_codes(db, skip, limit, status, created_by, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, invite_codes, limit, INVITE_CODE_KEYSET)
+    return invite_codes
 
 
 @router.get(
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends
+
+from src.api.account.api import get_current_admin
+from src.api.websocket.connection_manager import manager
+from src.database.engine import async_engine, engine, replica_engines
+from src.database.models import User
+from src.database.pool import get_pool_stats
+
+router = APIRouter()
+
+
+@router.get("/metrics/database-pool")
+def get_database_pool_metrics(current_admin: User = Depends(get_current_admin)):
+    """Get connection pool usage and checkout wait times of this process."""
+    return {
+        "engine": get_pool_stats(engine),
+        "async_engine": get_pool_stats(async_engine.sync_engine),
+        "replicas": [get_pool_stats(replica) for replica in replica_engines],
+    }
+
+
+@router.get("/metrics/realtime")
+def get_realtime_metrics(current_admin: User = Depends(get_current_admin)):
+    """Get the WebSocket backplane queues and counters of this process."""
+    return {
+        "connections": len(manager.active_connections),
+        "dropped_messages": manager.dropped_messages,
+        "evicted_connections": manager.evicted_connections,
+        "backplane": manager.backplane.stats() if manager.backplane else None,
+        "presence_writer": (
+            manager.presence_writer.stats() if manager.presence_writer else None
+        ),
+        "presence_monitor": (
+            manager.presence_monitor.stats() if manager.presence_monitor else None
+        ),
+    }
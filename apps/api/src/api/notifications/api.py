@@ -1,30 +1,53 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.api.account.api import get_current_user
+from src.api.account.api import get_current_user, get_current_user_async
+from src.core.pagination import set_next_cursor
 from src.database.engine import get_session
 from src.database.models import User
+from src.database.routing import get_async_read_session
 from src.modules.notifications.notifications_methods import (
+    NOTIFICATION_KEYSET,
+    get_notification,
     get_notifications_by_user,
+    get_unread_notification_count,
+    mark_all_notifications_as_read,
     mark_notification_as_read,
 )
 
-from .serializer import NotificationResponse
+from .serializer import MarkAllReadResponse, NotificationResponse, UnreadCountResponse
 
 router = APIRouter()
 
 
 @router.get("/notifications", response_model=List[NotificationResponse])
-def get_notifications_endpoint(
+async def get_notifications_endpoint(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_read_session),
+    current_user: User = Depends(get_current_user_async),
 ):
     """Get all notifications for the current user."""
-    return get_notifications_by_user(db, current_user.id, skip, limit)
+
+    def load(db: Session) -> List[NotificationResponse]:
+        try:
+            notifications = get_notifications_by_user(
+                db, current_user.id, skip, limit, cursor
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        set_next_cursor(response, notifications, limit, NOTIFICATION_KEYSET)
+        return [
+            NotificationResponse.model_validate(notification)
+            for notification in notifications
+        ]
+
+    return await session.run_sync(load)
 
 
 @router.post(
@@ -36,7 +59,7 @@ def mark_notification_as_read_endpoint(
     current_user: User = Depends(get_current_user),
 ):
     """Mark a notification as read."""
-    notification = mark_notification_as_read(db, notification_id)
+    notification = get_notification(db, notification_id)
 
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
@@ -46,4 +69,29 @@ def mark_notification_as_read_endpoint(
             status_code=403, detail="Not authorized to mark this notification as read"
         )
 
-    return notification
+    return mark_notification_as_read(db, notification_id)
+
+
+@router.get("/notifications/unread-count", response_model=UnreadCountResponse)
+async def get_unread_count_endpoint(
+    session: AsyncSession = Depends(get_async_read_session),
+    current_user: User = Depends(get_current_user_async),
+):
+    """Get the number of unread notifications of the current user."""
+    unread_count = await session.run_sync(
+        get_unread_notification_count, current_user.id
+    )
+    return UnreadCountResponse(unread_count=unread_count)
+
+
+@router.post("/notifications/read-all", response_model=MarkAllReadResponse)
+def mark_all_notifications_as_read_endpoint(
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Mark every notification of the current user as read."""
+    marked_count = mark_all_notifications_as_read(db, current_user.id)
+    return MarkAllReadResponse(
+        marked_count=marked_count,
+        unread_count=get_unread_notification_count(db, current_user.id),
+    )
@@ -1,86 +1,58 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+)
 from loguru import logger
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.api.account.api import get_current_user
-from src.api.post.serializer import PostResponse
+from src.api.account.api import (
+    get_current_user,
+    get_current_user_optional,
+    get_current_user_optional_async,
+)
+from src.api.post.serializer import PostResponse, ReplyTreeResponse
+from src.core.pagination import set_next_cursor
 from src.database.engine import get_session
 from src.database.models import User
-from src.modules.notifications.notification_tasks import create_notification_task
+from src.database.routing import get_async_read_session
+from src.modules.notifications.notification_tasks import (
+    create_mention_notifications_task,
+)
+from src.modules.post.post_feed import build_post_responses
 from src.modules.post.post_methods import (
+    POST_FEED_KEYSET,
     create_post,
     delete_post,
-    get_all_nested_posts_by_parent_id,
+    flatten_reply_tree,
     get_all_posts,
-    get_comment_summary,
+    get_all_replies,
     get_post,
     get_posts_by_channel_slug,
     get_posts_by_type,
     get_posts_by_user,
-    get_reactions_summary,
+    get_reply_tree,
     update_post,
 )
 from src.modules.post.post_utils import extract_mention
-from src.modules.user.user_methods import get_user_by_username
+from src.modules.realtime.realtime_methods import publish_comment_created
 
 from .serializer import PostCreate, PostUpdate
 
 router = APIRouter()
-security = HTTPBearer(auto_error=False)
-
-
-def get_current_user_optional(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_session),
-) -> Optional[User]:
-    """Get current user from JWT token if provided, otherwise return None."""
-    if not credentials:
-        return None
-
-    try:
-        import jwt
-
-        from src.core.settings import settings
-        from src.modules.user.user_methods import get_user_by_username
-
-        payload = jwt.decode(
-            credentials.credentials,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-        )
-        username: str = payload.get("sub")
-        if username is None:
-            return None
-
-        user = get_user_by_username(db, username)
-        return user
-    except Exception:
-        return None
 
 
 def build_post_response_data(post, current_user_id: Optional[str], db: Session) -> dict:
     """Helper function to build post response data with relationships and reactions."""
-    return {
-        "id": post.id,
-        "content": post.content,
-        "type": post.type,
-        "user_id": post.user_id,
-        "channel_id": post.channel_id,
-        "parent_id": post.parent_id,
-        "is_pinned": post.is_pinned,
-        "user": post.user,
-        "channel": post.channel,
-        "medias": post.medias,
-        "created_at": post.created_at,
-        "updated_at": post.updated_at,
-        "comment_count": post.comment_count,
-        "reaction_count": post.reaction_count,
-        "reactions": get_reactions_summary(db, post.id, current_user_id),
-        "comment_summary": get_comment_summary(db, post.id, current_user_id),
-    }
+    return build_post_responses(db, [post], current_user_id)[0]
 
 
 @router.post("/posts/", response_model=PostResponse)
@@ -107,35 +79,28 @@ def create_post_endpoint(
 
     created_post = create_post(db, post_data)
 
-    # Calculate original_post_id for notification
-    original_post_id = None
-    if post_data.get("parent_id"):
-        # Walk up the parent chain to find the original post
-        current_parent = get_post(db, post_data["parent_id"])
-        while current_parent and current_parent.parent_id:
-            current_parent = get_post(db, current_parent.parent_id)
-        original_post_id = (
-            current_parent.id if current_parent else post_data["parent_id"]
-        )
+    # Let clients watching the thread know a reply arrived
+    if created_post.parent_id:
+        publish_comment_created(created_post)
+
+    # The thread root is the original post a reply notification links to
+    original_post_id = created_post.root_id if created_post.parent_id else None
 
     # Extract mentions and create notifications
     if post_data.get("content"):
         mentions = extract_mention(post_data["content"])
         logger.info(mentions)
         if mentions:
-            for username in mentions:
-                mentioned_user = get_user_by_username(db, username)
-                if mentioned_user:
-                    create_notification_task.delay(
-                        recipient_id=mentioned_user.id,
-                        sender_id=current_user.id,
-                        notification_type="mention",
-                        data={
-                            "post_id": created_post.id,
-                            "content": post_data["content"],
-                            "original_post_id": original_post_id,
-                        },
-                    )
+            # One task resolves and notifies every mentioned user at once
+            create_mention_notifications_task.delay(
+                sender_id=current_user.id,
+                usernames=mentions,
+                data={
+                    "post_id": created_post.id,
+                    "content": post_data["content"],
+                    "original_post_id": original_post_id,
+                },
+            )
 
     # Get the full post with relationships
     full_post = get_post(db, created_post.id)
@@ -170,34 +135,27 @@ def create_post_with_files_endpoint(
 
     created_post = create_post(db, post_data, files)
 
-    # Calculate original_post_id for notification
-    original_post_id = None
-    if post_data.get("parent_id"):
-        # Walk up the parent chain to find the original post
-        current_parent = get_post(db, post_data["parent_id"])
-        while current_parent and current_parent.parent_id:
-            current_parent = get_post(db, current_parent.parent_id)
-        original_post_id = (
-            current_parent.id if current_parent else post_data["parent_id"]
-        )
+    # Let clients watching the thread know a reply arrived
+    if created_post.parent_id:
+        publish_comment_created(created_post)
+
+    # The thread root is the original post a reply notification links to
+    original_post_id = created_post.root_id if created_post.parent_id else None
 
     # Extract mentions and create notifications
     if post_data.get("content"):
         mentions = extract_mention(post_data["content"])
         if mentions:
-            for username in mentions:
-                mentioned_user = get_user_by_username(db, username)
-                if mentioned_user:
-                    create_notification_task.delay(
-                        recipient_id=mentioned_user.id,
-                        sender_id=current_user.id,
-                        notification_type="mention",
-                        data={
-                            "post_id": created_post.id,
-                            "content": post_data["content"],
-                            "original_post_id": original_post_id,
-                        },
-                    )
+            # One task resolves and notifies every mentioned user at once
+            create_mention_notifications_task.delay(
+                sender_id=current_user.id,
+                usernames=mentions,
+                data={
+                    "post_id": created_post.id,
+                    "content": post_data["content"],
+                    "original_post_id": original_post_id,
+                },
+            )
 
     # Get the full post with relationships
     full_post = get_post(db, created_post.id)
@@ -206,75 +164,147 @@ def create_post_with_files_endpoint(
 
 
 @router.get("/posts/{post_id}", response_model=PostResponse)
-def get_post_endpoint(
+async def get_post_endpoint(
     post_id: str,
-    db: Session = Depends(get_session),
-    current_user: Optional[User] = Depends(get_current_user_optional),
+    session: AsyncSession = Depends(get_async_read_session),
+    current_user: Optional[User] = Depends(get_current_user_optional_async),
 ):
-    post = get_post(db, post_id)
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
-
-    # Check channel access if post is in a channel
-    if post.channel_id:
-        from src.modules.channels.channels_methods import get_channel, is_member
+    def load(db: Session) -> PostResponse:
+        post = get_post(db, post_id)
+        if not post:
+            raise HTTPException(status_code=404, detail="Post not found")
+
+        # Check channel access if post is in a channel
+        if post.channel_id:
+            from src.modules.channels.channels_methods import get_channel, is_member
+
+            channel = get_channel(db, post.channel_id)
+            if channel and channel.type == "private":
+                if not current_user or not is_member(db, channel.id, current_user.id):
+                    raise HTTPException(
+                        status_code=403, detail="Access denied to private channel post"
+                    )
 
-        channel = get_channel(db, post.channel_id)
-        if channel and channel.type == "private":
-            if not current_user or not is_member(db, channel.id, current_user.id):
-                raise HTTPException(
-                    status_code=403, detail="Access denied to private channel post"
-                )
+        current_user_id = current_user.id if current_user else None
+        post_response_data = build_post_response_data(post, current_user_id, db)
+        return PostResponse(**post_response_data)
 
-    current_user_id = current_user.id if current_user else None
-    post_response_data = build_post_response_data(post, current_user_id, db)
-    return PostResponse(**post_response_data)
+    return await session.run_sync(load)
 
 
 # TODO : This is shitty
 # Need to rework on this endpoint
 @router.get("/posts/", response_model=List[PostResponse])
-def get_all_posts_endpoint(
+async def get_all_posts_endpoint(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     user_id: Optional[str] = None,
     post_type: Optional[str] = None,
     parent_id: Optional[str] = None,
     channel_slug: Optional[str] = None,
-    db: Session = Depends(get_session),
-    current_user: Optional[User] = Depends(get_current_user_optional),
+    session: AsyncSession = Depends(get_async_read_session),
+    current_user: Optional[User] = Depends(get_current_user_optional_async),
 ):
-    # Check channel access if filtering by channel
-    if channel_slug:
-        from src.modules.channels.channels_methods import get_channel_by_slug, is_member
+    def load(db: Session) -> List[PostResponse]:
+        # Check channel access if filtering by channel
+        if channel_slug:
+            from src.modules.channels.channels_methods import (
+                get_channel_by_slug,
+                is_member,
+            )
+
+            channel = get_channel_by_slug(db, channel_slug)
+            if not channel:
+                raise HTTPException(status_code=404, detail="Channel not found")
+
+            if channel.type == "private":
+                if not current_user or not is_member(db, channel.id, current_user.id):
+                    raise HTTPException(
+                        status_code=403, detail="Access denied to private channel"
+                    )
 
-        channel = get_channel_by_slug(db, channel_slug)
-        if not channel:
-            raise HTTPException(status_code=404, detail="Channel not found")
+        current_user_id = current_user.id if current_user else None
+
+        if user_id:
+            posts = get_posts_by_user(db, user_id, current_user_id)
+        elif post_type:
+            posts = get_posts_by_type(db, post_type, current_user_id)
+        elif parent_id:
+            # The whole thread, as clients render it; /posts/{id}/replies pages it
+            posts = get_all_replies(db, parent_id, current_user_id)
+        elif channel_slug:
+            posts = get_posts_by_channel_slug(db, channel_slug)
+        else:
+            try:
+                posts = get_all_posts(db, skip, limit, current_user_id, cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            set_next_cursor(response, posts, limit, POST_FEED_KEYSET)
+        return [
+            PostResponse(**post_response_data)
+            for post_response_data in build_post_responses(db, posts, current_user_id)
+        ]
+
+    return await session.run_sync(load)
+
+
+@router.get("/posts/{post_id}/replies", response_model=List[ReplyTreeResponse])
+async def get_post_replies_endpoint(
+    post_id: str,
+    response: Response,
+    limit: int = Query(default=20, ge=1, le=100),
+    depth: int = Query(default=3, ge=1, le=5),
+    replies_limit: int = Query(default=5, ge=1, le=20),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_read_session),
+    current_user: Optional[User] = Depends(get_current_user_optional_async),
+):
+    def load(db: Session) -> List[ReplyTreeResponse]:
+        post = get_post(db, post_id)
+        if not post:
+            raise HTTPException(status_code=404, detail="Post not found")
+
+        # Check channel access if post is in a channel
+        if post.channel_id:
+            from src.modules.channels.channels_methods import get_channel, is_member
+
+            channel = get_channel(db, post.channel_id)
+            if channel and channel.type == "private":
+                if not current_user or not is_member(db, channel.id, current_user.id):
+                    raise HTTPException(
+                        status_code=403, detail="Access denied to private channel post"
+                    )
 
-        if channel.type == "private":
-            if not current_user or not is_member(db, channel.id, current_user.id):
-                raise HTTPException(
-                    status_code=403, detail="Access denied to private channel"
-                )
+        current_user_id = current_user.id if current_user else None
+        try:
+            replies = get_reply_tree(
+                db, post_id, current_user_id, limit, depth, replies_limit, cursor
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        set_next_cursor(
+            response, [node["post"] for node in replies], limit, POST_FEED_KEYSET
+        )
 
-    current_user_id = current_user.id if current_user else None
-
-    if user_id:
-        posts = get_posts_by_user(db, user_id, current_user_id)
-    elif post_type:
-        posts = get_posts_by_type(db, post_type, current_user_id)
-    elif parent_id:
-        posts = get_all_nested_posts_by_parent_id(db, parent_id, current_user_id)
-    elif channel_slug:
-        posts = get_posts_by_channel_slug(db, channel_slug)
-    else:
-        posts = get_all_posts(db, skip, limit, current_user_id)
-    response_posts = []
-    for post in posts:
-        post_response_data = build_post_response_data(post, current_user_id, db)
-        response_posts.append(PostResponse(**post_response_data))
-    return response_posts
+        posts = flatten_reply_tree(replies)
+        response_data = {
+            data["id"]: data
+            for data in build_post_responses(db, posts, current_user_id)
+        }
+
+        def build_node(node: dict) -> ReplyTreeResponse:
+            return ReplyTreeResponse(
+                **response_data[node["post"].id],
+                replies=[build_node(reply) for reply in node["replies"]],
+                has_more_replies=node["has_more_replies"],
+                replies_cursor=node["replies_cursor"],
+            )
+
+        return [build_node(node) for node in replies]
+
+    return await session.run_sync(load)
 
 
 @router.put("/posts/{post_id}", response_model=PostResponse)
@@ -301,7 +331,10 @@ def update_post_endpoint(
                 )
 
     update_data = {k: v for k, v in post.model_dump().items() if v is not None}
-    updated_post = update_post(db, post_id, update_data)
+    try:
+        updated_post = update_post(db, post_id, update_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not updated_post:
         raise HTTPException(status_code=404, detail="Post not found")
 
@@ -332,6 +365,7 @@ def delete_post_endpoint(
                     status_code=403, detail="Access denied to private channel post"
                 )
 
-    if not delete_post(db, post_id):
+    deleted = delete_post(db, post_id)
+    if not deleted:
         raise HTTPException(status_code=404, detail="Post not found")
-    return {"message": "Post deleted"}
+    return {"message": "Post deleted", "deleted": deleted}
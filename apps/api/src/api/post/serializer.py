@@ -33,6 +33,8 @@ class PostResponse(BaseModel):
     channel_id: Optional[str] = None
     is_pinned: bool = False
     parent_id: Optional[str] = None
+    root_id: Optional[str] = None
+    depth: int = 0
     user: UserResponse
     channel: Optional[ChannelResponse] = None
     medias: List[MediaResponse] = []
@@ -45,3 +47,9 @@ class PostResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ReplyTreeResponse(PostResponse):
+    replies: List["ReplyTreeResponse"] = []
+    has_more_replies: bool = False
+    replies_cursor: Optional[str] = None
@@ -1,52 +1,46 @@
 from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, Depends, Query
-from sqlmodel import Session, desc, func, select
+from sqlmodel import Session, desc, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from src.api.websocket.connection_manager import manager
+from src.core.settings import settings
 from src.database.engine import get_session
-from src.database.models import User, UserPresence
+from src.database.models import UserPresence
+from src.database.routing import get_async_read_session
+from src.modules.presence.presence_methods import (
+    close_stale_presences,
+    get_presence_series,
+    get_presence_totals,
+)
+from src.modules.user.user_methods import get_users_by_ids
 
 router = APIRouter()
 
 
+async def get_online_sessions() -> list[dict]:
+    """Live sessions tracked in memory by heartbeats, shared through Redis if set."""
+    if manager.presence_monitor:
+        return await manager.presence_monitor.online_sessions()
+    return manager.get_online_sessions()
+
+
 @router.get("/stats")
 async def get_presence_stats(
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_read_session),
 ):
     """
-    Get overall presence statistics (filters out stale connections)
+    Get overall presence statistics (active sessions come from heartbeats)
     """
-    # Filter for recent activity to avoid counting stale connections
-    stale_cutoff = datetime.now(timezone.utc) - timedelta(minutes=30)
-
-    # Total sessions
-    total_sessions = session.exec(select(func.count(UserPresence.id))).one()
-
-    # Active sessions (not disconnected yet and not stale)
-    active_sessions = session.exec(
-        select(func.count(UserPresence.id)).where(
-            UserPresence.disconnected_at.is_(None),  # type: ignore - Fine, ty issue.
-            UserPresence.updated_at >= stale_cutoff,
-        )
-    ).one()
-
-    # Average session duration
-    avg_duration = session.exec(
-        select(func.avg(UserPresence.duration_seconds)).where(
-            UserPresence.duration_seconds.is_not(None),  # type: ignore - Fine, ty issue.
-        )
-    ).one()
-
-    # Total unique users
-    unique_users = session.exec(
-        select(func.count(func.distinct(UserPresence.user_id)))
-    ).one()
+    active_sessions = len(await get_online_sessions())
+    totals = await session.run_sync(get_presence_totals)
 
     return {
-        "total_sessions": total_sessions,
+        "total_sessions": totals["total_sessions"],
         "active_sessions": active_sessions,
-        "average_duration_seconds": round(avg_duration, 2) if avg_duration else 0,
-        "unique_users": unique_users,
+        "average_duration_seconds": totals["average_duration_seconds"],
+        "unique_users": totals["unique_users"],
     }
 
 
@@ -83,6 +77,12 @@ async def get_user_presence(
     }
 
 
+def parse_utc(value: str) -> datetime:
+    """Parse an ISO datetime, reading values without an offset as UTC."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
 @router.get("/timeseries")
 async def get_presence_timeseries(
     start_date: str = Query(..., description="Start date in ISO format"),
@@ -90,82 +90,24 @@ async def get_presence_timeseries(
     interval: str = Query(
         default="hour", description="Aggregation interval: hour, day, week"
     ),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_read_session),
 ):
     """
     Get presence data aggregated by time intervals for visualization
     """
-    # Parse dates
-    start = datetime.fromisoformat(start_date.replace("Z", "+00:00"))
-    end = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
-
-    # Query all presence records in the date range
-    statement = select(UserPresence).where(
-        UserPresence.connected_at >= start.isoformat(),
-        UserPresence.connected_at <= end.isoformat(),
+    # Read from the hourly and daily rollups, refreshed by the compaction task
+    data = await session.run_sync(
+        get_presence_series,
+        interval if interval in ("hour", "day", "week") else "hour",
+        parse_utc(start_date),
+        parse_utc(end_date),
     )
-    presences = session.exec(statement).all()
-
-    # Aggregate by interval
-    timeseries_data = {}
-
-    for presence in presences:
-        connected_at = datetime.fromisoformat(
-            presence.connected_at.replace("Z", "+00:00")
-        )
-
-        # Determine bucket based on interval
-        if interval == "hour":
-            bucket = connected_at.replace(minute=0, second=0, microsecond=0)
-        elif interval == "day":
-            bucket = connected_at.replace(hour=0, minute=0, second=0, microsecond=0)
-        elif interval == "week":
-            # Start of week (Monday)
-            days_since_monday = connected_at.weekday()
-            bucket = (connected_at - timedelta(days=days_since_monday)).replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )
-        else:
-            bucket = connected_at.replace(minute=0, second=0, microsecond=0)
-
-        bucket_key = bucket.isoformat()
-
-        if bucket_key not in timeseries_data:
-            timeseries_data[bucket_key] = {
-                "timestamp": bucket_key,
-                "session_count": 0,
-                "unique_users": set(),
-                "total_duration": 0,
-            }
-
-        timeseries_data[bucket_key]["session_count"] += 1
-        timeseries_data[bucket_key]["unique_users"].add(presence.user_id)
-        if presence.duration_seconds:
-            timeseries_data[bucket_key]["total_duration"] += presence.duration_seconds
-
-    # Convert to list and format
-    result = []
-    for bucket_key in sorted(timeseries_data.keys()):
-        data = timeseries_data[bucket_key]
-        result.append(
-            {
-                "timestamp": data["timestamp"],
-                "session_count": data["session_count"],
-                "unique_users": len(data["unique_users"]),
-                "total_duration_seconds": round(data["total_duration"], 2),
-                "average_duration_seconds": (
-                    round(data["total_duration"] / data["session_count"], 2)
-                    if data["session_count"] > 0
-                    else 0
-                ),
-            }
-        )
 
     return {
         "start_date": start_date,
         "end_date": end_date,
         "interval": interval,
-        "data": result,
+        "data": data,
     }
 
 
@@ -174,31 +116,17 @@ async def cleanup_stale_presence(
     session: Session = Depends(get_session),
 ):
     """
-    Clean up stale presence records (connections older than 1 hour without disconnect)
+    Close presence records not seen within the presence TTL (also done by sweeps)
     """
-    stale_cutoff = datetime.now(timezone.utc) - timedelta(hours=1)
-
-    # Find stale connections (no disconnect time and older than 1 hour)
-    stale_statement = select(UserPresence).where(
-        UserPresence.disconnected_at.is_(None),  # type: ignore - Fine ty issue.
-        UserPresence.updated_at < stale_cutoff,
+    stale_cutoff = datetime.now(timezone.utc) - timedelta(
+        seconds=settings.PRESENCE_TTL_SECONDS
     )
-    stale_records = session.exec(stale_statement).all()
-
-    # Mark them as disconnected
-    for record in stale_records:
-        record.disconnected_at = stale_cutoff.isoformat()
-        record.duration_seconds = (
-            datetime.fromisoformat(record.disconnected_at.replace("Z", "+00:00"))
-            - datetime.fromisoformat(record.connected_at.replace("Z", "+00:00"))
-        ).total_seconds()
-        session.add(record)
-
+    cleaned_up = close_stale_presences(session, stale_cutoff)
     session.commit()
 
     return {
-        "cleaned_up": len(stale_records),
-        "message": f"Cleaned up {len(stale_records)} stale presence records",
+        "cleaned_up": cleaned_up,
+        "message": f"Cleaned up {cleaned_up} stale presence records",
     }
 
 
@@ -207,41 +135,33 @@ async def get_active_users_now(
     session: Session = Depends(get_session),
 ):
     """
-    Get currently active users (connections without disconnect time, filtered for recent activity)
+    Get currently active users from the live sessions kept by heartbeats
     """
-    # Filter for connections that are either very recent (within last 5 minutes)
-    # or have been updated recently (within last 30 minutes)
-    cutoff_time = datetime.now(timezone.utc) - timedelta(minutes=30)
-
-    statement = (
-        select(UserPresence, User)
-        .join(User, UserPresence.user_id == User.id)
-        .where(
-            UserPresence.disconnected_at.is_(None),  # type: ignore - Fine ty issue.
-            UserPresence.updated_at >= cutoff_time,
+    sessions = await get_online_sessions()
+    users = {
+        user.id: user
+        for user in get_users_by_ids(
+            session, list({online["user_id"] for online in sessions})
         )
-    )
-    results = session.exec(statement).all()
-
+    }
+    now = datetime.now(timezone.utc)
+
+    active_users = [
+        {
+            "user_id": online["user_id"],
+            "username": users[online["user_id"]].username,
+            "name": users[online["user_id"]].name,
+            "connection_id": online["connection_id"],
+            "connected_at": online["connected_at"],
+            "duration_seconds": max(
+                0,
+                (now - datetime.fromisoformat(online["connected_at"])).total_seconds(),
+            ),
+        }
+        for online in sessions
+        if online["user_id"] in users
+    ]
     return {
-        "active_count": len(results),
-        "active_users": [
-            {
-                "user_id": presence.user_id,
-                "username": user.username,
-                "name": user.name,
-                "connection_id": presence.connection_id,
-                "connected_at": presence.connected_at,
-                "duration_seconds": max(
-                    0,
-                    (
-                        datetime.now(timezone.utc)
-                        - datetime.fromisoformat(
-                            presence.connected_at.replace("Z", "+00:00")
-                        )
-                    ).total_seconds(),
-                ),
-            }
-            for presence, user in results
-        ],
+        "active_count": len(active_users),
+        "active_users": active_users,
     }
@@ -1,18 +1,33 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlmodel import Session
 
-from src.api.account.api import get_current_user
+from src.api.account.api import get_current_user, get_current_user_optional
+from src.core.pagination import set_next_cursor
 from src.database.engine import get_session
 from src.database.models import User
+from src.database.routing import get_read_session, read_only
 from src.modules.notifications.notification_tasks import create_notification_task
 from src.modules.post.post_methods import get_post
-from src.modules.reaction.reaction_methods import create_reaction, get_reactions_by_post
+from src.modules.reaction.reaction_methods import (
+    REACTION_KEYSET,
+    create_reaction,
+    get_reactions_by_post,
+    get_reactions_summaries_for_posts,
+    get_reactors,
+    summarize_reaction_counts,
+)
+from src.modules.realtime.realtime_methods import publish_reaction_change
 
 from .serializer import (
+    PostReactionsSummaryResponse,
     ReactionCreate,
     ReactionRemovedResponse,
     ReactionResponse,
     ReactionsByEmojiResponse,
+    ReactionSummaryRequest,
+    ReactionUserInfo,
 )
 
 router = APIRouter()
@@ -26,9 +41,13 @@ def create_reaction_endpoint(
 ):
     reaction_data = reaction.model_dump()
     reaction_data["user_id"] = current_user.id
-    created_reaction = create_reaction(db, reaction_data)
+    created_reaction, stats = create_reaction(db, reaction_data)
+    publish_reaction_change(reaction.post_id, stats)
     if created_reaction is None:
-        return {"message": "Reaction removed"}
+        return {
+            "message": "Reaction removed",
+            **summarize_reaction_counts(stats, None),
+        }
 
     # Create notification for post owner when reaction is created
     post = get_post(db, created_reaction.post_id)
@@ -52,16 +71,50 @@ def create_reaction_endpoint(
         "user": created_reaction.user,
         "created_at": created_reaction.created_at,
         "updated_at": created_reaction.updated_at,
+        **summarize_reaction_counts(stats, created_reaction.emoji),
     }
 
 
+@router.post(
+    "/reactions/summary", response_model=dict[str, PostReactionsSummaryResponse]
+)
+@read_only
+def get_reactions_summary_endpoint(
+    request: ReactionSummaryRequest,
+    db: Session = Depends(get_read_session),
+    current_user: Optional[User] = Depends(get_current_user_optional),
+):
+    """Get emoji counts and the caller's own reactions for many posts at once."""
+    current_user_id = current_user.id if current_user else None
+    return get_reactions_summaries_for_posts(db, request.post_ids, current_user_id)
+
+
 @router.get("/reactions/{post_id}", response_model=list[ReactionsByEmojiResponse])
 def get_reactions_endpoint(
     post_id: str,
-    db: Session = Depends(get_session),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session = Depends(get_read_session),
+):
+    """Get the reactions on a post grouped by emoji with the first reactors of each."""
+    return get_reactions_by_post(db, post_id, limit)
+
+
+@router.get("/reactions/{post_id}/users", response_model=list[ReactionUserInfo])
+def get_reactors_endpoint(
+    post_id: str,
+    emoji: str,
+    response: Response,
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_session),
 ):
-    """Get all reactions for a post grouped by emoji with user details."""
-    return get_reactions_by_post(db, post_id)
+    """Page through the users who reacted to a post with one emoji."""
+    try:
+        reactions = get_reactors(db, post_id, emoji, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, reactions, limit, REACTION_KEYSET)
+    return reactions
 
 
 @router.delete("/reactions/", response_model=ReactionRemovedResponse)
@@ -73,8 +126,9 @@ def delete_reaction_endpoint(
 ):
     from src.modules.reaction.reaction_methods import delete_reaction
 
-    success = delete_reaction(db, current_user.id, post_id, emoji)
-    if success:
-        return {"message": "Reaction deleted"}
+    stats = delete_reaction(db, current_user.id, post_id, emoji)
+    if stats:
+        publish_reaction_change(post_id, stats)
+        return {"message": "Reaction deleted", **summarize_reaction_counts(stats, None)}
     else:
         return {"message": "Reaction not found"}
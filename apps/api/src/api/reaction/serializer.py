@@ -1,6 +1,7 @@
 from datetime import datetime
+from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from src.api.user.serializer import UserResponse
 
@@ -10,8 +11,16 @@ class ReactionCreate(BaseModel):
     emoji: str
 
 
+class ReactionSummaryItem(BaseModel):
+    emoji: str
+    count: int
+    me: bool = False
+
+
 class ReactionRemovedResponse(BaseModel):
     message: str
+    reaction_count: Optional[int] = None
+    summary: Optional[list[ReactionSummaryItem]] = None
 
 
 class ReactionResponse(BaseModel):
@@ -22,6 +31,8 @@ class ReactionResponse(BaseModel):
     user: UserResponse
     created_at: datetime
     updated_at: datetime
+    reaction_count: Optional[int] = None
+    summary: Optional[list[ReactionSummaryItem]] = None
 
     class Config:
         from_attributes = True
@@ -41,6 +52,16 @@ class ReactionsByEmojiResponse(BaseModel):
     emoji: str
     count: int
     users: list[ReactionUserInfo]
+    next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
+
+
+class ReactionSummaryRequest(BaseModel):
+    post_ids: list[str] = Field(max_length=100)
+
+
+class PostReactionsSummaryResponse(BaseModel):
+    summary: list[ReactionSummaryItem]
+    user_reaction_ids: list[str]
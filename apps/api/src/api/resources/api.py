@@ -1,17 +1,18 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlmodel import Session
 
-from src.api.account.api import get_current_user
+from src.api.account.api import get_current_user, get_current_user_optional
+from src.core.pagination import set_next_cursor
 from src.database.engine import get_session as get_db
 from src.database.models import User
+from src.database.routing import get_read_session
 from src.modules.channels.channels_methods import is_member
 from src.modules.resources.resources_methods import (
+    RESOURCE_KEYSET,
     create_resource,
     delete_resource,
-    filter_private_channel_resources,
     get_all_resources,
     get_resource,
     get_resources_by_user,
@@ -21,36 +22,6 @@ from src.modules.resources.resources_methods import (
 from .serializer import ResourceCreate, ResourceResponse, ResourceUpdate
 
 router = APIRouter()
-security = HTTPBearer(auto_error=False)
-
-
-def get_current_user_optional(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db),
-) -> Optional[User]:
-    """Get current user from JWT token if provided, otherwise return None."""
-    if not credentials:
-        return None
-
-    try:
-        import jwt
-
-        from src.core.settings import settings
-        from src.modules.user.user_methods import get_user_by_username
-
-        payload = jwt.decode(
-            credentials.credentials,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-        )
-        username: str = payload.get("sub")
-        if username is None:
-            return None
-
-        user = get_user_by_username(db, username)
-        return user
-    except Exception:
-        return None
 
 
 @router.post("/resources/", response_model=ResourceResponse)
@@ -107,15 +78,21 @@ def get_resource_endpoint(
 
 @router.get("/resources/", response_model=List[ResourceResponse])
 def get_all_resources_endpoint(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_session),
     current_user: Optional[User] = Depends(get_current_user_optional),
 ):
-    all_resources = get_all_resources(db, skip, limit)
-    return filter_private_channel_resources(
-        all_resources, current_user_id=current_user.id if current_user else None, db=db
-    )
+    try:
+        all_resources = get_all_resources(
+            db, skip, limit, cursor, current_user.id if current_user else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, all_resources, limit, RESOURCE_KEYSET)
+    return all_resources
 
 
 @router.get("/users/{user_id}/resources/", response_model=List[ResourceResponse])
@@ -124,10 +101,7 @@ def get_resources_by_user_endpoint(
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user_optional),
 ):
-    resources = get_resources_by_user(db, user_id)
-    return filter_private_channel_resources(
-        resources, current_user_id=current_user.id if current_user else None, db=db
-    )
+    return get_resources_by_user(db, user_id, current_user.id if current_user else None)
 
 
 @router.put("/resources/{resource_id}", response_model=ResourceResponse)
@@ -80,9 +80,10 @@ def update_user_endpoint(user_id: str, user: UserUpdate, db: Session = Depends(g
 
 @router.delete("/users/{user_id}")
 def delete_user_endpoint(user_id: str, db: Session = Depends(get_db)):
-    if not delete_user(db, user_id):
+    deleted = delete_user(db, user_id)
+    if not deleted:
         raise HTTPException(status_code=404, detail="User not found")
-    return {"message": "User deleted"}
+    return {"message": "User deleted", "deleted": deleted}
 
 
 @router.post("/users/{user_id}/ban", response_model=User)
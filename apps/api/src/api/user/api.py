@@ -1,15 +1,26 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Response,
+    UploadFile,
+)
 from sqlalchemy.orm import joinedload
 from sqlmodel import Session
 
 from src.api.account.api import get_current_admin
+from src.core.pagination import set_next_cursor
 from src.database.engine import get_session as get_db
 from src.database.models import User, UserSocial
+from src.database.routing import get_read_session
 from src.modules.media.media_methods import create_media
 from src.modules.storages.storage_methods import upload_file
 from src.modules.user.user_methods import (
+    USER_KEYSET,
     ban_user,
     create_user,
     delete_user,
@@ -56,12 +67,19 @@ def get_user_by_username_endpoint(username: str, db: Session = Depends(get_db)):
 
 @router.get("/users/", response_model=List[UserResponse])
 def get_all_users_endpoint(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     query: Optional[str] = None,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_session),
 ):
-    return get_all_users(db, skip, limit, query)
+    try:
+        users = get_all_users(db, skip, limit, query, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, users, limit, USER_KEYSET)
+    return users
 
 
 @router.put("/users/{user_id}", response_model=UserResponse)
@@ -152,9 +170,10 @@ def delete_user_endpoint(
     db: Session = Depends(get_db),
     current_admin: User = Depends(get_current_admin),
 ):
-    if not delete_user(db, user_id):
+    deleted = delete_user(db, user_id)
+    if not deleted:
         raise HTTPException(status_code=404, detail="User not found")
-    return {"message": "User deleted"}
+    return {"message": "User deleted", "deleted": deleted}
 
 
 @router.post("/users/{user_id}/ban", response_model=UserResponse)
@@ -1,23 +1,39 @@
 import json
 import uuid
 from datetime import datetime
-
-from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
+from typing import Optional
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
 from loguru import logger
 from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
 
-from src.database.engine import get_session
+from src.api.account.api import authenticate_token
+from src.database.engine import engine
 
 from .connection_manager import manager
 
 router = APIRouter()
 
 
+def get_token_user_id(token: str) -> str:
+    """Resolve the user of an access token, raising HTTPException when invalid."""
+    with Session(engine) as session:
+        return authenticate_token(session, token).id
+
+
 @router.websocket("/ws")
 async def websocket_endpoint(
     websocket: WebSocket,
     user_id: str = Query(..., description="User ID for the connection"),
-    session: Session = Depends(get_session),
+    token: Optional[str] = Query(None, description="Access token of the user"),
 ):
     """
     WebSocket endpoint for real-time communication.
@@ -30,6 +46,8 @@ async def websocket_endpoint(
 
     Query Parameters:
     - user_id: The ID of the user establishing the connection
+    - token: Access token; authenticated connections receive the user's own
+      notifications, and only they may subscribe to a user topic
 
     Message Format:
     {
@@ -43,11 +61,21 @@ async def websocket_endpoint(
     """
     connection_id = str(uuid.uuid4())
 
-    # Set database session for the connection manager
-    manager.db_session = session
+    # A valid token proves who the user is, which private user topics require
+    authenticated_user_id = None
+    if token:
+        try:
+            # The lookup is blocking, so it runs off the event loop
+            authenticated_user_id = await run_in_threadpool(get_token_user_id, token)
+        except HTTPException:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        user_id = authenticated_user_id
 
     try:
         await manager.connect(websocket, connection_id, user_id)
+        if authenticated_user_id:
+            manager.subscribe_to_user(connection_id, authenticated_user_id)
 
         # Send connection confirmation
         await manager.send_personal_message(
@@ -83,7 +111,20 @@ async def websocket_endpoint(
                     subscription_type = message_data.get("subscription_type")
                     target_id = message_data.get("target_id")
 
-                    if subscription_type == "user":
+                    if (
+                        subscription_type == "user"
+                        and target_id != authenticated_user_id
+                    ):
+                        await manager.send_personal_message(
+                            {
+                                "type": "error",
+                                "data": {
+                                    "message": "Not authorized to subscribe to this user"
+                                },
+                            },
+                            connection_id,
+                        )
+                    elif subscription_type == "user":
                         manager.subscribe_to_user(connection_id, target_id)
                         await manager.send_personal_message(
                             {
@@ -0,0 +1,246 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Optional
+
+import redis.asyncio as aioredis
+from loguru import logger
+
+from src.core.settings import settings
+from src.modules.realtime.realtime_methods import (
+    EVENT_CHANNEL_PREFIX,
+    USER_CHANNEL_PREFIX,
+)
+
+from .connection_manager import manager
+
+# Delay before resubscribing after the Redis connection drops
+RECONNECT_DELAY_SECONDS = 5
+
+# How long the subscriber waits for a message before applying subscription changes
+POLL_TIMEOUT_SECONDS = 0.1
+
+Deliver = Callable[[str, dict], Awaitable[None]]
+
+
+async def deliver_locally(channel: str, message: dict):
+    """Deliver a message to the matching subscribers on this process."""
+    if channel.startswith(USER_CHANNEL_PREFIX):
+        user_id = channel.removeprefix(USER_CHANNEL_PREFIX)
+        await manager.broadcast_to_user_subscribers(user_id, message)
+    elif channel.startswith(EVENT_CHANNEL_PREFIX):
+        event_id = channel.removeprefix(EVENT_CHANNEL_PREFIX)
+        await manager.broadcast_to_event_subscribers(event_id, message)
+
+
+class Backplane(ABC):
+    """Carries realtime messages between API processes and hands them to local sockets.
+
+    Published messages wait in a bounded outbound queue and are flushed in
+    batches; received messages wait in a bounded inbound queue until they are
+    delivered. When either queue is full new messages are dropped and counted,
+    so a slow consumer never blocks request handlers or the subscriber.
+    """
+
+    def __init__(
+        self,
+        deliver: Deliver = deliver_locally,
+        max_queue_size: int = settings.REALTIME_QUEUE_MAX_SIZE,
+        batch_size: int = settings.REALTIME_BATCH_MAX_SIZE,
+        batch_delay: float = settings.REALTIME_BATCH_DELAY_MS / 1000,
+    ):
+        self.deliver = deliver
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.channels: set[str] = set()
+        self.published = 0
+        self.delivered = 0
+        self.dropped_outbound = 0
+        self.dropped_inbound = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._outbound: Optional[asyncio.Queue] = None
+        self._inbound: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._outbound = asyncio.Queue(self.max_queue_size)
+        self._inbound = asyncio.Queue(self.max_queue_size)
+        self._tasks = [
+            asyncio.create_task(self._run_outbound()),
+            asyncio.create_task(self._run_inbound()),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+
+    def publish(self, messages: list[tuple[str, dict]]) -> int:
+        """Queue (channel, message) pairs for publishing; safe to call from any thread."""
+        if self._loop is None or not messages:
+            return 0
+        self._loop.call_soon_threadsafe(self._enqueue_outbound, messages)
+        return len(messages)
+
+    def subscribe(self, channel: str):
+        """Start receiving a channel's messages on this process."""
+        self.channels.add(channel)
+
+    def unsubscribe(self, channel: str):
+        """Stop receiving a channel's messages on this process."""
+        self.channels.discard(channel)
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self).__name__,
+            "channels": len(self.channels),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped_outbound": self.dropped_outbound,
+            "dropped_inbound": self.dropped_inbound,
+            "outbound_queue_size": self._outbound.qsize() if self._outbound else 0,
+            "inbound_queue_size": self._inbound.qsize() if self._inbound else 0,
+        }
+
+    def _enqueue_outbound(self, messages: list[tuple[str, dict]]):
+        for item in messages:
+            try:
+                self._outbound.put_nowait(item)
+            except asyncio.QueueFull:
+                self.dropped_outbound += 1
+
+    def _receive(self, channel: str, message: dict):
+        try:
+            self._inbound.put_nowait((channel, message))
+        except asyncio.QueueFull:
+            self.dropped_inbound += 1
+
+    async def _run_outbound(self):
+        while True:
+            batch = [await self._outbound.get()]
+            if self.batch_delay:
+                await asyncio.sleep(self.batch_delay)
+            while len(batch) < self.batch_size and not self._outbound.empty():
+                batch.append(self._outbound.get_nowait())
+            try:
+                await self._flush(batch)
+                self.published += len(batch)
+            except Exception as e:
+                logger.warning(f"Failed to publish {len(batch)} realtime messages: {e}")
+
+    async def _run_inbound(self):
+        while True:
+            channel, message = await self._inbound.get()
+            try:
+                await self.deliver(channel, message)
+                self.delivered += 1
+            except Exception as e:
+                logger.error(f"Error delivering realtime message on {channel}: {e}")
+
+    @abstractmethod
+    async def _flush(self, batch: list[tuple[str, dict]]):
+        """Send a batch of published messages to every process."""
+
+
+class LocalBackplane(Backplane):
+    """In-memory backplane for a single process and for tests."""
+
+    async def _flush(self, batch: list[tuple[str, dict]]):
+        for channel, message in batch:
+            self._receive(channel, message)
+
+
+class RedisBackplane(Backplane):
+    """Backplane sharing messages between processes through Redis pub/sub.
+
+    Each process only subscribes to the channels its own sockets listen on.
+    """
+
+    def __init__(self, url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+        self._client: Optional[aioredis.Redis] = None
+        self._channels_changed = asyncio.Event()
+
+    async def start(self):
+        self._client = aioredis.Redis.from_url(self.url)
+        await super().start()
+        self._tasks.append(asyncio.create_task(self._run_subscriber()))
+
+    async def stop(self):
+        await super().stop()
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    def subscribe(self, channel: str):
+        super().subscribe(channel)
+        self._channels_changed.set()
+
+    def unsubscribe(self, channel: str):
+        super().unsubscribe(channel)
+        self._channels_changed.set()
+
+    async def _flush(self, batch: list[tuple[str, dict]]):
+        async with self._client.pipeline(transaction=False) as pipeline:
+            for channel, message in batch:
+                pipeline.publish(channel, json.dumps(message, default=str))
+            await pipeline.execute()
+
+    async def _run_subscriber(self):
+        while True:
+            try:
+                async with self._client.pubsub() as pubsub:
+                    subscribed: set[str] = set()
+                    while True:
+                        await self._sync_channels(pubsub, subscribed)
+                        if not subscribed:
+                            await self._channels_changed.wait()
+                            continue
+                        item = await pubsub.get_message(
+                            ignore_subscribe_messages=True,
+                            timeout=POLL_TIMEOUT_SECONDS,
+                        )
+                        if not item:
+                            continue
+                        channel = item["channel"].decode()
+                        # A malformed message is skipped, not a reason to resubscribe
+                        try:
+                            message = json.loads(item["data"])
+                        except ValueError as e:
+                            logger.warning(
+                                f"Skipping malformed realtime message on {channel}: {e}"
+                            )
+                            continue
+                        self._receive(channel, message)
+            except aioredis.RedisError as e:
+                logger.warning(f"Realtime backplane disconnected: {e}")
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def _sync_channels(self, pubsub, subscribed: set[str]):
+        """Bring the Redis subscriptions in line with the channels sockets listen on."""
+        self._channels_changed.clear()
+        added = self.channels - subscribed
+        removed = subscribed - self.channels
+        if added:
+            await pubsub.subscribe(*added)
+        if removed:
+            await pubsub.unsubscribe(*removed)
+        subscribed.difference_update(removed)
+        subscribed.update(added)
+
+
+def create_backplane() -> Backplane:
+    """Create the backplane configured for this process."""
+    backend = settings.REALTIME_BACKPLANE or (
+        "redis" if settings.REDIS_URL else "local"
+    )
+    if backend == "redis":
+        return RedisBackplane(settings.REDIS_URL)
+    if backend == "local":
+        return LocalBackplane()
+    raise ValueError(f"Unknown realtime backplane: {backend}")
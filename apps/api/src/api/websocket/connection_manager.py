@@ -1,11 +1,13 @@
+import asyncio
+from collections import OrderedDict
 from datetime import datetime, timezone
 from typing import Dict, Set
 
-from fastapi import WebSocket
+from fastapi import WebSocket, status
 from loguru import logger
-from sqlmodel import Session, select
 
-from src.database.models import UserPresence
+from src.core.settings import settings
+from src.modules.realtime.realtime_methods import event_channel, user_channel
 
 
 class ConnectionManager:
@@ -21,11 +23,35 @@ class ConnectionManager:
         # Event subscriptions: {event_id: Set[connection_id]}
         self.event_subscriptions: Dict[str, Set[str]] = {}
 
+        # Reverse indexes, so a connection is found and removed without scans
+        # Connections per user: {user_id: Set[connection_id]}
+        self.user_connections: Dict[str, Set[str]] = {}
+        # Users and events each connection subscribes to: {connection_id: Set[id]}
+        self.connection_user_subscriptions: Dict[str, Set[str]] = {}
+        self.connection_event_subscriptions: Dict[str, Set[str]] = {}
+
         # Connection metadata: {connection_id: {user_id, connected_at, last_heartbeat}}
         self.connection_metadata: Dict[str, dict] = {}
 
-        # Database session (will be set from API endpoint)
-        self.db_session: Session | None = None
+        # Connections ordered by their last heartbeat, oldest first, so stale
+        # ones are found without a scan: {connection_id: last heartbeat}
+        self.last_seen: OrderedDict[str, datetime] = OrderedDict()
+
+        # Bounded outbound queue and writer task of each connection, so one slow
+        # client never delays the others: {connection_id: Queue / Task}
+        self.send_queues: Dict[str, asyncio.Queue] = {}
+        self.writer_tasks: Dict[str, asyncio.Task] = {}
+        self.dropped_messages = 0
+        self.evicted_connections = 0
+
+        # Write-behind buffer of presence records (set on startup)
+        self.presence_writer = None
+
+        # Sweeper closing sockets that stopped sending heartbeats (set on startup)
+        self.presence_monitor = None
+
+        # Backplane receiving the topics of this process's sockets (set on startup)
+        self.backplane = None
 
     async def connect(self, websocket: WebSocket, connection_id: str, user_id: str):
         """Accept a new WebSocket connection"""
@@ -37,25 +63,22 @@ class ConnectionManager:
             "connected_at": connected_at,
             "last_heartbeat": connected_at,
         }
+        self.last_seen[connection_id] = connected_at
+        self.user_connections.setdefault(user_id, set()).add(connection_id)
+        self.send_queues[connection_id] = asyncio.Queue(
+            settings.WEBSOCKET_SEND_QUEUE_MAX_SIZE
+        )
+        self.writer_tasks[connection_id] = asyncio.create_task(
+            self._write_messages(connection_id, websocket)
+        )
         logger.info(f"WebSocket connected: {connection_id} (user: {user_id})")
         logger.info(
             f"User {user_id} is now active - Total active connections: {len(self.active_connections)}"
         )
 
-        # Save presence record to database
-        if self.db_session:
-            try:
-                presence = UserPresence(
-                    user_id=user_id,
-                    connection_id=connection_id,
-                    connected_at=connected_at.isoformat(),
-                )
-                self.db_session.add(presence)
-                self.db_session.commit()
-                logger.info(f"Saved presence record for connection {connection_id}")
-            except Exception as e:
-                logger.error(f"Error saving presence record: {e}")
-                self.db_session.rollback()
+        # Queue the presence record; the writer saves it with the next batch
+        if self.presence_writer:
+            self.presence_writer.record_connect(connection_id, user_id, connected_at)
 
     def disconnect(self, connection_id: str):
         """Remove a WebSocket connection and clean up subscriptions"""
@@ -65,42 +88,40 @@ class ConnectionManager:
         if connection_id in self.active_connections:
             del self.active_connections[connection_id]
 
-        # Remove from user subscriptions
-        for user_id, connections in list(self.user_subscriptions.items()):
-            if connection_id in connections:
-                connections.remove(connection_id)
-                if not connections:
-                    del self.user_subscriptions[user_id]
+        # Stop the writer; pending messages are discarded with the queue
+        self.send_queues.pop(connection_id, None)
+        writer = self.writer_tasks.pop(connection_id, None)
+        if writer:
+            writer.cancel()
 
-        # Remove from event subscriptions
-        for event_id, connections in list(self.event_subscriptions.items()):
-            if connection_id in connections:
-                connections.remove(connection_id)
-                if not connections:
-                    del self.event_subscriptions[event_id]
+        # Remove from the topics this connection subscribed to
+        for user_id in self.connection_user_subscriptions.pop(connection_id, set()):
+            self._remove_subscriber(
+                self.user_subscriptions, user_id, connection_id, user_channel(user_id)
+            )
+        for event_id in self.connection_event_subscriptions.pop(connection_id, set()):
+            self._remove_subscriber(
+                self.event_subscriptions,
+                event_id,
+                connection_id,
+                event_channel(event_id),
+            )
 
-        # Update presence record in database
-        if self.db_session and duration is not None:
-            try:
-                statement = select(UserPresence).where(
-                    UserPresence.connection_id == connection_id
-                )
-                presence = self.db_session.exec(statement).first()
-                if presence:
-                    presence.disconnected_at = datetime.now(timezone.utc).isoformat()
-                    presence.duration_seconds = duration
-                    self.db_session.add(presence)
-                    self.db_session.commit()
-                    logger.info(
-                        f"Updated presence record for connection {connection_id} - Duration: {duration:.2f}s"
-                    )
-            except Exception as e:
-                logger.error(f"Error updating presence record: {e}")
-                self.db_session.rollback()
+        # Queue the end of the presence record
+        if self.presence_writer and duration is not None:
+            self.presence_writer.record_disconnect(
+                connection_id, datetime.now(timezone.utc), duration
+            )
 
         # Remove metadata
-        if connection_id in self.connection_metadata:
-            del self.connection_metadata[connection_id]
+        self.last_seen.pop(connection_id, None)
+        metadata = self.connection_metadata.pop(connection_id, None)
+        if metadata:
+            connections = self.user_connections.get(metadata["user_id"])
+            if connections is not None:
+                connections.discard(connection_id)
+                if not connections:
+                    del self.user_connections[metadata["user_id"]]
 
         logger.info(f"WebSocket disconnected: {connection_id}")
 
@@ -108,90 +129,134 @@ class ConnectionManager:
         """Subscribe a connection to user events"""
         if user_id not in self.user_subscriptions:
             self.user_subscriptions[user_id] = set()
+            self._claim_channel(user_channel(user_id))
         self.user_subscriptions[user_id].add(connection_id)
+        self.connection_user_subscriptions.setdefault(connection_id, set()).add(user_id)
         logger.info(f"Connection {connection_id} subscribed to user {user_id}")
 
     def unsubscribe_from_user(self, connection_id: str, user_id: str):
         """Unsubscribe a connection from user events"""
-        if user_id in self.user_subscriptions:
-            self.user_subscriptions[user_id].discard(connection_id)
-            if not self.user_subscriptions[user_id]:
-                del self.user_subscriptions[user_id]
+        self.connection_user_subscriptions.get(connection_id, set()).discard(user_id)
+        self._remove_subscriber(
+            self.user_subscriptions, user_id, connection_id, user_channel(user_id)
+        )
         logger.info(f"Connection {connection_id} unsubscribed from user {user_id}")
 
     def subscribe_to_event(self, connection_id: str, event_id: str):
         """Subscribe a connection to event updates"""
         if event_id not in self.event_subscriptions:
             self.event_subscriptions[event_id] = set()
+            self._claim_channel(event_channel(event_id))
         self.event_subscriptions[event_id].add(connection_id)
+        self.connection_event_subscriptions.setdefault(connection_id, set()).add(
+            event_id
+        )
         logger.info(f"Connection {connection_id} subscribed to event {event_id}")
 
     def unsubscribe_from_event(self, connection_id: str, event_id: str):
         """Unsubscribe a connection from event updates"""
-        if event_id in self.event_subscriptions:
-            self.event_subscriptions[event_id].discard(connection_id)
-            if not self.event_subscriptions[event_id]:
-                del self.event_subscriptions[event_id]
+        self.connection_event_subscriptions.get(connection_id, set()).discard(event_id)
+        self._remove_subscriber(
+            self.event_subscriptions, event_id, connection_id, event_channel(event_id)
+        )
         logger.info(f"Connection {connection_id} unsubscribed from event {event_id}")
 
+    def _remove_subscriber(
+        self,
+        subscriptions: Dict[str, Set[str]],
+        topic_id: str,
+        connection_id: str,
+        channel: str,
+    ):
+        """Drop a connection from a topic, releasing the topic once it is empty"""
+        connections = subscriptions.get(topic_id)
+        if connections is None:
+            return
+        connections.discard(connection_id)
+        if not connections:
+            del subscriptions[topic_id]
+            self._release_channel(channel)
+
+    def _claim_channel(self, channel: str):
+        """Receive a topic's messages from other processes once a socket wants it"""
+        if self.backplane:
+            self.backplane.subscribe(channel)
+
+    def _release_channel(self, channel: str):
+        """Stop receiving a topic's messages once no socket wants it"""
+        if self.backplane:
+            self.backplane.unsubscribe(channel)
+
     async def send_personal_message(self, message: dict, connection_id: str):
-        """Send a message to a specific connection"""
-        if connection_id in self.active_connections:
-            websocket = self.active_connections[connection_id]
-            try:
-                # Check if connection is still open
-                if websocket.client_state.name == "CONNECTED":
-                    await websocket.send_json(message)
-                else:
-                    logger.warning(
-                        f"Connection {connection_id} is not in CONNECTED state"
-                    )
-                    self.disconnect(connection_id)
-            except Exception as e:
-                logger.error(f"Error sending message to {connection_id}: {e}")
-                self.disconnect(connection_id)
+        """Queue a message for a specific connection without waiting for it to be sent"""
+        queue = self.send_queues.get(connection_id)
+        if queue is None:
+            return
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self._handle_slow_consumer(connection_id)
 
     async def broadcast_to_user_subscribers(self, user_id: str, message: dict):
         """Broadcast a message to all connections subscribed to a user"""
-        if user_id in self.user_subscriptions:
-            disconnected = []
-            for connection_id in self.user_subscriptions[user_id]:
-                try:
-                    await self.send_personal_message(message, connection_id)
-                except Exception as e:
-                    logger.error(f"Error broadcasting to {connection_id}: {e}")
-                    disconnected.append(connection_id)
-
-            # Clean up disconnected connections
-            for connection_id in disconnected:
-                self.disconnect(connection_id)
+        for connection_id in list(self.user_subscriptions.get(user_id, ())):
+            await self.send_personal_message(message, connection_id)
 
     async def broadcast_to_event_subscribers(self, event_id: str, message: dict):
         """Broadcast a message to all connections subscribed to an event"""
-        if event_id in self.event_subscriptions:
-            disconnected = []
-            for connection_id in self.event_subscriptions[event_id]:
-                try:
-                    await self.send_personal_message(message, connection_id)
-                except Exception as e:
-                    logger.error(f"Error broadcasting to {connection_id}: {e}")
-                    disconnected.append(connection_id)
-
-            # Clean up disconnected connections
-            for connection_id in disconnected:
-                self.disconnect(connection_id)
+        for connection_id in list(self.event_subscriptions.get(event_id, ())):
+            await self.send_personal_message(message, connection_id)
+
+    async def _write_messages(self, connection_id: str, websocket: WebSocket):
+        """Send a connection's queued messages in order until it fails or closes"""
+        queue = self.send_queues[connection_id]
+        while True:
+            message = await queue.get()
+            try:
+                # Check if connection is still open
+                if websocket.client_state.name != "CONNECTED":
+                    logger.warning(
+                        f"Connection {connection_id} is not in CONNECTED state"
+                    )
+                    break
+                await asyncio.wait_for(
+                    websocket.send_json(message),
+                    settings.WEBSOCKET_SEND_TIMEOUT_SECONDS,
+                )
+            except Exception as e:
+                logger.error(f"Error sending message to {connection_id}: {e!r}")
+                break
+        self.close_connection(connection_id, status.WS_1011_INTERNAL_ERROR)
+
+    def _handle_slow_consumer(self, connection_id: str):
+        """Drop the message or close the client whose outbound queue is full"""
+        if settings.WEBSOCKET_SLOW_CONSUMER_POLICY == "drop":
+            self.dropped_messages += 1
+            return
+        logger.warning(f"Closing slow WebSocket connection {connection_id}")
+        self.evicted_connections += 1
+        self.close_connection(connection_id, status.WS_1013_TRY_AGAIN_LATER)
+
+    def close_connection(self, connection_id: str, code: int):
+        """Disconnect a connection now and close its socket in the background"""
+        websocket = self.active_connections.get(connection_id)
+        self.disconnect(connection_id)
+        if websocket:
+            asyncio.create_task(self._close(websocket, code))
+
+    async def _close(self, websocket: WebSocket, code: int):
+        try:
+            await websocket.close(code=code)
+        except Exception as e:
+            logger.debug(f"Error closing WebSocket: {e}")
 
     def update_heartbeat(self, connection_id: str):
         """Update the last heartbeat timestamp for a connection"""
         if connection_id in self.connection_metadata:
-            self.connection_metadata[connection_id]["last_heartbeat"] = datetime.now(
-                timezone.utc
-            )
-            user_id = self.connection_metadata[connection_id]["user_id"]
-            duration = self.get_connection_duration(connection_id)
-            logger.info(
-                f"User {user_id} active - Connection duration: {duration:.2f}s (connection: {connection_id})"
-            )
+            now = datetime.now(timezone.utc)
+            self.connection_metadata[connection_id]["last_heartbeat"] = now
+            self.last_seen[connection_id] = now
+            self.last_seen.move_to_end(connection_id)
 
     def get_connection_duration(self, connection_id: str) -> float | None:
         """Get the duration (in seconds) a connection has been active"""
@@ -202,15 +267,32 @@ class ConnectionManager:
 
     def get_user_connections(self, user_id: str) -> list[str]:
         """Get all active connection IDs for a user"""
-        return [
-            conn_id
-            for conn_id, metadata in self.connection_metadata.items()
-            if metadata["user_id"] == user_id
-        ]
+        return list(self.user_connections.get(user_id, ()))
 
     def get_active_users(self) -> Set[str]:
         """Get all currently active user IDs"""
-        return {metadata["user_id"] for metadata in self.connection_metadata.values()}
+        return set(self.user_connections)
+
+    def get_stale_connections(self, cutoff: datetime) -> list[str]:
+        """Get the connections whose last heartbeat is older than the cutoff"""
+        stale = []
+        for connection_id, last_seen in self.last_seen.items():
+            if last_seen >= cutoff:
+                break
+            stale.append(connection_id)
+        return stale
+
+    def get_online_sessions(self) -> list[dict]:
+        """Describe this process's live connections for presence listings"""
+        return [
+            {
+                "user_id": metadata["user_id"],
+                "connection_id": connection_id,
+                "connected_at": metadata["connected_at"].isoformat(),
+                "last_seen": metadata["last_heartbeat"].isoformat(),
+            }
+            for connection_id, metadata in self.connection_metadata.items()
+        ]
 
 
 # Global connection manager instance
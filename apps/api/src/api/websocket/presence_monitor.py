@@ -0,0 +1,142 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import redis.asyncio as aioredis
+from fastapi import status
+from loguru import logger
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.core.settings import settings
+from src.database.engine import async_engine
+from src.modules.presence.presence_methods import (
+    close_stale_presences,
+    touch_presences,
+)
+
+from .connection_manager import manager
+
+# Redis sorted set of live connection IDs scored by last heartbeat, and the
+# hash describing each of them, shared by every API process
+ONLINE_KEY = "presence:online"
+SESSIONS_KEY = "presence:sessions"
+
+
+class PresenceMonitor:
+    """Heartbeat-driven liveness of WebSocket sessions.
+
+    Every sweep closes sockets whose heartbeats stopped for longer than the
+    TTL, refreshes the presence rows of live ones, and closes rows that other
+    processes left open. With Redis, live sessions are also shared in a sorted
+    set so any process can list who is online.
+    """
+
+    def __init__(
+        self,
+        ttl: float = settings.PRESENCE_TTL_SECONDS,
+        sweep_interval: float = settings.PRESENCE_SWEEP_INTERVAL_SECONDS,
+        redis_url: str = settings.REDIS_URL,
+    ):
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self.redis_url = redis_url
+        self.expired_connections = 0
+        self._client: Optional[aioredis.Redis] = None
+        self._published: set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self.redis_url:
+            self._client = aioredis.Redis.from_url(self.redis_url)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._client:
+            await self._remove_published(self._published)
+            await self._client.aclose()
+            self._client = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Presence sweep failed: {e}")
+
+    def cutoff(self) -> datetime:
+        return datetime.now(timezone.utc) - timedelta(seconds=self.ttl)
+
+    async def sweep(self):
+        cutoff = self.cutoff()
+        for connection_id in manager.get_stale_connections(cutoff):
+            logger.info(f"Closing WebSocket {connection_id} after missed heartbeats")
+            self.expired_connections += 1
+            manager.close_connection(connection_id, status.WS_1001_GOING_AWAY)
+
+        if self._client:
+            await self._publish_sessions(cutoff)
+
+        async with AsyncSession(async_engine) as session:
+            await session.run_sync(touch_presences, list(manager.connection_metadata))
+            closed = await session.run_sync(close_stale_presences, cutoff)
+            await session.commit()
+        if closed:
+            logger.info(f"Closed {closed} stale presence sessions")
+
+    async def _publish_sessions(self, cutoff: datetime):
+        sessions = manager.get_online_sessions()
+        live = {session["connection_id"] for session in sessions}
+        async with self._client.pipeline(transaction=False) as pipeline:
+            if sessions:
+                pipeline.hset(
+                    SESSIONS_KEY,
+                    mapping={s["connection_id"]: json.dumps(s) for s in sessions},
+                )
+                pipeline.zadd(
+                    ONLINE_KEY,
+                    {
+                        s["connection_id"]: datetime.fromisoformat(
+                            s["last_seen"]
+                        ).timestamp()
+                        for s in sessions
+                    },
+                )
+            pipeline.zrangebyscore(ONLINE_KEY, "-inf", f"({cutoff.timestamp()}")
+            results = await pipeline.execute()
+
+        # Forget sessions that closed here, and those other processes abandoned
+        expired = {member.decode() for member in results[-1]}
+        await self._remove_published((self._published - live) | expired)
+        self._published = live
+
+    async def _remove_published(self, connection_ids: set[str]):
+        if not connection_ids:
+            return
+        async with self._client.pipeline(transaction=False) as pipeline:
+            pipeline.zrem(ONLINE_KEY, *connection_ids)
+            pipeline.hdel(SESSIONS_KEY, *connection_ids)
+            await pipeline.execute()
+
+    async def online_sessions(self) -> list[dict]:
+        """List live sessions across processes, or of this process without Redis."""
+        if not self._client:
+            return manager.get_online_sessions()
+        connection_ids = await self._client.zrangebyscore(
+            ONLINE_KEY, self.cutoff().timestamp(), "+inf"
+        )
+        if not connection_ids:
+            return []
+        sessions = await self._client.hmget(SESSIONS_KEY, connection_ids)
+        return [json.loads(session) for session in sessions if session]
+
+    def stats(self) -> dict:
+        return {
+            "tracked_connections": len(manager.last_seen),
+            "expired_connections": self.expired_connections,
+        }
@@ -0,0 +1,143 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from loguru import logger
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.core.settings import settings
+from src.database.engine import async_engine
+from src.modules.presence.presence_methods import close_presences, insert_presences
+
+
+class PresenceWriter:
+    """Write-behind buffer persisting WebSocket presence sessions in batches.
+
+    Connects and disconnects are recorded in memory and flushed every
+    flush_interval seconds, or sooner once max_events are pending, so connect
+    storms cost one INSERT and one UPDATE per batch instead of a commit each.
+    Batches that fail to write are put back and retried, keeping at most
+    max_pending changes; the oldest are dropped beyond that.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = settings.PRESENCE_FLUSH_INTERVAL_MS / 1000,
+        max_events: int = settings.PRESENCE_FLUSH_MAX_EVENTS,
+        max_pending: int = settings.PRESENCE_BUFFER_MAX_EVENTS,
+    ):
+        self.flush_interval = flush_interval
+        self.max_events = max_events
+        self.max_pending = max_pending
+        self.flushed = 0
+        self.failed = 0
+        self.dropped = 0
+        # Pending rows keyed by connection ID: new sessions, and closes of flushed ones
+        self._opened: dict[str, dict] = {}
+        self._closed: dict[str, dict] = {}
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def record_connect(self, connection_id: str, user_id: str, connected_at: datetime):
+        self._opened[connection_id] = {
+            "user_id": user_id,
+            "connection_id": connection_id,
+            "connected_at": connected_at,
+        }
+        self._signal_if_full()
+
+    def record_disconnect(
+        self, connection_id: str, disconnected_at: datetime, duration_seconds: float
+    ):
+        closed = {
+            "disconnected_at": disconnected_at,
+            "duration_seconds": duration_seconds,
+        }
+        # A session opened and closed within one batch is inserted closed
+        if connection_id in self._opened:
+            self._opened[connection_id].update(closed)
+        else:
+            self._closed[connection_id] = {"connection_id": connection_id, **closed}
+        self._signal_if_full()
+
+    def pending(self) -> int:
+        return len(self._opened) + len(self._closed)
+
+    def _signal_if_full(self):
+        if self.pending() >= self.max_events:
+            self._full.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            # Back off after a failure instead of retrying on every new change
+            if not await self.flush():
+                await asyncio.sleep(self.flush_interval)
+
+    async def flush(self) -> bool:
+        """Write every pending presence change with a session of its own.
+
+        Returns False when the batch failed and was put back for a retry.
+        """
+        opened, self._opened = list(self._opened.values()), {}
+        closed, self._closed = list(self._closed.values()), {}
+        if not opened and not closed:
+            return True
+        try:
+            async with AsyncSession(async_engine) as session:
+                # Inserts go first, so earlier sessions exist before they are closed
+                await session.run_sync(insert_presences, opened)
+                await session.run_sync(close_presences, closed)
+                await session.commit()
+            self.flushed += len(opened) + len(closed)
+            return True
+        except Exception as e:
+            self.failed += len(opened) + len(closed)
+            logger.error(
+                f"Failed to flush {len(opened) + len(closed)} presence changes: {e}"
+            )
+            self._requeue(opened, closed)
+            return False
+
+    def _requeue(self, opened: list[dict], closed: list[dict]):
+        """Put a failed batch back ahead of the changes recorded since."""
+        requeued_opened = {row["connection_id"]: row for row in opened}
+        # Sessions closed while their insert was in flight are inserted closed
+        for connection_id in list(self._closed):
+            if connection_id in requeued_opened:
+                close = self._closed.pop(connection_id)
+                requeued_opened[connection_id].update(
+                    disconnected_at=close["disconnected_at"],
+                    duration_seconds=close["duration_seconds"],
+                )
+        requeued_closed = {row["connection_id"]: row for row in closed}
+        self._opened = requeued_opened | self._opened
+        self._closed = requeued_closed | self._closed
+
+        # Drop the oldest changes beyond the bound, closes before sessions
+        while self.pending() > self.max_pending:
+            pending = self._closed or self._opened
+            del pending[next(iter(pending))]
+            self.dropped += 1
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending(),
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
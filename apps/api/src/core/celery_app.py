@@ -8,6 +8,7 @@ celery_app = Celery(
     backend=settings.CELERY_RESULT_BACKEND,
     include=[
         "src.modules.notifications.notification_tasks",
+        "src.modules.presence.presence_tasks",
     ],
 )
 
@@ -23,3 +24,11 @@ celery_app.conf.update(
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
 )
+
+# Periodic tasks, run by `celery beat`
+celery_app.conf.beat_schedule = {
+    "compact-presence": {
+        "task": "src.modules.presence.presence_tasks.compact_presence_task",
+        "schedule": settings.PRESENCE_ROLLUP_INTERVAL_SECONDS,
+    },
+}
@@ -0,0 +1,88 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+from fastapi import Response
+from sqlalchemy import DateTime, TypeDecorator, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# JSON values a cursor may hold for one column
+SCALAR_TYPES = (str, int, float, bool)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row of a page into an opaque cursor."""
+    payload = [
+        value.isoformat() if isinstance(value, datetime) else value for value in values
+    ]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> list:
+    """Decode an opaque cursor back into its sort key values."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def keyset_filter(columns: Sequence[Any], cursor: str):
+    """Build the predicate selecting rows after the cursor in descending order.
+
+    Uses a row value comparison so Postgres can seek straight to the cursor
+    position in a composite index on the same columns.
+    """
+    values = decode_cursor(cursor)
+    if len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+
+    parsed = []
+    for column, value in zip(columns, values):
+        if value is not None:
+            value = parse_cursor_value(column, value)
+        parsed.append(value)
+    return tuple_(*columns) < tuple_(*parsed)
+
+
+def parse_cursor_value(column: Any, value: Any) -> Any:
+    """Check a cursor value against its column, so crafted cursors fail as invalid."""
+    if not isinstance(value, SCALAR_TYPES):
+        raise ValueError("Invalid cursor")
+    # Check against the underlying type of wrappers such as sqlmodel's AutoString
+    sql_type = column.type
+    if isinstance(sql_type, TypeDecorator):
+        sql_type = sql_type.impl_instance
+    if isinstance(sql_type, DateTime):
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+    try:
+        python_type = sql_type.python_type
+    except NotImplementedError:
+        return value
+    if not isinstance(value, python_type):
+        raise ValueError("Invalid cursor")
+    return value
+
+
+def cursor_for(item: Any, columns: Sequence[Any]) -> str:
+    """Build the cursor pointing just after an item."""
+    return encode_cursor(*(getattr(item, column.key) for column in columns))
+
+
+def set_next_cursor(
+    response: Response, items: Sequence[Any], limit: int, columns: Sequence[Any]
+) -> Optional[str]:
+    """Expose the next page cursor in a response header when the page is full."""
+    if not items or len(items) < limit:
+        return None
+    next_cursor = cursor_for(items[-1], columns)
+    response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return next_cursor
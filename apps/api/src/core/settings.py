@@ -3,6 +3,18 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     DB_URL: str = ""
+    # Defaults to DB_URL with the asyncpg driver
+    ASYNC_DB_URL: str = ""
+    # Comma-separated read replica URLs, reads use the primary when empty
+    DB_REPLICA_URLS: str = ""
+    # How long a user's reads stay on the primary after they write
+    DB_READ_YOUR_WRITES_SECONDS: int = 10
+    # Database connection pool, sized per API or worker process
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
     SECRET_KEY: str = "your-secret-key"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
@@ -14,6 +26,39 @@ class Settings(BaseSettings):
     R2_PUBLIC_URL: str = ""
     # Redis Settings
     REDIS_URL: str = ""
+    # Realtime backplane, "redis" or "local"; defaults to redis when REDIS_URL is set
+    REALTIME_BACKPLANE: str = ""
+    REALTIME_QUEUE_MAX_SIZE: int = 10000
+    REALTIME_BATCH_MAX_SIZE: int = 200
+    REALTIME_BATCH_DELAY_MS: int = 5
+    # Messages waiting per WebSocket; when full, "close" the slow client or "drop" messages
+    WEBSOCKET_SEND_QUEUE_MAX_SIZE: int = 100
+    WEBSOCKET_SEND_TIMEOUT_SECONDS: float = 10
+    WEBSOCKET_SLOW_CONSUMER_POLICY: str = "close"
+    # Presence sessions are written in batches every N ms or N pending changes
+    PRESENCE_FLUSH_INTERVAL_MS: int = 1000
+    PRESENCE_FLUSH_MAX_EVENTS: int = 500
+    # Changes of failed batches are retried while fewer than N are pending
+    PRESENCE_BUFFER_MAX_EVENTS: int = 10000
+    # Sockets without a heartbeat for the TTL are closed by sweeps run every interval
+    PRESENCE_TTL_SECONDS: int = 90
+    PRESENCE_SWEEP_INTERVAL_SECONDS: int = 15
+    # Presence rollups are refreshed every interval; raw sessions are kept N days
+    PRESENCE_ROLLUP_INTERVAL_SECONDS: int = 300
+    PRESENCE_RAW_RETENTION_DAYS: int = 30
+    # Channel membership cache, set the TTL to 0 to disable
+    MEMBERSHIP_CACHE_TTL_SECONDS: int = 30
+    MEMBERSHIP_CACHE_MAX_SIZE: int = 10000
+    # Authenticated user cache, set the TTL to 0 to disable
+    USER_PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    USER_PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    # URL previews are refetched after the TTL; failed URLs are not retried for
+    # the failure TTL. Fetches are capped in time and in downloaded bytes
+    URL_PREVIEW_TTL_SECONDS: int = 7 * 24 * 60 * 60
+    URL_PREVIEW_FAILURE_TTL_SECONDS: int = 10 * 60
+    URL_PREVIEW_FAILURE_CACHE_MAX_SIZE: int = 10000
+    URL_PREVIEW_FETCH_TIMEOUT_SECONDS: float = 5
+    URL_PREVIEW_MAX_BYTES: int = 1024 * 1024
     # Celery Settings
     CELERY_BROKER_URL: str = ""
     CELERY_RESULT_BACKEND: str = ""
@@ -31,6 +76,10 @@ class Settings(BaseSettings):
     # Platform Settings
     PLATFORM_URL: str = "http://localhost:3000"
 
+    @property
+    def replica_urls(self) -> list[str]:
+        return [url.strip() for url in self.DB_REPLICA_URLS.split(",") if url.strip()]
+
     model_config = SettingsConfigDict(
         env_file="../../.env",  # <-- can be None safely
         env_file_encoding="utf-8",
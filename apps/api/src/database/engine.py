@@ -1,10 +1,75 @@
+from itertools import count
+
+from sqlalchemy import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.core.settings import settings
+from src.database.pool import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+)
+
+pool_options = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+}
+
+
+def get_async_db_url(db_url: str) -> str:
+    """Point a database URL at the asyncpg driver."""
+    url = make_url(db_url).set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+
+engine = create_engine(settings.DB_URL, poolclass=InstrumentedQueuePool, **pool_options)
+
+async_engine = create_async_engine(
+    settings.ASYNC_DB_URL or get_async_db_url(settings.DB_URL),
+    poolclass=InstrumentedAsyncAdaptedQueuePool,
+    **pool_options,
+)
+
+replica_engines = [
+    create_engine(url, poolclass=InstrumentedQueuePool, **pool_options)
+    for url in settings.replica_urls
+]
 
-engine = create_engine(settings.DB_URL)
+async_replica_engines = [
+    create_async_engine(
+        get_async_db_url(url),
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        **pool_options,
+    )
+    for url in settings.replica_urls
+]
+
+_replica_counter = count()
+
+
+def get_read_engine(use_primary: bool = False) -> Engine:
+    """Pick the engine for read-only work, rotating over the replicas."""
+    if use_primary or not replica_engines:
+        return engine
+    return replica_engines[next(_replica_counter) % len(replica_engines)]
+
+
+def get_async_read_engine(use_primary: bool = False) -> AsyncEngine:
+    """Pick the async engine for read-only work, rotating over the replicas."""
+    if use_primary or not async_replica_engines:
+        return async_engine
+    return async_replica_engines[next(_replica_counter) % len(async_replica_engines)]
 
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session():
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+from datetime import date, datetime
 from enum import Enum
 from typing import List, Optional
 
-from sqlalchemy import JSON
+from sqlalchemy import JSON, DateTime, Index, String, event, select
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from sqlmodel import Field, Relationship
@@ -56,6 +57,7 @@ class PostType(str, Enum):
 
 class InviteCode(BaseModel, table=True):
     __tablename__ = "invite_code"
+    __table_args__ = (Index("ix_invite_code_created_at_id", "created_at", "id"),)
 
     code: str = Field(index=True, unique=True)
     max_uses: int = Field(default=1)
@@ -92,6 +94,7 @@ class PasswordReset(BaseModel, table=True):
 
 class User(BaseModel, table=True):
     __tablename__ = "user"
+    __table_args__ = (Index("ix_user_created_at_id", "created_at", "id"),)
 
     name: str | None = Field(default=None)
     bio: str | None = Field(default=None)
@@ -171,12 +174,34 @@ class UserSocial(BaseModel, table=True):
 
 
 class Post(BaseModel, table=True):
+    __table_args__ = (
+        Index(
+            "ix_post_type_is_pinned_created_at_id",
+            "type",
+            "is_pinned",
+            "created_at",
+            "id",
+        ),
+        Index(
+            "ix_post_parent_id_is_pinned_created_at_id",
+            "parent_id",
+            "is_pinned",
+            "created_at",
+            "id",
+        ),
+    )
+
     title: str | None = Field(default=None)
     content: str
     type: PostType = Field(default=PostType.POST)
     user_id: str = Field(foreign_key="user.id")
     channel_id: str | None = Field(foreign_key="channel.id", default=None)
     parent_id: str | None = Field(foreign_key="post.id", default=None)
+    # Thread position, set on insert: the top-level post, the IDs from it down
+    # to this post as "root/.../id/", and the distance from the root
+    root_id: str | None = Field(default=None, index=True)
+    path: str = Field(default="", index=True, sa_type=String(collation="C"))
+    depth: int = Field(default=0)
     is_pinned: bool = Field(default=False)
     user: "User" = Relationship(
         sa_relationship=relationship("User", back_populates="posts")
@@ -199,31 +224,61 @@ class Post(BaseModel, table=True):
     reactions: List["Reaction"] = Relationship(
         sa_relationship=relationship("Reaction", back_populates="post")
     )
+    stats: Optional["PostStats"] = Relationship(
+        sa_relationship=relationship(
+            "PostStats",
+            back_populates="post",
+            uselist=False,
+            cascade="all, delete-orphan",
+            passive_deletes=True,
+        )
+    )
 
     @hybrid_property
     def comment_count(self) -> int:
-        from sqlalchemy import inspect, text
-
-        sql = text("""
-        WITH RECURSIVE rt AS (
-            SELECT id FROM post WHERE parent_id = :post_id
-            UNION ALL
-            SELECT p.id FROM post p INNER JOIN rt ON p.parent_id = rt.id
-        )
-        SELECT COUNT(*) FROM rt
-        """)
-        session = inspect(self).session
-        if session:
-            return session.scalar(sql.bindparams(post_id=self.id))
-        return 0
+        return self.stats.comment_count if self.stats else 0
 
     @hybrid_property
     def reaction_count(self) -> int:
-        return len(self.reactions)
+        return self.stats.reaction_count if self.stats else 0
 
     model_config = {"ignored_types": (hybrid_property,)}  # type: ignore
 
 
+@event.listens_for(Post, "before_insert")
+def set_thread_position(mapper, connection, target):
+    """Place a new post in its parent's thread before it is written."""
+    parent = None
+    if target.parent_id:
+        columns = Post.__table__.c
+        parent = connection.execute(
+            select(columns.root_id, columns.path, columns.depth).where(
+                columns.id == target.parent_id
+            )
+        ).first()
+    if parent:
+        target.root_id = parent.root_id
+        target.path = f"{parent.path}{target.id}/"
+        target.depth = parent.depth + 1
+    else:
+        target.root_id = target.id
+        target.path = f"{target.id}/"
+        target.depth = 0
+
+
+class PostStats(BaseModel, table=True):
+    __tablename__ = "post_stats"
+
+    post_id: str = Field(foreign_key="post.id", unique=True, ondelete="CASCADE")
+    comment_count: int = Field(default=0)  # All descendant replies
+    commenter_count: int = Field(default=0)  # Distinct users among those replies
+    reaction_count: int = Field(default=0)
+    reaction_counts: dict = Field(default_factory=dict, sa_type=JSON)  # emoji -> count
+    post: "Post" = Relationship(
+        sa_relationship=relationship("Post", back_populates="stats")
+    )
+
+
 class Media(BaseModel, table=True):
     url: str = Field(index=True)
     post_id: str | None = Field(foreign_key="post.id", default=None)
@@ -285,6 +340,17 @@ class ActivityType(str, Enum):
 
 
 class Reaction(BaseModel, table=True):
+    __table_args__ = (
+        Index("ix_reaction_user_id_post_id", "user_id", "post_id", unique=True),
+        Index(
+            "ix_reaction_post_id_emoji_created_at_id",
+            "post_id",
+            "emoji",
+            "created_at",
+            "id",
+        ),
+    )
+
     user_id: str = Field(foreign_key="user.id")
     post_id: str = Field(foreign_key="post.id")
     emoji: str
@@ -308,6 +374,21 @@ class Activity(BaseModel, table=True):
 
 
 class Notification(BaseModel, table=True):
+    __table_args__ = (
+        Index(
+            "ix_notification_recipient_id_created_at_id",
+            "recipient_id",
+            "created_at",
+            "id",
+        ),
+        Index(
+            "ix_notification_recipient_id_is_read_created_at",
+            "recipient_id",
+            "is_read",
+            "created_at",
+        ),
+    )
+
     recipient_id: str = Field(foreign_key="user.id")
     sender_id: str = Field(foreign_key="user.id")
     type: NotificationType
@@ -329,6 +410,13 @@ class Notification(BaseModel, table=True):
     )
 
 
+class NotificationStats(BaseModel, table=True):
+    __tablename__ = "notification_stats"
+
+    user_id: str = Field(foreign_key="user.id", unique=True, ondelete="CASCADE")
+    unread_count: int = Field(default=0)  # Kept current as notifications change
+
+
 class Course(BaseModel, table=True):
     title: str = Field(index=True)
     description: str | None = Field(default=None)
@@ -395,6 +483,8 @@ class UrlPreview(BaseModel, table=True):
 
 
 class Resource(BaseModel, table=True):
+    __table_args__ = (Index("ix_resource_created_at_id", "created_at", "id"),)
+
     url: str = Field(index=True)
     description: str | None = Field(default=None)
     user_id: str = Field(foreign_key="user.id")
@@ -427,12 +517,50 @@ class AppLink(BaseModel, table=True):
 
 class UserPresence(BaseModel, table=True):
     __tablename__ = "user_presence"
+    # Rollups find the sessions that changed since their last run
+    __table_args__ = (Index("ix_user_presence_updated_at", "updated_at"),)
 
     user_id: str = Field(foreign_key="user.id", index=True)
     connection_id: str = Field(index=True)  # WebSocket connection ID
-    connected_at: str = Field(index=True)  # ISO datetime when connected
-    disconnected_at: str | None = Field(
-        default=None, index=True
-    )  # ISO datetime when disconnected
+    connected_at: datetime = Field(index=True, sa_type=DateTime(timezone=True))
+    disconnected_at: datetime | None = Field(
+        default=None, index=True, sa_type=DateTime(timezone=True)
+    )
+    # Last presence sweep that saw the connection alive; kept apart from
+    # updated_at, which only changes when a session opens or closes
+    last_seen_at: datetime | None = Field(default=None, sa_type=DateTime(timezone=True))
     duration_seconds: float | None = Field(default=None)  # Total connection duration
     user: "User" = Relationship(sa_relationship=relationship("User"))
+
+
+# Presence sessions aggregated by the UTC hour / day they started in, kept
+# after raw user_presence rows are pruned
+class PresenceHourlyRollup(BaseModel, table=True):
+    __tablename__ = "presence_hourly_rollup"
+
+    bucket_start: datetime = Field(unique=True, sa_type=DateTime(timezone=True))
+    session_count: int = Field(default=0)
+    closed_session_count: int = Field(default=0)  # Sessions with a duration
+    unique_users: int = Field(default=0)
+    total_duration_seconds: float = Field(default=0)
+
+
+class PresenceDailyRollup(BaseModel, table=True):
+    __tablename__ = "presence_daily_rollup"
+
+    day: date = Field(unique=True)
+    session_count: int = Field(default=0)
+    closed_session_count: int = Field(default=0)  # Sessions with a duration
+    unique_users: int = Field(default=0)
+    total_duration_seconds: float = Field(default=0)
+
+
+# Users with a presence session on a UTC day, for exact unique counts over weeks
+class PresenceDailyUser(BaseModel, table=True):
+    __tablename__ = "presence_daily_user"
+    __table_args__ = (
+        Index("ix_presence_daily_user_day_user_id", "day", "user_id", unique=True),
+    )
+
+    day: date
+    user_id: str
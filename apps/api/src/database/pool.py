@@ -0,0 +1,99 @@
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy import Engine, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Upper bounds, in seconds, of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolMetrics:
+    """Thread-safe counters of how long connection checkouts wait."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.bucket_counts = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def observe(self, wait: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.bucket_counts[bisect_left(WAIT_BUCKETS, wait)] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            observed = self.checkouts + self.timeouts
+            histogram = {
+                f"le_{bound}": count
+                for bound, count in zip(WAIT_BUCKETS, self.bucket_counts)
+            }
+            histogram["le_inf"] = self.bucket_counts[-1]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "average_wait_seconds": self.total_wait / observed if observed else 0.0,
+                "max_wait_seconds": self.max_wait,
+                "wait_histogram": histogram,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.observe(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.observe(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """Instrumented pool for engines created with create_async_engine."""
+
+
+def get_pool_stats(engine: Engine) -> dict:
+    """Get the live state and checkout wait metrics of an engine's pool."""
+    pool = engine.pool
+    stats = {
+        "pool_class": type(pool).__name__,
+        "status": pool.status(),
+    }
+    if isinstance(pool, QueuePool):
+        stats.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "timeout_seconds": pool.timeout(),
+            }
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(pool.metrics.snapshot())
+    return stats
@@ -0,0 +1,120 @@
+import hashlib
+from typing import Optional
+
+import jwt
+import redis
+from fastapi import Request
+from loguru import logger
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from src.core.cache import TTLCache
+from src.core.settings import settings
+from src.database.engine import get_async_read_engine, get_read_engine
+from src.modules.realtime.realtime_methods import get_redis_client
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+PIN_KEY_PREFIX = "db:primary-pin:"
+
+# Callers who wrote recently, whose reads must see their own writes. Pins are
+# shared through Redis when configured; this process's pins are also kept here
+# so its own callers skip the round trip
+_primary_pins = TTLCache(maxsize=100000, ttl=settings.DB_READ_YOUR_WRITES_SECONDS)
+
+# Endpoints taking a request body through a non-GET method without writing
+_read_only_endpoints: set = set()
+
+
+def pin_to_primary(caller: str) -> None:
+    """Route a caller's reads to the primary until replicas have caught up."""
+    _primary_pins.set(caller, True)
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        client.set(
+            f"{PIN_KEY_PREFIX}{caller}", 1, ex=settings.DB_READ_YOUR_WRITES_SECONDS
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Failed to share primary pin: {e}")
+
+
+def is_pinned_to_primary(caller: Optional[str]) -> bool:
+    if not caller:
+        return False
+    if _primary_pins.get(caller, False):
+        return True
+    client = get_redis_client()
+    if client is None:
+        return False
+    try:
+        return bool(client.exists(f"{PIN_KEY_PREFIX}{caller}"))
+    except redis.RedisError as e:
+        # Without the shared pins, stay on the primary rather than read stale data
+        logger.warning(f"Failed to read primary pin: {e}")
+        return True
+
+
+def get_request_caller(request: Request) -> Optional[str]:
+    """Identify the caller of a request by its bearer token, if any.
+
+    This is the token's user ID claim, or a hash of the token for tokens
+    without one, so every authenticated caller can be pinned.
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        )
+    except jwt.PyJWTError:
+        return None
+    if payload.get("uid"):
+        return f"user:{payload['uid']}"
+    return f"token:{hashlib.sha256(token.encode()).hexdigest()}"
+
+
+def should_use_primary(request: Request) -> bool:
+    # Without replicas every read goes to the primary, so pins are not looked up
+    if not settings.replica_urls:
+        return False
+    return is_pinned_to_primary(get_request_caller(request))
+
+
+def read_only(endpoint):
+    """Mark a POST endpoint that only reads, so it does not pin its caller."""
+    _read_only_endpoints.add(endpoint)
+    return endpoint
+
+
+def get_read_session(request: Request):
+    """Session for read-only endpoints, served by a replica when configured."""
+    use_primary = should_use_primary(request)
+    with Session(get_read_engine(use_primary)) as session:
+        yield session
+
+
+async def get_async_read_session(request: Request):
+    """Async session for read-only endpoints, served by a replica when configured."""
+    use_primary = await run_in_threadpool(should_use_primary, request)
+    async with AsyncSession(
+        get_async_read_engine(use_primary), expire_on_commit=False
+    ) as session:
+        yield session
+
+
+async def pin_writers_to_primary(request: Request, call_next):
+    """Middleware pinning callers to the primary after a successful write."""
+    response = await call_next(request)
+    if (
+        request.method not in SAFE_METHODS
+        and response.status_code < 400
+        and request.scope.get("endpoint") not in _read_only_endpoints
+    ):
+        caller = get_request_caller(request)
+        if caller:
+            await run_in_threadpool(pin_to_primary, caller)
+    return response
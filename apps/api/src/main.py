@@ -16,6 +16,7 @@ from src.api.courses.api import router as courses_router
 from src.api.extras.api import router as extras_router
 from src.api.invite_code.api import router as invite_code_router
 from src.api.media.api import router as media_router
+from src.api.metrics.api import router as metrics_router
 from src.api.notifications.api import router as notifications_router
 from src.api.post.api import router as post_router
 from src.api.presence.api import router as presence_router
@@ -23,8 +24,15 @@ from src.api.reaction.api import router as reaction_router
 from src.api.resources.api import router as resources_router
 from src.api.user.api import router as user_router
 from src.api.websocket.api import router as websocket_router
+from src.api.websocket.backplane import create_backplane
+from src.api.websocket.connection_manager import manager
+from src.api.websocket.presence_monitor import PresenceMonitor
+from src.api.websocket.presence_writer import PresenceWriter
+from src.core.pagination import NEXT_CURSOR_HEADER
 from src.database.engine import get_session
+from src.database.routing import pin_writers_to_primary
 from src.modules.appsettings import appsettings_methods
+from src.modules.realtime.realtime_methods import set_publisher
 
 
 @asynccontextmanager
@@ -49,10 +57,29 @@ async def lifespan(app: FastAPI):
         if "session" in locals():
             session.close()
 
+    # Share realtime messages with the other API processes and the workers
+    backplane = create_backplane()
+    await backplane.start()
+    manager.backplane = backplane
+    set_publisher(backplane.publish)
+    presence_writer = PresenceWriter()
+    await presence_writer.start()
+    manager.presence_writer = presence_writer
+    presence_monitor = PresenceMonitor()
+    await presence_monitor.start()
+    manager.presence_monitor = presence_monitor
+
     yield
 
     # Shutdown: Cleanup if needed
     logger.info("Application shutting down...")
+    set_publisher(None)
+    manager.backplane = None
+    await backplane.stop()
+    manager.presence_monitor = None
+    await presence_monitor.stop()
+    manager.presence_writer = None
+    await presence_writer.stop()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -61,12 +88,14 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+app.middleware("http")(pin_writers_to_primary)
 app.add_middleware(
     CORSMiddleware,  # type: ignore
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.include_router(account_router, prefix="/api", tags=["account"])
@@ -87,6 +116,7 @@ app.include_router(applinks_router, prefix="/api", tags=["applinks"])
 app.include_router(appsettings_router, prefix="/api/appsettings", tags=["appsettings"])
 app.include_router(websocket_router, prefix="/api", tags=["websocket"])
 app.include_router(presence_router, prefix="/api/presence", tags=["presence"])
+app.include_router(metrics_router, prefix="/api", tags=["metrics"])
 
 
 @app.get("/health")
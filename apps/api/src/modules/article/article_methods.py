@@ -3,7 +3,7 @@ from typing import List, Optional
 from sqlalchemy import desc
 from sqlmodel import Session, select
 
-from src.database.models import Post, PostType
+from src.database.models import Post, PostStats, PostType
 
 
 def create_article(db: Session, article_data: dict) -> Post:
@@ -16,6 +16,7 @@ def create_article(db: Session, article_data: dict) -> Post:
         channel_id=article_data.get("channel_id"),
     )
     db.add(article)
+    db.add(PostStats(post_id=article.id))
     db.commit()
     db.refresh(article)
     return article
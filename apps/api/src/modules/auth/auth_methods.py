@@ -47,6 +47,19 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def create_user_access_token(user: User) -> str:
+    """Create an access token carrying the claims needed to authorize a user."""
+    return create_access_token(
+        data={
+            "sub": user.username,
+            "uid": user.id,
+            "role": user.role.value,
+            "active": user.is_active,
+        },
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+
+
 def register_user(
     db: Session,
     username: str,
@@ -148,10 +161,7 @@ def login_user(db: Session, username: str, password: str) -> Optional[Token]:
     if not user.is_active:
         return None
 
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
+    access_token = create_user_access_token(user)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
@@ -1,8 +1,17 @@
 from typing import List, Optional
 
+from sqlalchemy import ColumnElement, exists, not_, or_
 from sqlmodel import Session, asc, select
 
-from src.database.models import Channel, ChannelMember
+from src.core.cache import TTLCache
+from src.core.settings import settings
+from src.database.models import Channel, ChannelMember, ChannelType
+
+# Process-wide cache of user_id -> IDs of the channels the user belongs to
+_member_channel_ids_cache = TTLCache(
+    maxsize=settings.MEMBERSHIP_CACHE_MAX_SIZE,
+    ttl=settings.MEMBERSHIP_CACHE_TTL_SECONDS,
+)
 
 
 def create_channel(db: Session, channel_data: dict) -> Channel:
@@ -72,6 +81,7 @@ def add_member(db: Session, channel_id: str, user_id: str) -> Optional[ChannelMe
     member = ChannelMember(channel_id=channel_id, user_id=user_id)
     db.add(member)
     db.commit()
+    invalidate_member_channel_ids(db, user_id)
     db.refresh(member)
     return member
 
@@ -87,6 +97,7 @@ def remove_member(db: Session, channel_id: str, user_id: str) -> bool:
         return False
     db.delete(member)
     db.commit()
+    invalidate_member_channel_ids(db, user_id)
     return True
 
 
@@ -96,13 +107,54 @@ def get_channel_members(db: Session, channel_id: str) -> List[ChannelMember]:
     return list(db.exec(statement).all())
 
 
+def get_member_channel_ids(db: Session, user_id: str) -> frozenset[str]:
+    """Get the IDs of every channel a user belongs to.
+
+    The set is memoized on the session for the rest of the request and kept in
+    a short-lived process cache, so repeated access checks cost no queries.
+    """
+    request_memo = db.info.setdefault("member_channel_ids", {})
+    if user_id in request_memo:
+        return request_memo[user_id]
+
+    channel_ids = _member_channel_ids_cache.get(user_id)
+    if channel_ids is None:
+        statement = select(ChannelMember.channel_id).where(
+            ChannelMember.user_id == user_id
+        )
+        channel_ids = frozenset(db.exec(statement).all())
+        _member_channel_ids_cache.set(user_id, channel_ids)
+
+    request_memo[user_id] = channel_ids
+    return channel_ids
+
+
+def invalidate_member_channel_ids(db: Session, user_id: str) -> None:
+    """Forget the cached channel memberships of a user after they change."""
+    db.info.get("member_channel_ids", {}).pop(user_id, None)
+    _member_channel_ids_cache.pop(user_id)
+
+
 def is_member(db: Session, channel_id: str, user_id: str) -> bool:
     """Check if a user is a member of a channel."""
-    return (
-        db.exec(
-            select(ChannelMember).where(
-                ChannelMember.channel_id == channel_id, ChannelMember.user_id == user_id
-            )
-        ).first()
-        is not None
+    return channel_id in get_member_channel_ids(db, user_id)
+
+
+def visible_channel_filter(
+    channel_id_column, user_id: Optional[str] = None
+) -> ColumnElement[bool]:
+    """Build a SQL predicate keeping rows whose channel the user can see.
+
+    Rows outside any channel or in a public channel are visible to everyone,
+    rows in a private channel only to its members.
+    """
+    in_private_channel = exists().where(
+        Channel.id == channel_id_column, Channel.type == ChannelType.PRIVATE
+    )
+    if not user_id:
+        return not_(in_private_channel)
+    in_member_channel = exists().where(
+        ChannelMember.channel_id == channel_id_column,
+        ChannelMember.user_id == user_id,
     )
+    return or_(not_(in_private_channel), in_member_channel)
@@ -1,7 +1,8 @@
 from typing import List, Optional
 
+from sqlalchemy import delete
 from sqlalchemy.orm import selectinload
-from sqlmodel import Session, desc, select
+from sqlmodel import Session, col, desc, select
 
 from src.database.models import (
     Course,
@@ -46,37 +47,27 @@ def update_course(db: Session, course_id: str, update_data: dict) -> Optional[Co
     return course
 
 
-def delete_course(db: Session, course_id: str) -> bool:
-    """Delete a course by ID."""
+def delete_course(db: Session, course_id: str) -> Optional[dict[str, int]]:
+    """Delete a course with its sections, lessons and enrollments, returning counts of removed rows."""
     course = db.get(Course, course_id)
     if not course:
-        return False
+        return None
 
-    # Delete related enrollments first
-    enrollment_statement = select(EnrolledCourse).where(
-        EnrolledCourse.course_id == course_id
-    )
-    enrollment_records = db.exec(enrollment_statement).all()
-    for enrollment in enrollment_records:
-        db.delete(enrollment)
-
-    # Delete related lessons (through sections)
-    section_statement = select(Section).where(Section.course_id == course_id)
-    section_records = db.exec(section_statement).all()
-    for section in section_records:
-        # Delete lessons in this section
-        lesson_statement = select(Lesson).where(Lesson.section_id == section.id)
-        lesson_records = db.exec(lesson_statement).all()
-        for lesson in lesson_records:
-            db.delete(lesson)
-
-        # Delete the section
-        db.delete(section)
-
-    # Finally delete the course
-    db.delete(course)
+    section_ids = select(Section.id).where(Section.course_id == course_id)
+    counts = {
+        "enrollments": db.exec(
+            delete(EnrolledCourse).where(col(EnrolledCourse.course_id) == course_id)
+        ).rowcount,
+        "lessons": db.exec(
+            delete(Lesson).where(col(Lesson.section_id).in_(section_ids))
+        ).rowcount,
+        "sections": db.exec(
+            delete(Section).where(col(Section.course_id) == course_id)
+        ).rowcount,
+        "courses": db.exec(delete(Course).where(col(Course.id) == course_id)).rowcount,
+    }
     db.commit()
-    return True
+    return counts
 
 
 def get_all_courses(
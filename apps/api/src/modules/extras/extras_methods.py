@@ -1,46 +1,131 @@
-import requests
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from urllib.parse import urljoin
+
+import httpx
 from bs4 import BeautifulSoup
 from fastapi import HTTPException
-from opengraph import OpenGraph
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+
+from src.core.cache import TTLCache
+from src.core.common import generate_id
+from src.core.settings import settings
+from src.database.models import UrlPreview
+
+FETCH_ERROR = "Unable to fetch metadata from the URL"
+
+# URLs whose last fetch failed, rejected without refetching until they expire
+failed_urls = TTLCache(
+    settings.URL_PREVIEW_FAILURE_CACHE_MAX_SIZE,
+    settings.URL_PREVIEW_FAILURE_TTL_SECONDS,
+)
+
+# Fetches in progress, shared by concurrent requests for the same URL
+_inflight: dict[str, asyncio.Future] = {}
+
+
+def parse_url_metadata(html: bytes, url: str) -> dict:
+    """Read the OpenGraph tags of a page, falling back to its title and description."""
+    soup = BeautifulSoup(html, "html.parser")
+
+    def meta(*attrs: dict) -> Optional[str]:
+        for attr in attrs:
+            tag = soup.find("meta", attrs=attr)
+            if tag and tag.get("content"):
+                return tag["content"].strip()
+        return None
+
+    title = meta({"property": "og:title"})
+    if not title and soup.title:
+        title = soup.title.get_text().strip() or None
+    image_url = meta({"property": "og:image"})
+
+    return {
+        "title": title,
+        "description": meta({"property": "og:description"}, {"name": "description"}),
+        "image_url": urljoin(url, image_url) if image_url else None,
+    }
+
 
+async def download_page(url: str) -> bytes:
+    """Download the start of a page, up to URL_PREVIEW_MAX_BYTES."""
+    limit = settings.URL_PREVIEW_MAX_BYTES
+    async with httpx.AsyncClient(
+        follow_redirects=True, timeout=settings.URL_PREVIEW_FETCH_TIMEOUT_SECONDS
+    ) as client:
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            body = bytearray()
+            # Metadata lives in <head>, so a truncated page still has it
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) >= limit:
+                    break
+            return bytes(body[:limit])
 
-def fetch_url_metadata(url: str) -> dict:
-    """Fetch metadata from a URL using OpenGraph or fallback to HTML parsing."""
+
+async def fetch_url_metadata(url: str) -> dict:
+    """Fetch a page once and read its preview metadata."""
     try:
-        # Try OpenGraph first
-        og = OpenGraph(url=url)
-        if og.title or og.description or og.image:
-            return {
-                "title": og.title,
-                "description": og.description,
-                "image_url": og.image,
-            }
-    except Exception:
-        pass  # Fall back to HTML parsing
-
-    # Fallback to HTML parsing
+        # Bound the whole download, not just each read, against slow sites
+        html = await asyncio.wait_for(
+            download_page(url), settings.URL_PREVIEW_FETCH_TIMEOUT_SECONDS
+        )
+    except (httpx.HTTPError, httpx.InvalidURL, TimeoutError):
+        raise HTTPException(status_code=400, detail=FETCH_ERROR)
+    return await asyncio.to_thread(parse_url_metadata, html, url)
+
+
+async def get_url_metadata(url: str) -> dict:
+    """Fetch a URL's metadata, sharing in-flight fetches and remembering failures."""
+    if failed_urls.get(url):
+        raise HTTPException(status_code=400, detail=FETCH_ERROR)
+
+    fetch = _inflight.get(url)
+    if fetch is None:
+        fetch = asyncio.ensure_future(fetch_url_metadata(url))
+        _inflight[url] = fetch
+        fetch.add_done_callback(lambda _: _inflight.pop(url, None))
+
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
+        # Shielded, so one client going away does not cancel the others' fetch
+        return await asyncio.shield(fetch)
+    except HTTPException:
+        failed_urls.set(url, True)
+        raise
 
-        title = soup.find("title")
-        title = title.get_text().strip() if title else None
 
-        description = None
-        desc_tag = soup.find("meta", attrs={"name": "description"}) or soup.find(
-            "meta", attrs={"property": "og:description"}
-        )
-        if desc_tag and desc_tag.get("content"):
-            description = desc_tag["content"].strip()
-
-        image_url = None
-        img_tag = soup.find("meta", attrs={"property": "og:image"})
-        if img_tag and img_tag.get("content"):
-            image_url = img_tag["content"].strip()
-
-        return {"title": title, "description": description, "image_url": image_url}
-    except requests.RequestException:
-        raise HTTPException(
-            status_code=400, detail="Unable to fetch metadata from the URL"
+def get_url_preview(db: Session, url: str) -> Optional[UrlPreview]:
+    """Get the stored preview of a URL."""
+    return db.exec(select(UrlPreview).where(UrlPreview.url == url)).first()
+
+
+def is_url_preview_fresh(preview: UrlPreview) -> bool:
+    """Whether a stored preview is younger than URL_PREVIEW_TTL_SECONDS."""
+    # updated_at is naive UTC
+    refreshed_after = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
+        seconds=settings.URL_PREVIEW_TTL_SECONDS
+    )
+    return preview.updated_at >= refreshed_after
+
+
+def save_url_preview(db: Session, url: str, metadata: dict) -> UrlPreview:
+    """Store or refresh the preview of a URL."""
+    # Timestamp columns are naive UTC, which asyncpg only accepts as naive values
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    statement = insert(UrlPreview).values(
+        id=generate_id(), created_at=now, updated_at=now, url=url, **metadata
+    )
+    # Overwrite the stale preview the caller already loaded into this session
+    statement = (
+        statement.on_conflict_do_update(
+            index_elements=["url"], set_={**metadata, "updated_at": now}
         )
+        .returning(UrlPreview)
+        .execution_options(populate_existing=True)
+    )
+    preview = db.exec(statement).scalar_one()
+    db.commit()
+    return preview
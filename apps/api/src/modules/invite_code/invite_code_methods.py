@@ -4,14 +4,19 @@ from datetime import datetime, timezone
 from typing import List, Optional
 
 from sqlalchemy import desc
-from sqlmodel import Session, and_, select
+from sqlmodel import Session, and_, col, select
 
+from src.core.pagination import keyset_filter
 from src.database.models import (
     ChannelMember,
     InviteCode,
     InviteCodeStatus,
     User,
 )
+from src.modules.channels.channels_methods import invalidate_member_channel_ids
+
+# Sort key of the invite code list, matching ix_invite_code_created_at_id
+INVITE_CODE_KEYSET = (col(InviteCode.created_at), col(InviteCode.id))
 
 
 def generate_invite_code(length: int = 8) -> str:
@@ -71,8 +76,9 @@ def get_all_invite_codes(
     limit: int = 100,
     status: Optional[InviteCodeStatus] = None,
     created_by: Optional[str] = None,
+    cursor: Optional[str] = None,
 ) -> List[InviteCode]:
-    """Get all invite codes with optional filtering."""
+    """Get all invite codes with optional filtering and cursor pagination."""
     statement = select(InviteCode)
 
     filters = []
@@ -81,12 +87,16 @@ def get_all_invite_codes(
     if created_by:
         filters.append(InviteCode.created_by == created_by)
 
+    if cursor:
+        filters.append(keyset_filter(INVITE_CODE_KEYSET, cursor))
+
     if filters:
         statement = statement.where(and_(*filters))
 
-    statement = (
-        statement.offset(skip).limit(limit).order_by(desc(InviteCode.created_at))
-    )
+    statement = statement.order_by(desc(InviteCode.created_at), desc(InviteCode.id))
+    if not cursor:
+        statement = statement.offset(skip)
+    statement = statement.limit(limit)
     return list(db.exec(statement).all())
 
 
@@ -199,6 +209,7 @@ def auto_join_user_to_channel(db: Session, user_id: str, channel_id: str) -> boo
 
     db.add(channel_member)
     db.commit()
+    invalidate_member_channel_ids(db, user_id)
     return True
 
 
@@ -4,8 +4,26 @@ from sqlmodel import Session
 
 from src.core.celery_app import celery_app
 from src.database.engine import engine
-from src.database.models import NotificationType
-from src.modules.notifications.notifications_methods import create_notification
+from src.database.models import Notification, NotificationType
+from src.modules.notifications.notifications_methods import (
+    create_notification,
+    create_notifications,
+)
+from src.modules.realtime.realtime_methods import publish_to_users
+from src.modules.user.user_methods import get_users_by_usernames
+
+
+def push_notifications(notifications: list[Notification]) -> int:
+    """Push new notifications to their recipients' open WebSocket connections."""
+    return publish_to_users(
+        [
+            (
+                notification.recipient_id,
+                {"type": "notification", "data": notification.model_dump(mode="json")},
+            )
+            for notification in notifications
+        ]
+    )
 
 
 @celery_app.task
@@ -23,7 +41,7 @@ def create_notification_task(
             "message": "Notification skipped - recipient and sender are the same",
         }
 
-    with Session(engine) as db:
+    with Session(engine, expire_on_commit=False) as db:
         try:
             # Convert string to NotificationType enum
             notification_type_enum = NotificationType(notification_type)
@@ -35,6 +53,7 @@ def create_notification_task(
                 notification_type=notification_type_enum,
                 data=data,
             )
+            push_notifications([notification])
 
             return {
                 "success": True,
@@ -47,3 +66,40 @@ def create_notification_task(
                 "error": str(e),
                 "message": "Failed to create notification",
             }
+
+
+@celery_app.task
+def create_mention_notifications_task(
+    sender_id: str,
+    usernames: list[str],
+    data: Optional[dict] = None,
+):
+    """Notify every user mentioned in a post with one lookup and one insert."""
+    with Session(engine, expire_on_commit=False) as db:
+        try:
+            recipient_ids = [
+                user.id
+                for user in get_users_by_usernames(db, usernames)
+                if user.id != sender_id
+            ]
+            notifications = create_notifications(
+                db=db,
+                recipient_ids=recipient_ids,
+                sender_id=sender_id,
+                notification_type=NotificationType.MENTION,
+                data=data,
+            )
+            pushed = push_notifications(notifications)
+
+            return {
+                "success": True,
+                "notification_ids": [notification.id for notification in notifications],
+                "pushed": pushed,
+                "message": f"Created {len(notifications)} mention notifications",
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": "Failed to create mention notifications",
+            }
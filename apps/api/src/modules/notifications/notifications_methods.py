@@ -1,9 +1,60 @@
+from collections import Counter
+from datetime import datetime, timezone
 from typing import List, Optional
 
-from sqlalchemy import desc
-from sqlmodel import Session, select
+from sqlalchemy import delete, desc, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, func, select
 
-from src.database.models import Notification, NotificationType
+from src.core.common import generate_id
+from src.core.pagination import keyset_filter
+from src.database.models import Notification, NotificationStats, NotificationType
+
+# Sort key of a user's notifications, matching ix_notification_recipient_id_created_at_id
+NOTIFICATION_KEYSET = (col(Notification.created_at), col(Notification.id))
+
+
+def increment_unread_counts(db: Session, counts: dict[str, int]) -> None:
+    """Add to the unread counters of the given users inside the caller's transaction."""
+    if not counts:
+        return
+    now = datetime.now(timezone.utc)
+    statement = insert(NotificationStats).values(
+        [
+            {
+                "id": generate_id(),
+                "created_at": now,
+                "updated_at": now,
+                "user_id": user_id,
+                "unread_count": count,
+            }
+            # Sorted so concurrent batches lock the counter rows in the same order
+            for user_id, count in sorted(counts.items())
+        ]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={
+            "unread_count": NotificationStats.unread_count
+            + statement.excluded.unread_count,
+            "updated_at": now,
+        },
+    )
+    db.exec(statement)
+
+
+def decrement_unread_count(db: Session, user_id: str, amount: int = 1) -> None:
+    """Subtract from a user's unread counter inside the caller's transaction."""
+    if amount <= 0:
+        return
+    db.exec(
+        update(NotificationStats)
+        .where(col(NotificationStats.user_id) == user_id)
+        .values(
+            unread_count=func.greatest(NotificationStats.unread_count - amount, 0),
+            updated_at=datetime.now(timezone.utc),
+        )
+    )
 
 
 def create_notification(
@@ -21,60 +72,129 @@ def create_notification(
         data=data,
     )
     db.add(notification)
+    increment_unread_counts(db, {recipient_id: 1})
     db.commit()
     db.refresh(notification)
     return notification
 
 
+def create_notifications(
+    db: Session,
+    recipient_ids: list[str],
+    sender_id: str,
+    notification_type: NotificationType,
+    data: Optional[dict] = None,
+) -> List[Notification]:
+    """Create the same notification for several recipients in one commit.
+
+    IDs and timestamps are generated client-side, so the rows are not
+    refreshed after the insert.
+    """
+    notifications = [
+        Notification(
+            recipient_id=recipient_id,
+            sender_id=sender_id,
+            type=notification_type,
+            data=data,
+        )
+        for recipient_id in recipient_ids
+    ]
+    if not notifications:
+        return []
+    db.add_all(notifications)
+    increment_unread_counts(db, dict(Counter(recipient_ids)))
+    db.commit()
+    return notifications
+
+
 def get_notifications_by_user(
-    db: Session, user_id: str, skip: int = 0, limit: int = 100
+    db: Session,
+    user_id: str,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> List[Notification]:
-    """Get all notifications for a user with pagination."""
+    """Get all notifications for a user with offset or cursor pagination."""
     statement = (
         select(Notification)
         .where(Notification.recipient_id == user_id)
-        .order_by(desc(Notification.created_at))
-        .offset(skip)
-        .limit(limit)
+        .order_by(desc(Notification.created_at), desc(Notification.id))
     )
+    if cursor:
+        statement = statement.where(keyset_filter(NOTIFICATION_KEYSET, cursor))
+    else:
+        statement = statement.offset(skip)
+    statement = statement.limit(limit)
     notifications = list(db.exec(statement).all())
     return notifications
 
 
+def get_notification(db: Session, notification_id: str) -> Optional[Notification]:
+    """Get a notification by ID."""
+    return db.get(Notification, notification_id)
+
+
 def mark_notification_as_read(
     db: Session, notification_id: str
 ) -> Optional[Notification]:
-    """Mark a notification as read by ID."""
+    """Mark a notification as read by ID, updating its recipient's unread counter."""
     notification = db.get(Notification, notification_id)
     if not notification:
         return None
 
-    notification.is_read = True
+    # Only the request that flips the flag decrements the counter
+    marked = db.exec(
+        update(Notification)
+        .where(col(Notification.id) == notification_id)
+        .where(col(Notification.is_read).is_(False))
+        .values(is_read=True)
+    ).rowcount
+    if marked:
+        decrement_unread_count(db, notification.recipient_id)
     db.commit()
     db.refresh(notification)
     return notification
 
 
 def mark_all_notifications_as_read(db: Session, user_id: str) -> int:
-    """Mark all notifications for a user as read."""
-    statement = select(Notification).where(
-        Notification.recipient_id == user_id, not Notification.is_read
-    )
-    unread_notifications = db.exec(statement).all()
-
-    count = 0
-    for notification in unread_notifications:
-        notification.is_read = True
-        count += 1
-
+    """Mark all notifications for a user as read in one statement."""
+    count = db.exec(
+        update(Notification)
+        .where(col(Notification.recipient_id) == user_id)
+        .where(col(Notification.is_read).is_(False))
+        .values(is_read=True)
+    ).rowcount
+    decrement_unread_count(db, user_id, count)
     db.commit()
     return count
 
 
 def get_unread_notification_count(db: Session, user_id: str) -> int:
-    """Get the count of unread notifications for a user."""
-    statement = select(Notification).where(
-        Notification.recipient_id == user_id, not Notification.is_read
+    """Get the count of unread notifications for a user from their counter."""
+    statement = select(NotificationStats.unread_count).where(
+        NotificationStats.user_id == user_id
+    )
+    return db.exec(statement).first() or 0
+
+
+def delete_notifications_involving_user(db: Session, user_id: str) -> int:
+    """Delete notifications sent or received by a user inside the caller's transaction.
+
+    Unread notifications the user sent are taken off their recipients' counters.
+    """
+    deleted = db.exec(
+        delete(Notification)
+        .where(
+            (col(Notification.sender_id) == user_id)
+            | (col(Notification.recipient_id) == user_id)
+        )
+        .returning(Notification.recipient_id, Notification.is_read)
+    ).all()
+    unread = Counter(
+        recipient_id
+        for recipient_id, is_read in deleted
+        if not is_read and recipient_id != user_id
     )
-    notifications = db.exec(statement).all()
-    return len(notifications)
+    for recipient_id, count in sorted(unread.items()):
+        decrement_unread_count(db, recipient_id, count)
+    return len(deleted)
@@ -0,0 +1,130 @@
+from typing import Optional
+
+from sqlalchemy import bindparam, text
+from sqlmodel import Session, col, select
+
+from src.database.models import Post, PostStats, Reaction
+from src.modules.post.post_stats_methods import (
+    DESCENDANT_OF_SQL,
+    get_post_stats_map,
+)
+
+
+def get_reactions_summaries(
+    db: Session,
+    post_ids: list[str],
+    current_user_id: Optional[str] = None,
+    stats_map: Optional[dict[str, PostStats]] = None,
+) -> dict[str, dict]:
+    """Get reactions summaries for many posts from their stored counters."""
+    if stats_map is None:
+        stats_map = get_post_stats_map(db, post_ids)
+
+    my_reactions: set[tuple[str, str]] = set()
+    if current_user_id and post_ids:
+        statement = select(Reaction.post_id, Reaction.emoji).where(
+            Reaction.user_id == current_user_id, col(Reaction.post_id).in_(post_ids)
+        )
+        my_reactions = set(db.exec(statement).all())
+
+    summaries: dict[str, dict] = {}
+    for post_id in post_ids:
+        stats = stats_map.get(post_id)
+        emoji_counts = stats.reaction_counts if stats else {}
+        summaries[post_id] = {
+            "summary": [
+                {"emoji": emoji, "count": count, "me": (post_id, emoji) in my_reactions}
+                for emoji, count in emoji_counts.items()
+            ],
+            "user_reaction_ids": [
+                f"{current_user_id}_emoji_{emoji}"
+                for reacted_post_id, emoji in my_reactions
+                if reacted_post_id == post_id
+            ],
+        }
+    return summaries
+
+
+def get_comment_summaries(
+    db: Session,
+    post_ids: list[str],
+    current_user_id: Optional[str] = None,
+    stats_map: Optional[dict[str, PostStats]] = None,
+) -> dict[str, dict]:
+    """Get commenter summaries for many posts at once.
+
+    A single query range-scans the thread paths below every post on the page
+    and yields distinct commenters.
+    """
+    if stats_map is None:
+        stats_map = get_post_stats_map(db, post_ids)
+
+    summaries: dict[str, dict] = {}
+    for post_id in post_ids:
+        stats = stats_map.get(post_id)
+        summaries[post_id] = {
+            "count": stats.commenter_count if stats else 0,
+            "names": [],
+            "me": False,
+        }
+    post_ids = [post_id for post_id in post_ids if summaries[post_id]["count"]]
+    if not post_ids:
+        return summaries
+
+    sql = text(f"""
+    SELECT DISTINCT p.id AS root_id, d.user_id, u.name, u.username
+    FROM post p
+    INNER JOIN post d ON {DESCENDANT_OF_SQL}
+    INNER JOIN "user" u ON d.user_id = u.id
+    WHERE p.id IN :post_ids
+    """).bindparams(bindparam("post_ids", value=list(post_ids), expanding=True))
+
+    for row in db.exec(sql).all():
+        summary = summaries[row.root_id]
+        summary["names"].append(row.name or row.username)
+        if current_user_id and row.user_id == current_user_id:
+            summary["me"] = True
+
+    return summaries
+
+
+def build_post_responses(
+    db: Session, posts: list[Post], current_user_id: Optional[str] = None
+) -> list[dict]:
+    """Build post response data for a page of posts.
+
+    Counters come from the post_stats rows of the page, and reaction flags and
+    commenter names are loaded for the whole page in a constant number of
+    grouped queries instead of per post.
+    """
+    post_ids = [post.id for post in posts]
+    stats_map = get_post_stats_map(db, post_ids)
+    reactions = get_reactions_summaries(db, post_ids, current_user_id, stats_map)
+    comments = get_comment_summaries(db, post_ids, current_user_id, stats_map)
+
+    responses = []
+    for post in posts:
+        stats = stats_map.get(post.id)
+        responses.append(
+            {
+                "id": post.id,
+                "content": post.content,
+                "type": post.type,
+                "user_id": post.user_id,
+                "channel_id": post.channel_id,
+                "parent_id": post.parent_id,
+                "root_id": post.root_id,
+                "depth": post.depth,
+                "is_pinned": post.is_pinned,
+                "user": post.user,
+                "channel": post.channel,
+                "medias": post.medias,
+                "created_at": post.created_at,
+                "updated_at": post.updated_at,
+                "comment_count": stats.comment_count if stats else 0,
+                "reaction_count": stats.reaction_count if stats else 0,
+                "reactions": reactions[post.id],
+                "comment_summary": comments[post.id],
+            }
+        )
+    return responses
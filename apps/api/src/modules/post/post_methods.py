@@ -1,43 +1,26 @@
-from collections import Counter
-from typing import List, Optional, cast
+from typing import List, Optional
 
 from fastapi import UploadFile
-from sqlalchemy import Column, desc, text
-from sqlalchemy.orm import joinedload
-from sqlmodel import Session, select
-
-from src.database.models import Channel, Media, Post, Reaction, User
-from src.modules.channels.channels_methods import is_member
+from sqlalchemy import ColumnElement, delete, desc, func, literal, not_, true, update
+from sqlalchemy.orm import aliased, joinedload
+from sqlmodel import Session, col, select
+
+from src.core.pagination import cursor_for, keyset_filter
+from src.database.models import Channel, Media, Post, PostStats, Reaction
+from src.modules.channels.channels_methods import (
+    visible_channel_filter,
+)
+from src.modules.post.post_feed import get_comment_summaries, get_reactions_summaries
+from src.modules.post.post_stats_methods import (
+    add_reply_stats,
+    get_ancestor_ids,
+    path_ids,
+    refresh_comment_stats,
+)
 from src.modules.storages.storage_methods import upload_file
 
-
-def filter_private_channel_posts(
-    posts: list[Post],
-    current_user_id: Optional[str] = None,
-    db: Optional[Session] = None,
-) -> list[Post]:
-    """Filter out posts from private channels where user is not a member."""
-    filtered_posts = []
-    for post in posts:
-        # If post has no channel, include it
-        if not post.channel_id:
-            filtered_posts.append(post)
-            continue
-
-        # If channel is public, include the post
-        if post.channel and post.channel.type != "private":
-            filtered_posts.append(post)
-            continue
-
-        # If channel is private and user is not provided, exclude the post
-        if not current_user_id or not db:
-            continue
-
-        # If channel is private, check if user is a member
-        if post.channel and is_member(db, post.channel_id, current_user_id):
-            filtered_posts.append(post)
-
-    return filtered_posts
+# Sort key of the feed, matching the ix_post_type_is_pinned_created_at_id index
+POST_FEED_KEYSET = (col(Post.is_pinned), col(Post.created_at), col(Post.id))
 
 
 def create_post(
@@ -46,6 +29,13 @@ def create_post(
     """Create a new post."""
     post = Post(**post_data)
     db.add(post)
+    db.add(PostStats(post_id=post.id))
+    db.flush()
+
+    # Keep the counters of every post above this reply in the same transaction
+    if post.parent_id:
+        add_reply_stats(db, post)
+
     db.commit()
     db.refresh(post)
 
@@ -79,43 +69,87 @@ def update_post(db: Session, post_id: str, update_data: dict) -> Optional[Post]:
     post = db.get(Post, post_id)
     if not post:
         return None
+    update_data = dict(update_data)
+    parent_id = update_data.pop("parent_id", post.parent_id)
+    recount_ids = []
+    if parent_id != post.parent_id:
+        recount_ids = _move_post_tree(db, post, parent_id)
     for key, value in update_data.items():
         setattr(post, key, value)
+    if recount_ids:
+        db.flush()
+        refresh_comment_stats(db, recount_ids)
     db.commit()
     db.refresh(post)
     return post
 
 
-def delete_post(db: Session, post_id: str) -> bool:
-    """Delete a post by ID."""
+def _move_post_tree(db: Session, post: Post, parent_id: Optional[str]) -> list[str]:
+    """Move a post and its replies under a new parent, without committing.
+
+    Returns the IDs of the old and new ancestors, whose counters need a recount.
+    """
+    parent = db.get(Post, parent_id) if parent_id else None
+    if parent_id and not parent:
+        raise ValueError("Parent post not found")
+    if parent and parent.path.startswith(post.path):
+        raise ValueError("A post cannot be moved under its own replies")
+
+    recount_ids = set(get_ancestor_ids(db, post.parent_id)) if post.parent_id else set()
+    new_path = f"{parent.path}{post.id}/" if parent else f"{post.id}/"
+    db.exec(
+        update(Post)
+        .where(col(Post.path) >= post.path, col(Post.path) < post.path + "~")
+        .values(
+            root_id=parent.root_id if parent else post.id,
+            path=new_path + func.substr(Post.path, len(post.path) + 1),
+            depth=Post.depth + (parent.depth + 1 if parent else 0) - post.depth,
+        )
+    )
+    post.parent_id = parent_id
+    if parent:
+        recount_ids.update(path_ids(parent.path))
+    return list(recount_ids)
+
+
+def delete_post(db: Session, post_id: str) -> Optional[dict[str, int]]:
+    """Delete a post with its whole reply tree, returning counts of removed rows."""
     post = db.get(Post, post_id)
     if not post:
-        return False
-
-    # Delete related media records first
-    from src.database.models import Media, Reaction
-
-    media_statement = select(Media).where(Media.post_id == post_id)
-    media_records = db.exec(media_statement).all()
-    for media in media_records:
-        db.delete(media)
-
-    # Delete related reactions
-    reaction_statement = select(Reaction).where(Reaction.post_id == post_id)
-    reaction_records = db.exec(reaction_statement).all()
-    for reaction in reaction_records:
-        db.delete(reaction)
-
-    # Delete all replies (nested posts) recursively
-    replies_statement = select(Post).where(Post.parent_id == post_id)
-    replies_records = db.exec(replies_statement).all()
-    for reply in replies_records:
-        # Recursively delete each reply and its children
-        delete_post(db, reply.id)
-
-    db.delete(post)
+        return None
+
+    parent_id = post.parent_id
+    counts = delete_post_trees(db, col(Post.id) == post_id)
+
+    # Recount the thread above the removed subtree before committing
+    if parent_id:
+        refresh_comment_stats(db, get_ancestor_ids(db, parent_id))
+
     db.commit()
-    return True
+    return counts
+
+
+def delete_post_trees(db: Session, roots: ColumnElement[bool]) -> dict[str, int]:
+    """Bulk delete the posts matching a condition with all their replies, media
+    and reactions, without committing.
+
+    The subtree is collected with one recursive CTE; stats rows go with their
+    posts through ON DELETE CASCADE.
+    """
+    tree = select(Post.id).where(roots).cte("post_tree", recursive=True)
+    tree = tree.union(select(Post.id).join(tree, col(Post.parent_id) == tree.c.id))
+    post_ids = list(db.exec(select(tree.c.id)).all())
+    if not post_ids:
+        return {"posts": 0, "media": 0, "reactions": 0}
+
+    media = db.exec(delete(Media).where(col(Media.post_id).in_(post_ids)))
+    reactions = db.exec(delete(Reaction).where(col(Reaction.post_id).in_(post_ids)))
+    posts = db.exec(delete(Post).where(col(Post.id).in_(post_ids)))
+    return {
+        "posts": posts.rowcount,
+        "media": media.rowcount,
+        "reactions": reactions.rowcount,
+    }
 
 
 def get_posts_by_user(
@@ -127,11 +161,13 @@ def get_posts_by_user(
         .options(
             joinedload(Post.user), joinedload(Post.channel), joinedload(Post.medias)
         )
-        .where(Post.user_id == user_id)
+        .where(
+            Post.user_id == user_id,
+            visible_channel_filter(Post.channel_id, current_user_id),
+        )
         .order_by(desc(Post.created_at))
     )  # type: ignore
-    all_posts = list(db.exec(statement).unique().all())
-    return filter_private_channel_posts(all_posts, current_user_id, db)
+    return list(db.exec(statement).unique().all())
 
 
 def get_posts_by_type(
@@ -143,11 +179,13 @@ def get_posts_by_type(
         .options(
             joinedload(Post.user), joinedload(Post.channel), joinedload(Post.medias)
         )
-        .where(Post.type == post_type)
+        .where(
+            Post.type == post_type,
+            visible_channel_filter(Post.channel_id, current_user_id),
+        )
         .order_by(desc(Post.created_at))
     )  # type: ignore
-    all_posts = list(db.exec(statement).all())
-    return filter_private_channel_posts(all_posts, current_user_id, db)
+    return list(db.exec(statement).unique().all())
 
 
 def get_posts_by_parent_id(db: Session, parent_id: str) -> list[Post]:
@@ -164,97 +202,177 @@ def get_posts_by_parent_id(db: Session, parent_id: str) -> list[Post]:
     return posts
 
 
-def get_all_nested_posts_by_parent_id(
+def get_reply_tree(
+    db: Session,
+    parent_id: str,
+    current_user_id: Optional[str] = None,
+    limit: int = 20,
+    depth: int = 3,
+    replies_limit: int = 5,
+    cursor: Optional[str] = None,
+) -> list[dict]:
+    """Get a page of replies to a post, nested at most `depth` levels deep.
+
+    The recursive CTE cuts every level with a LATERAL subquery holding at most
+    `replies_limit` rows per node plus one look-ahead row, so the fetch is
+    bounded by the limits instead of the thread size. Nodes whose replies were
+    cut carry `has_more_replies` and a `replies_cursor` to load the rest.
+    """
+
+    def reply_order(post) -> tuple:
+        return desc(post.is_pinned), desc(post.created_at), desc(post.id)
+
+    top = (
+        select(
+            Post.id,
+            Post.parent_id,
+            literal(1).label("depth"),
+            (func.row_number().over(order_by=reply_order(Post)) > limit).label(
+                "is_extra"
+            ),
+        )
+        .where(
+            Post.parent_id == parent_id,
+            visible_channel_filter(Post.channel_id, current_user_id),
+        )
+        .order_by(*reply_order(Post))
+        .limit(limit + 1)
+    )
+    if cursor:
+        top = top.where(keyset_filter(POST_FEED_KEYSET, cursor))
+    tree = top.cte("reply_tree", recursive=True)
+
+    reply = aliased(Post)
+    children = (
+        select(
+            reply.id,
+            reply.parent_id,
+            (func.row_number().over(order_by=reply_order(reply)) > replies_limit).label(
+                "is_extra"
+            ),
+        )
+        .where(
+            reply.parent_id == tree.c.id,
+            visible_channel_filter(reply.channel_id, current_user_id),
+        )
+        .order_by(*reply_order(reply))
+        .limit(replies_limit + 1)
+        .lateral("children")
+    )
+    tree = tree.union_all(
+        select(
+            children.c.id,
+            children.c.parent_id,
+            tree.c.depth + 1,
+            children.c.is_extra,
+        )
+        .select_from(tree)
+        .join(children, true())
+        .where(tree.c.depth < depth, not_(tree.c.is_extra))
+    )
+    rows = db.exec(
+        select(tree.c.id, tree.c.parent_id, tree.c.depth, tree.c.is_extra)
+    ).all()
+
+    node_rows = [row for row in rows if not row.is_extra]
+    statement = (
+        select(Post)
+        .options(
+            joinedload(Post.user), joinedload(Post.channel), joinedload(Post.medias)
+        )
+        .where(col(Post.id).in_([row.id for row in node_rows]))
+    )
+    posts = {post.id: post for post in db.exec(statement).unique().all()}
+    nodes = {
+        row.id: {
+            "post": posts[row.id],
+            "replies": [],
+            "has_more_replies": False,
+            "replies_cursor": None,
+        }
+        for row in node_rows
+        if row.id in posts
+    }
+
+    # Posts at the depth limit were not expanded, so look up whether they have replies
+    leaf_ids = [row.id for row in node_rows if row.depth == depth]
+    if leaf_ids:
+        statement = (
+            select(Post.parent_id).where(col(Post.parent_id).in_(leaf_ids)).distinct()
+        )
+        for leaf_id in db.exec(statement).all():
+            if leaf_id in nodes:
+                nodes[leaf_id]["has_more_replies"] = True
+
+    roots = []
+    for node in sorted(
+        nodes.values(),
+        key=lambda node: tuple(getattr(node["post"], c.key) for c in POST_FEED_KEYSET),
+        reverse=True,
+    ):
+        parent = nodes.get(node["post"].parent_id)
+        (parent["replies"] if parent else roots).append(node)
+
+    # A look-ahead row means its parent has replies beyond the loaded ones
+    for row in rows:
+        parent = nodes.get(row.parent_id)
+        if row.is_extra and parent:
+            parent["has_more_replies"] = True
+            if parent["replies"]:
+                parent["replies_cursor"] = cursor_for(
+                    parent["replies"][-1]["post"], POST_FEED_KEYSET
+                )
+    return roots
+
+
+def get_all_replies(
     db: Session, parent_id: str, current_user_id: Optional[str] = None
 ) -> list[Post]:
-    from src.database.models import PostType, Role
-
-    # Recursive CTE to fetch all nested replies for a given parent post
-    # This query builds a hierarchical tree of all comments/replies starting from the specified parent_id
-    # 1. Base case: Get direct replies to the parent post (depth = 0)
-    # 2. Recursive case: Get replies to each reply, incrementing depth level
-    # 3. Join with user table to get author information for each post
-    # 4. Join with media table to get media files for each post
-    # 5. Order by parent creation time first, then by reply creation time to maintain hierarchy
-    sql = """
-    WITH RECURSIVE reply_tree AS (
-        -- Base case: Get direct replies to the parent post
-        SELECT p.id, p.parent_id, p.created_at, p.is_pinned, p.updated_at, p.content, p.type, p.user_id, p.channel_id, 1 as depth,
-               CAST((CASE WHEN p.is_pinned THEN 1 ELSE 0 END) AS TEXT) || '/' ||
-               CAST(2147483647 - EXTRACT(EPOCH FROM p.created_at) AS TEXT) as sort_path
-        FROM post p
-        WHERE p.parent_id = :parent_id
-        UNION ALL
-        -- Recursive case: Get replies to any reply in the tree
-        SELECT p.id, p.parent_id, p.created_at, p.is_pinned, p.updated_at, p.content, p.type, p.user_id, p.channel_id, rt.depth + 1,
-               rt.sort_path || '/' || CAST(EXTRACT(EPOCH FROM p.created_at) AS TEXT)
-        FROM post p
-        INNER JOIN reply_tree rt ON p.parent_id = rt.id
-    )
-    SELECT rt.*,
-           u.id as user_id, u.username, u.name, u.bio, u.email, u.is_active, u.is_verified, u.avatar_url, u.role, u.created_at as user_created_at, u.updated_at as user_updated_at,
-           m.id as media_id, m.url as media_url, m.user_id as media_user_id, m.created_at as media_created_at, m.updated_at as media_updated_at
-    FROM reply_tree rt
-    LEFT JOIN "user" u ON rt.user_id = u.id
-    LEFT JOIN media m ON rt.id = m.post_id
-    ORDER BY rt.sort_path ASC;
+    """Get every reply below a post, depth-first, each followed by its own replies.
+
+    Unbounded, for the legacy /posts/?parent_id= listing; get_reply_tree loads
+    large threads a page at a time. Descendants are found with one range scan
+    over the thread paths, and posts, users and media are loaded once per post.
     """
-    result = db.exec(text(sql).bindparams(parent_id=parent_id))
-
-    # Group results by post to handle multiple media per post
-    posts_dict = {}
-    for row in result.all():
-        post_id = row.id
-
-        # Create user object if not already created
-        user = None
-        if row.user_id:
-            user_dict = {
-                "id": row.user_id,
-                "username": row.username,
-                "name": row.name,
-                "bio": row.bio,
-                "email": row.email,
-                "is_active": row.is_active,
-                "is_verified": row.is_verified,
-                "avatar_url": row.avatar_url,
-                "role": Role(row.role.lower()) if row.role else Role.USER,
-                "created_at": row.user_created_at,
-                "updated_at": row.user_updated_at,
-            }
-            user = User(**user_dict)
-
-        # Create post if not already created
-        if post_id not in posts_dict:
-            post_dict = {
-                "id": row.id,
-                "parent_id": row.parent_id,
-                "created_at": row.created_at,
-                "updated_at": row.updated_at,
-                "content": row.content,
-                "type": PostType(row.type.lower()),
-                "user_id": row.user_id,
-                "channel_id": row.channel_id,
-                "user": user,
-                "medias": [],
-            }
-            posts_dict[post_id] = Post(**post_dict)
-
-        # Add media if present
-        if row.media_id:
-            media_dict = {
-                "id": row.media_id,
-                "url": row.media_url,
-                "post_id": post_id,
-                "user_id": row.media_user_id,
-                "created_at": row.media_created_at,
-                "updated_at": row.media_updated_at,
-            }
-            posts_dict[post_id].medias.append(Media(**media_dict))
-
-    # Convert to list and sort by creation time to show newest first
-    all_posts = list(posts_dict.values())
-    return filter_private_channel_posts(all_posts, current_user_id, db)
+    path = db.exec(select(Post.path).where(Post.id == parent_id)).first()
+    if not path:
+        return []
+    statement = (
+        select(Post)
+        .options(
+            joinedload(Post.user), joinedload(Post.channel), joinedload(Post.medias)
+        )
+        .where(
+            col(Post.path) > path,
+            col(Post.path) < path + "~",
+            visible_channel_filter(Post.channel_id, current_user_id),
+        )
+    )
+    children: dict[str, list[Post]] = {}
+    for post in sorted(
+        db.exec(statement).unique().all(),
+        key=lambda post: tuple(getattr(post, c.key) for c in POST_FEED_KEYSET),
+        reverse=True,
+    ):
+        children.setdefault(post.parent_id, []).append(post)
+
+    # Walk from the parent, so replies below hidden posts stay hidden too
+    posts = []
+    stack = children.get(parent_id, [])[::-1]
+    while stack:
+        post = stack.pop()
+        posts.append(post)
+        stack.extend(children.get(post.id, [])[::-1])
+    return posts
+
+
+def flatten_reply_tree(nodes: list[dict]) -> list[Post]:
+    """List the posts of a reply tree depth-first, each followed by its replies."""
+    posts = []
+    for node in nodes:
+        posts.append(node["post"])
+        posts.extend(flatten_reply_tree(node["replies"]))
+    return posts
 
 
 def get_posts_by_channel_slug(db: Session, channel_slug: str) -> list[Post]:
@@ -273,67 +391,45 @@ def get_posts_by_channel_slug(db: Session, channel_slug: str) -> list[Post]:
 
 
 def get_all_posts(
-    db: Session, skip: int = 0, limit: int = 100, current_user_id: Optional[str] = None
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    current_user_id: Optional[str] = None,
+    cursor: Optional[str] = None,
 ) -> list[Post]:
-    """Get all posts with pagination, filtering out private channel posts for non-members."""
+    """Get all posts with pagination, filtering out private channel posts for non-members.
+
+    A cursor from a previous page seeks directly to the next rows instead of
+    scanning and discarding `skip` rows.
+    """
     statement = (
         select(Post)
         .options(
             joinedload(Post.user), joinedload(Post.channel), joinedload(Post.medias)
         )  # type: ignore
-        .where(Post.type == "post")
-        .order_by(desc(Post.is_pinned), desc(Post.created_at))
-        .offset(skip)
-        .limit(limit)
+        .where(
+            Post.type == "post",
+            visible_channel_filter(Post.channel_id, current_user_id),
+        )
+        .order_by(desc(Post.is_pinned), desc(Post.created_at), desc(Post.id))
     )
-    all_posts = list(db.exec(statement).unique().all())
-    return filter_private_channel_posts(all_posts, current_user_id, db)
+    if cursor:
+        statement = statement.where(keyset_filter(POST_FEED_KEYSET, cursor))
+    else:
+        statement = statement.offset(skip)
+    statement = statement.limit(limit)
+    return list(db.exec(statement).unique().all())
 
 
 def get_reactions_summary(
     db: Session, post_id: str, current_user_id: Optional[str] = None
 ) -> dict:
     """Get reactions summary for a post."""
-    reactions = db.exec(select(Reaction).where(Reaction.post_id == post_id)).all()
-    emoji_counts = Counter(r.emoji for r in reactions)
-    user_reactions = {r.emoji for r in reactions if r.user_id == current_user_id}
-
-    summary = [
-        {"emoji": emoji, "count": count, "me": emoji in user_reactions}
-        for emoji, count in emoji_counts.items()
-    ]
-
-    user_reaction_ids = (
-        [f"{current_user_id}_emoji_{emoji}" for emoji in user_reactions]
-        if current_user_id
-        else []
-    )
-
-    return {"summary": summary, "user_reaction_ids": user_reaction_ids}
+    return get_reactions_summaries(db, [post_id], current_user_id)[post_id]
 
 
 def get_comment_summary(
     db: Session, post_id: str, current_user_id: Optional[str] = None
 ) -> dict:
     """Get comment summary for a post."""
-    sql = """
-    WITH RECURSIVE rt AS (
-        SELECT id, user_id FROM post WHERE parent_id = :post_id
-        UNION ALL
-        SELECT p.id, p.user_id FROM post p INNER JOIN rt ON p.parent_id = rt.id
-    )
-    SELECT DISTINCT user_id FROM rt WHERE user_id IS NOT NULL
-    """
-    result = db.exec(text(sql).bindparams(post_id=post_id))
-    user_ids = [row.user_id for row in result.all()]
-
-    if not user_ids:
-        return {"count": 0, "names": []}
-
-    user_id_col = cast(Column, User.id)
-    users = db.exec(select(User).where(user_id_col.in_(user_ids))).all()
-    names = [user.name or user.username for user in users]
-
-    me = current_user_id in user_ids if current_user_id else False
-
-    return {"count": len(names), "names": names, "me": me}
+    return get_comment_summaries(db, [post_id], current_user_id)[post_id]
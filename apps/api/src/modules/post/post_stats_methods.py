@@ -0,0 +1,244 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, func, select
+
+from src.core.common import generate_id
+from src.database.models import Post, PostStats, Reaction
+
+# Descendants of a post p are the posts d whose path extends p's path. Paths use
+# the C collation and IDs are hex, so they all sort between p.path and p.path || '~'
+DESCENDANT_OF_SQL = "d.path > p.path AND d.path < p.path || '~'"
+
+
+def get_ancestor_ids(db: Session, post_id: str) -> list[str]:
+    """Get the ID of a post and of every post above it in its thread."""
+    path = db.exec(select(Post.path).where(Post.id == post_id)).first()
+    return path_ids(path)[::-1] if path else []
+
+
+def path_ids(path: str) -> list[str]:
+    """Split a materialized thread path into post IDs, root first."""
+    return path.rstrip("/").split("/")
+
+
+def ensure_post_stats(db: Session, post_ids: list[str]) -> None:
+    """Create empty stats rows for any of the given posts that lack one."""
+    if not post_ids:
+        return
+    now = datetime.now(timezone.utc)
+    statement = (
+        insert(PostStats)
+        .values(
+            [
+                {
+                    "id": generate_id(),
+                    "created_at": now,
+                    "updated_at": now,
+                    "post_id": post_id,
+                    "comment_count": 0,
+                    "commenter_count": 0,
+                    "reaction_count": 0,
+                    "reaction_counts": {},
+                }
+                for post_id in post_ids
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=["post_id"])
+    )
+    db.exec(statement)
+
+
+def get_post_stats_map(db: Session, post_ids: list[str]) -> dict[str, PostStats]:
+    """Get the stats rows for many posts keyed by post ID."""
+    if not post_ids:
+        return {}
+    statement = (
+        select(PostStats)
+        .where(col(PostStats.post_id).in_(post_ids))
+        .execution_options(populate_existing=True)
+    )
+    return {stats.post_id: stats for stats in db.exec(statement).all()}
+
+
+def get_reaction_counts(db: Session, post_ids: list[str]) -> dict[str, dict]:
+    """Count reactions per emoji for many posts, in first-reacted order."""
+    counts: dict[str, dict] = {post_id: {} for post_id in post_ids}
+    if not post_ids:
+        return counts
+    statement = (
+        select(Reaction.post_id, Reaction.emoji, func.count(col(Reaction.id)))
+        .where(col(Reaction.post_id).in_(post_ids))
+        .group_by(Reaction.post_id, Reaction.emoji)
+        .order_by(func.min(Reaction.created_at))
+    )
+    for post_id, emoji, count in db.exec(statement).all():
+        counts[post_id][emoji] = count
+    return counts
+
+
+def get_comment_counts(db: Session, post_ids: list[str]) -> dict[str, tuple[int, int]]:
+    """Count descendant replies and distinct repliers for many posts at once."""
+    counts: dict[str, tuple[int, int]] = {post_id: (0, 0) for post_id in post_ids}
+    if not post_ids:
+        return counts
+    sql = text(f"""
+    SELECT p.id AS root_id, COUNT(*) AS comment_count, COUNT(DISTINCT d.user_id) AS commenter_count
+    FROM post p
+    INNER JOIN post d ON {DESCENDANT_OF_SQL}
+    WHERE p.id IN :post_ids
+    GROUP BY p.id
+    """).bindparams(bindparam("post_ids", value=list(post_ids), expanding=True))
+    for row in db.exec(sql).all():
+        counts[row.root_id] = (row.comment_count, row.commenter_count)
+    return counts
+
+
+def lock_post_stats(db: Session, post_ids: list[str]) -> dict[str, PostStats]:
+    """Lock the stats rows of the given posts, creating missing ones first.
+
+    Rows are locked in post ID order, so concurrent writers to one thread
+    queue up instead of deadlocking. Counts read after this see every reply
+    committed by the writers that held the locks before.
+    """
+    if not post_ids:
+        return {}
+    ensure_post_stats(db, post_ids)
+    statement = (
+        select(PostStats)
+        .where(col(PostStats.post_id).in_(post_ids))
+        .order_by(col(PostStats.post_id))
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    return {stats.post_id: stats for stats in db.exec(statement).all()}
+
+
+def refresh_comment_stats(db: Session, post_ids: list[str]) -> None:
+    """Recompute comment and commenter counts for the given posts.
+
+    Used when replies are removed or moved; the affected posts are locked and
+    then recounted in a single grouped query.
+    """
+    if not post_ids:
+        return
+    stats_map = lock_post_stats(db, post_ids)
+    counts = get_comment_counts(db, post_ids)
+    for post_id, stats in stats_map.items():
+        stats.comment_count, stats.commenter_count = counts[post_id]
+        db.add(stats)
+    db.flush()
+
+
+def add_reply_stats(db: Session, reply: Post) -> None:
+    """Count a new, flushed reply in the stats of every post above it.
+
+    Comment counts are incremented; an ancestor gains a commenter only when the
+    reply's author has no other reply below it, which is checked after the
+    locks are held so concurrent first replies by one user count once.
+    """
+    ancestor_ids = path_ids(reply.path)[:-1]
+    if not ancestor_ids:
+        return
+    stats_map = lock_post_stats(db, ancestor_ids)
+    sql = text(f"""
+    SELECT p.id
+    FROM post p
+    WHERE p.id IN :post_ids AND NOT EXISTS (
+        SELECT 1 FROM post d
+        WHERE d.user_id = :user_id AND d.id <> :reply_id AND {DESCENDANT_OF_SQL}
+    )
+    """).bindparams(
+        bindparam("post_ids", value=ancestor_ids, expanding=True),
+        user_id=reply.user_id,
+        reply_id=reply.id,
+    )
+    new_commenter_ids = set(db.exec(sql).scalars().all())
+    for post_id, stats in stats_map.items():
+        stats.comment_count += 1
+        if post_id in new_commenter_ids:
+            stats.commenter_count += 1
+        db.add(stats)
+    db.flush()
+
+
+def apply_reaction_change(
+    db: Session,
+    post_id: str,
+    added_emoji: Optional[str] = None,
+    removed_emoji: Optional[str] = None,
+) -> PostStats:
+    """Adjust the reaction counters of a post inside the caller's transaction."""
+    ensure_post_stats(db, [post_id])
+    stats = db.exec(
+        select(PostStats)
+        .where(PostStats.post_id == post_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).one()
+
+    counts = dict(stats.reaction_counts or {})
+    if removed_emoji and removed_emoji in counts:
+        counts[removed_emoji] -= 1
+        if counts[removed_emoji] <= 0:
+            del counts[removed_emoji]
+    if added_emoji:
+        counts[added_emoji] = counts.get(added_emoji, 0) + 1
+
+    stats.reaction_counts = counts
+    stats.reaction_count = sum(counts.values())
+    db.add(stats)
+    db.flush()
+    return stats
+
+
+def refresh_post_stats(db: Session, post_ids: list[str]) -> None:
+    """Recompute every counter for the given posts from the source tables."""
+    if not post_ids:
+        return
+    refresh_comment_stats(db, post_ids)
+    reaction_counts = get_reaction_counts(db, post_ids)
+    for post_id, stats in get_post_stats_map(db, post_ids).items():
+        stats.reaction_counts = reaction_counts[post_id]
+        stats.reaction_count = sum(reaction_counts[post_id].values())
+        db.add(stats)
+    db.flush()
+
+
+def rebuild_post_stats(db: Session, batch_size: int = 500) -> int:
+    """Backfill or repair the stats of every post, one batch at a time."""
+    rebuilt = 0
+    last_id: Optional[str] = None
+    while True:
+        statement = select(Post.id).order_by(col(Post.id)).limit(batch_size)
+        if last_id is not None:
+            statement = statement.where(col(Post.id) > last_id)
+        post_ids = list(db.exec(statement).all())
+        if not post_ids:
+            break
+
+        refresh_post_stats(db, post_ids)
+        db.commit()
+
+        rebuilt += len(post_ids)
+        last_id = post_ids[-1]
+    return rebuilt
+
+
+def get_post_ids_with_reactions_by_user(db: Session, user_id: str) -> list[str]:
+    """Get the IDs of posts a user has reacted to."""
+    statement = select(Reaction.post_id).where(Reaction.user_id == user_id).distinct()
+    return list(db.exec(statement).all())
+
+
+def get_thread_ids_above_replies_by_user(db: Session, user_id: str) -> list[str]:
+    """Get the IDs of every post above the replies a user has written."""
+    statement = select(Post.path).where(
+        Post.user_id == user_id, col(Post.parent_id).is_not(None)
+    )
+    thread_ids: set[str] = set()
+    for path in db.exec(statement).all():
+        thread_ids.update(path_ids(path)[:-1])
+    return list(thread_ids)
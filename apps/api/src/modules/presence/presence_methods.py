@@ -0,0 +1,385 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Float,
+    String,
+    cast,
+    delete,
+    func,
+    insert,
+    text,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql import column
+from sqlmodel import Session, col, select
+
+from src.core.common import generate_id
+from src.database.models import (
+    PresenceDailyRollup,
+    PresenceDailyUser,
+    PresenceHourlyRollup,
+    UserPresence,
+)
+
+# Rows per upsert statement, well below Postgres' bind parameter limit
+ROLLUP_BATCH_SIZE = 1000
+
+
+def utc_now() -> datetime:
+    # Timestamp columns are naive UTC, which asyncpg only accepts as naive values
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def insert_presences(db: Session, sessions: list[dict]) -> int:
+    """Insert presence rows for opened connections in one statement.
+
+    Each session has user_id, connection_id and connected_at, plus
+    disconnected_at and duration_seconds when it already closed.
+    """
+    if not sessions:
+        return 0
+    now = utc_now()
+    db.exec(
+        insert(UserPresence).values(
+            [
+                {
+                    "id": generate_id(),
+                    "created_at": now,
+                    "updated_at": now,
+                    "disconnected_at": None,
+                    "duration_seconds": None,
+                    "last_seen_at": session["connected_at"],
+                    **session,
+                }
+                for session in sessions
+            ]
+        )
+    )
+    return len(sessions)
+
+
+def close_presences(db: Session, sessions: list[dict]) -> int:
+    """Record the disconnect of several connections in one UPDATE ... FROM VALUES."""
+    if not sessions:
+        return 0
+    closed = values(
+        column("connection_id", String),
+        column("disconnected_at", DateTime(timezone=True)),
+        column("duration_seconds", Float),
+        name="closed",
+    ).data(
+        [
+            (
+                session["connection_id"],
+                session["disconnected_at"],
+                session["duration_seconds"],
+            )
+            for session in sessions
+        ]
+    )
+    return db.exec(
+        update(UserPresence)
+        .where(col(UserPresence.connection_id) == closed.c.connection_id)
+        .values(
+            disconnected_at=closed.c.disconnected_at,
+            duration_seconds=closed.c.duration_seconds,
+            updated_at=utc_now(),
+        )
+    ).rowcount
+
+
+def touch_presences(db: Session, connection_ids: list[str]) -> int:
+    """Mark the open sessions of live connections as seen now.
+
+    Only last_seen_at moves, so long-lived sessions do not look changed to the
+    rollups on every sweep.
+    """
+    if not connection_ids:
+        return 0
+    return db.exec(
+        update(UserPresence)
+        .where(col(UserPresence.connection_id).in_(connection_ids))
+        .where(col(UserPresence.disconnected_at).is_(None))
+        .values(last_seen_at=datetime.now(timezone.utc))
+    ).rowcount
+
+
+def close_stale_presences(db: Session, cutoff: datetime) -> int:
+    """Close open sessions not seen since the cutoff, ending them when last seen.
+
+    These are left behind by processes that stopped without recording their
+    disconnects; live sessions are touched on every presence sweep.
+    """
+    # Bump updated_at so the next rollup picks up the closed sessions
+    return db.exec(
+        text(
+            """
+            UPDATE user_presence
+            SET disconnected_at = COALESCE(last_seen_at, connected_at),
+                updated_at = now() AT TIME ZONE 'UTC',
+                duration_seconds = GREATEST(
+                    EXTRACT(EPOCH FROM COALESCE(last_seen_at, connected_at) - connected_at),
+                    0
+                )
+            WHERE disconnected_at IS NULL
+                AND COALESCE(last_seen_at, connected_at) < :cutoff
+            """
+        ),
+        params={"cutoff": cutoff.astimezone(timezone.utc)},
+    ).rowcount
+
+
+def utc_trunc(unit: str, column):
+    """Truncate a timestamptz column to the start of its UTC hour, day or week."""
+    return func.date_trunc(unit, func.timezone("UTC", column))
+
+
+def retention_horizon(days: int) -> datetime:
+    """Start of the oldest UTC day whose raw presence rows are kept."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    return datetime.combine(cutoff.date(), time(), tzinfo=timezone.utc)
+
+
+def get_rollup_watermark(db: Session) -> datetime | None:
+    """When the presence rollups were last updated."""
+    updated_at = db.exec(select(func.max(PresenceDailyRollup.updated_at))).one()
+    return updated_at.replace(tzinfo=timezone.utc) if updated_at else None
+
+
+def _upsert(db: Session, model, rows: list[dict], index_elements: list[str]):
+    """Insert rows in batches, overwriting the other columns of existing keys."""
+    if not rows:
+        return
+    now = utc_now()
+    updated = [name for name in rows[0] if name not in index_elements]
+    for start in range(0, len(rows), ROLLUP_BATCH_SIZE):
+        statement = pg_insert(model).values(
+            [
+                {"id": generate_id(), "created_at": now, "updated_at": now, **row}
+                for row in rows[start : start + ROLLUP_BATCH_SIZE]
+            ]
+        )
+        if updated:
+            statement = statement.on_conflict_do_update(
+                index_elements=index_elements,
+                set_={name: statement.excluded[name] for name in updated}
+                | {"updated_at": now},
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=index_elements)
+        db.exec(statement)
+
+
+def _session_totals(bucket):
+    return select(
+        bucket,
+        func.count(UserPresence.id),
+        func.count(UserPresence.duration_seconds),
+        func.count(func.distinct(UserPresence.user_id)),
+        func.coalesce(func.sum(UserPresence.duration_seconds), 0),
+    )
+
+
+def rollup_presences(
+    db: Session, since: datetime, horizon: datetime | None = None
+) -> int:
+    """Recompute the hourly and daily rollups of days with sessions changed since a time.
+
+    Only the UTC days that sessions opened or closed since then began on are
+    recomputed from the raw rows, skipping days before the retention horizon
+    where raw rows may already be pruned. Returns the hourly buckets written.
+    """
+    day = cast(utc_trunc("day", UserPresence.connected_at), Date).label("day")
+    changed = select(day).where(
+        UserPresence.updated_at >= since.astimezone(timezone.utc).replace(tzinfo=None)
+    )
+    if horizon:
+        changed = changed.where(col(UserPresence.connected_at) >= horizon)
+    changed_days = sorted(db.exec(changed.distinct()).all())
+    if not changed_days:
+        return 0
+    start = datetime.combine(changed_days[0], time(), tzinfo=timezone.utc)
+    in_range = (col(UserPresence.connected_at) >= start) & day.in_(changed_days)
+
+    hour = utc_trunc("hour", UserPresence.connected_at).label("bucket")
+    hourly = db.exec(_session_totals(hour).where(in_range).group_by(hour)).all()
+    _upsert(
+        db,
+        PresenceHourlyRollup,
+        [
+            {
+                "bucket_start": bucket.replace(tzinfo=timezone.utc),
+                "session_count": sessions,
+                "closed_session_count": closed,
+                "unique_users": users,
+                "total_duration_seconds": duration,
+            }
+            for bucket, sessions, closed, users, duration in hourly
+        ],
+        ["bucket_start"],
+    )
+
+    daily = db.exec(_session_totals(day).where(in_range).group_by(day)).all()
+    _upsert(
+        db,
+        PresenceDailyRollup,
+        [
+            {
+                "day": bucket,
+                "session_count": sessions,
+                "closed_session_count": closed,
+                "unique_users": users,
+                "total_duration_seconds": duration,
+            }
+            for bucket, sessions, closed, users, duration in daily
+        ],
+        ["day"],
+    )
+
+    daily_users = db.exec(
+        select(day, UserPresence.user_id).where(in_range).distinct()
+    ).all()
+    _upsert(
+        db,
+        PresenceDailyUser,
+        [{"day": bucket, "user_id": user_id} for bucket, user_id in daily_users],
+        ["day", "user_id"],
+    )
+    return len(hourly)
+
+
+def prune_presences(db: Session, horizon: datetime) -> int:
+    """Delete closed raw sessions that started before the retention horizon."""
+    return db.exec(
+        delete(UserPresence).where(
+            col(UserPresence.connected_at) < horizon,
+            col(UserPresence.disconnected_at).is_not(None),
+        )
+    ).rowcount
+
+
+def get_presence_totals(db: Session) -> dict:
+    """All-time session totals from the daily rollups."""
+    sessions, closed, duration = db.exec(
+        select(
+            func.coalesce(func.sum(PresenceDailyRollup.session_count), 0),
+            func.coalesce(func.sum(PresenceDailyRollup.closed_session_count), 0),
+            func.coalesce(func.sum(PresenceDailyRollup.total_duration_seconds), 0),
+        )
+    ).one()
+    unique_users = db.exec(
+        select(func.count(func.distinct(PresenceDailyUser.user_id)))
+    ).one()
+    return {
+        "total_sessions": sessions,
+        "average_duration_seconds": round(duration / closed, 2) if closed else 0,
+        "unique_users": unique_users,
+    }
+
+
+def _series_row(bucket: datetime, sessions: int, users: int, duration: float) -> dict:
+    return {
+        "timestamp": bucket.isoformat(),
+        "session_count": sessions,
+        "unique_users": users,
+        "total_duration_seconds": round(duration, 2),
+        "average_duration_seconds": round(duration / sessions, 2) if sessions else 0,
+    }
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time(), tzinfo=timezone.utc)
+
+
+def get_presence_series(
+    db: Session, interval: str, start: datetime, end: datetime
+) -> list[dict]:
+    """Sessions per UTC hour, day or week (starting Monday) from the rollups.
+
+    Buckets are included when they start between the bucket holding start and end.
+    """
+    start, end = start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+    if interval == "hour":
+        rows = db.exec(
+            select(
+                PresenceHourlyRollup.bucket_start,
+                PresenceHourlyRollup.session_count,
+                PresenceHourlyRollup.unique_users,
+                PresenceHourlyRollup.total_duration_seconds,
+            )
+            .where(
+                col(PresenceHourlyRollup.bucket_start)
+                >= start.replace(minute=0, second=0, microsecond=0),
+                col(PresenceHourlyRollup.bucket_start) <= end,
+            )
+            .order_by(PresenceHourlyRollup.bucket_start)
+        ).all()
+        return [
+            _series_row(bucket.astimezone(timezone.utc), *totals)
+            for bucket, *totals in rows
+        ]
+
+    if interval == "day":
+        rows = db.exec(
+            select(
+                PresenceDailyRollup.day,
+                PresenceDailyRollup.session_count,
+                PresenceDailyRollup.unique_users,
+                PresenceDailyRollup.total_duration_seconds,
+            )
+            .where(
+                col(PresenceDailyRollup.day) >= start.date(),
+                col(PresenceDailyRollup.day) <= end.date(),
+            )
+            .order_by(PresenceDailyRollup.day)
+        ).all()
+        return [_series_row(_day_start(day), *totals) for day, *totals in rows]
+
+    # Weekly unique users come from the per-day user sets, as they can't be summed
+    first_day = start.date() - timedelta(days=start.weekday())
+
+    def week_of(day_column):
+        return cast(func.date_trunc("week", cast(day_column, DateTime)), Date)
+
+    rollup_week = week_of(PresenceDailyRollup.day).label("week")
+    sessions = (
+        select(
+            rollup_week,
+            func.sum(PresenceDailyRollup.session_count).label("session_count"),
+            func.sum(PresenceDailyRollup.total_duration_seconds).label("duration"),
+        )
+        .where(
+            col(PresenceDailyRollup.day) >= first_day,
+            col(PresenceDailyRollup.day) <= end.date(),
+        )
+        .group_by(rollup_week)
+        .subquery()
+    )
+    user_week = week_of(PresenceDailyUser.day).label("week")
+    users = (
+        select(
+            user_week,
+            func.count(func.distinct(PresenceDailyUser.user_id)).label("unique_users"),
+        )
+        .where(
+            col(PresenceDailyUser.day) >= first_day,
+            col(PresenceDailyUser.day) <= end.date(),
+        )
+        .group_by(user_week)
+        .subquery()
+    )
+    rows = db.exec(
+        select(
+            sessions.c.week,
+            sessions.c.session_count,
+            func.coalesce(users.c.unique_users, 0),
+            sessions.c.duration,
+        )
+        .outerjoin(users, users.c.week == sessions.c.week)
+        .order_by(sessions.c.week)
+    ).all()
+    return [_series_row(_day_start(week), *totals) for week, *totals in rows]
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlmodel import Session
+
+from src.core.celery_app import celery_app
+from src.core.settings import settings
+from src.database.engine import engine
+from src.modules.presence.presence_methods import (
+    get_rollup_watermark,
+    prune_presences,
+    retention_horizon,
+    rollup_presences,
+)
+
+
+@celery_app.task
+def compact_presence_task():
+    """Roll changed presence sessions into the rollups, then prune old raw rows."""
+    with Session(engine) as db:
+        try:
+            # Overlap the previous run, so sessions committed while it ran are included
+            watermark = get_rollup_watermark(db)
+            since = (
+                watermark - timedelta(seconds=settings.PRESENCE_ROLLUP_INTERVAL_SECONDS)
+                if watermark
+                else datetime.min.replace(tzinfo=timezone.utc)
+            )
+            horizon = retention_horizon(settings.PRESENCE_RAW_RETENTION_DAYS)
+
+            # Nothing is pruned before the first run, so it rolls up all history
+            rolled_up = rollup_presences(db, since, horizon if watermark else None)
+            db.commit()
+            pruned = prune_presences(db, horizon)
+            db.commit()
+
+            return {
+                "success": True,
+                "rolled_up_hours": rolled_up,
+                "pruned": pruned,
+                "message": "Presence rollups updated successfully",
+            }
+        except Exception as e:
+            db.rollback()
+            return {
+                "success": False,
+                "error": str(e),
+                "message": "Failed to update presence rollups",
+            }
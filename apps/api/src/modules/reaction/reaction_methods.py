@@ -1,81 +1,172 @@
 from collections import defaultdict
+from datetime import datetime, timezone
 from typing import Optional
 
+from sqlalchemy import delete, desc, text, union_all
 from sqlalchemy.orm import joinedload
-from sqlmodel import Session, select
+from sqlmodel import Session, col, select
 
-from src.database.models import Reaction
+from src.core.common import generate_id
+from src.core.pagination import cursor_for, keyset_filter
+from src.database.models import Post, PostStats, Reaction
+from src.modules.channels.channels_methods import visible_channel_filter
+from src.modules.post.post_feed import get_reactions_summaries
+from src.modules.post.post_stats_methods import (
+    apply_reaction_change,
+    get_post_stats_map,
+)
 
+# Sort key of the paginated reactor lists, matching ix_reaction_post_id_emoji_created_at_id
+REACTION_KEYSET = (col(Reaction.created_at), col(Reaction.id))
 
-def create_reaction(db: Session, reaction_data: dict) -> Optional[Reaction]:
-    """Create or toggle a reaction."""
+
+def create_reaction(
+    db: Session, reaction_data: dict
+) -> tuple[Optional[Reaction], PostStats]:
+    """Toggle a user's reaction on a post, returning it and the post's new counters.
+
+    Reacting with the current emoji removes the reaction, and reacting with
+    another emoji replaces it. One statement deletes and inserts against the
+    unique (user_id, post_id) index, so concurrent or repeated clicks cannot
+    leave duplicate rows. A click that loses the race changes nothing.
+    """
     user_id = reaction_data["user_id"]
     post_id = reaction_data["post_id"]
     emoji = reaction_data["emoji"]
 
-    existing = db.exec(
-        select(Reaction).where(Reaction.user_id == user_id, Reaction.post_id == post_id)
-    ).first()
+    now = datetime.now(timezone.utc)
+    sql = text("""
+    WITH removed AS (
+        DELETE FROM reaction WHERE user_id = :user_id AND post_id = :post_id
+        RETURNING emoji
+    ), inserted AS (
+        INSERT INTO reaction (id, created_at, updated_at, user_id, post_id, emoji)
+        SELECT :id, :now, :now, :user_id, :post_id, :emoji
+        WHERE NOT EXISTS (SELECT 1 FROM removed WHERE emoji = :emoji)
+        ON CONFLICT (user_id, post_id) DO NOTHING
+        RETURNING id
+    )
+    SELECT (SELECT emoji FROM removed) AS removed_emoji,
+           (SELECT id FROM inserted) AS reaction_id
+    """).bindparams(
+        id=generate_id(), now=now, user_id=user_id, post_id=post_id, emoji=emoji
+    )
+    result = db.exec(sql).one()
 
-    if existing:
-        if existing.emoji == emoji:
-            # Toggle off: delete the reaction
-            db.delete(existing)
-            db.commit()
-            return None
-        else:
-            # Update emoji
-            existing.emoji = emoji
-            db.commit()
-            db.refresh(existing)
-            return existing
-    else:
-        reaction = Reaction(**reaction_data)
-        db.add(reaction)
-        db.commit()
-        db.refresh(reaction)
-        return reaction
-
-
-def delete_reaction(db: Session, user_id: str, post_id: str, emoji: str) -> bool:
-    """Delete a specific reaction."""
-    existing = db.exec(
-        select(Reaction).where(
-            Reaction.user_id == user_id,
-            Reaction.post_id == post_id,
-            Reaction.emoji == emoji,
+    added_emoji = emoji if result.reaction_id else None
+    stats = apply_reaction_change(
+        db, post_id, added_emoji=added_emoji, removed_emoji=result.removed_emoji
+    )
+    db.commit()
+    if not result.reaction_id:
+        return None, stats
+    return db.get(Reaction, result.reaction_id), stats
+
+
+def delete_reaction(
+    db: Session, user_id: str, post_id: str, emoji: str
+) -> Optional[PostStats]:
+    """Delete a specific reaction, returning the post's new counters if it existed."""
+    deleted = db.exec(
+        delete(Reaction)
+        .where(
+            col(Reaction.user_id) == user_id,
+            col(Reaction.post_id) == post_id,
+            col(Reaction.emoji) == emoji,
         )
+        .returning(Reaction.id)
     ).first()
+    if not deleted:
+        return None
+    stats = apply_reaction_change(db, post_id, removed_emoji=emoji)
+    db.commit()
+    return stats
 
-    if existing:
-        db.delete(existing)
-        db.commit()
-        return True
-    return False
 
+def summarize_reaction_counts(stats: PostStats, my_emoji: Optional[str]) -> dict:
+    """Describe a post's reaction counters from the point of view of one user."""
+    return {
+        "reaction_count": stats.reaction_count,
+        "summary": [
+            {"emoji": emoji, "count": count, "me": emoji == my_emoji}
+            for emoji, count in stats.reaction_counts.items()
+        ],
+    }
 
-def get_reactions_by_post(db: Session, post_id: str) -> list[dict]:
-    """Get all reactions for a post grouped by emoji with user details."""
-    reactions = (
-        db.exec(
-            select(Reaction)
-            .where(Reaction.post_id == post_id)
-            .options(joinedload(Reaction.user))
-        )
-        .unique()
-        .all()
+
+def get_reactions_summaries_for_posts(
+    db: Session, post_ids: list[str], current_user_id: Optional[str] = None
+) -> dict[str, dict]:
+    """Get reaction summaries for the posts among many IDs that the user can see."""
+    statement = select(Post.id).where(
+        col(Post.id).in_(post_ids),
+        visible_channel_filter(Post.channel_id, current_user_id),
     )
+    visible_ids = set(db.exec(statement).all())
+    post_ids = [
+        post_id for post_id in dict.fromkeys(post_ids) if post_id in visible_ids
+    ]
+    return get_reactions_summaries(db, post_ids, current_user_id)
+
+
+def get_reactors(
+    db: Session,
+    post_id: str,
+    emoji: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> list[Reaction]:
+    """Get a page of the reactions with one emoji on a post, newest first."""
+    statement = (
+        select(Reaction)
+        .options(joinedload(Reaction.user))
+        .where(Reaction.post_id == post_id, Reaction.emoji == emoji)
+        .order_by(desc(Reaction.created_at), desc(Reaction.id))
+    )
+    if cursor:
+        statement = statement.where(keyset_filter(REACTION_KEYSET, cursor))
+    return list(db.exec(statement.limit(limit)).all())
+
+
+def get_reactions_by_post(db: Session, post_id: str, limit: int = 20) -> list[dict]:
+    """Get the reactions on a post grouped by emoji, with the first page of reactors.
+
+    Counts come from the post's stored counters and each emoji's reactors are
+    cut at `limit`, with a cursor to page through the rest.
+    """
+    stats = get_post_stats_map(db, [post_id]).get(post_id)
+    emoji_counts = stats.reaction_counts if stats else {}
+    if not emoji_counts:
+        return []
+
+    # One index seek per emoji for its newest reactors
+    first_pages = union_all(
+        *(
+            select(Reaction.id)
+            .where(Reaction.post_id == post_id, Reaction.emoji == emoji)
+            .order_by(desc(Reaction.created_at), desc(Reaction.id))
+            .limit(limit)
+            for emoji in emoji_counts
+        )
+    ).subquery()
+    reactions = db.exec(
+        select(Reaction)
+        .options(joinedload(Reaction.user))
+        .where(col(Reaction.id).in_(select(first_pages.c.id)))
+        .order_by(desc(Reaction.created_at), desc(Reaction.id))
+    ).all()
 
     reactions_by_emoji = defaultdict(list)
     for reaction in reactions:
         reactions_by_emoji[reaction.emoji].append(reaction)
 
     result = []
-    for emoji, emoji_reactions in reactions_by_emoji.items():
+    for emoji, count in emoji_counts.items():
+        emoji_reactions = reactions_by_emoji[emoji]
         result.append(
             {
                 "emoji": emoji,
-                "count": len(emoji_reactions),
+                "count": count,
                 "users": [
                     {
                         "id": r.id,
@@ -85,6 +176,9 @@ def get_reactions_by_post(db: Session, post_id: str) -> list[dict]:
                     }
                     for r in emoji_reactions
                 ],
+                "next_cursor": cursor_for(emoji_reactions[-1], REACTION_KEYSET)
+                if count > len(emoji_reactions) and emoji_reactions
+                else None,
             }
         )
 
@@ -0,0 +1,110 @@
+import json
+from functools import lru_cache
+from typing import Callable, Optional
+
+import redis
+from loguru import logger
+
+from src.core.settings import settings
+
+# Pub/sub channels of the user and event topics WebSocket connections subscribe to
+CHANNEL_PREFIX = "realtime:"
+USER_CHANNEL_PREFIX = f"{CHANNEL_PREFIX}user:"
+EVENT_CHANNEL_PREFIX = f"{CHANNEL_PREFIX}event:"
+
+
+def user_channel(user_id: str) -> str:
+    return f"{USER_CHANNEL_PREFIX}{user_id}"
+
+
+def event_channel(event_id: str) -> str:
+    return f"{EVENT_CHANNEL_PREFIX}{event_id}"
+
+
+@lru_cache
+def get_redis_client() -> Optional[redis.Redis]:
+    """Redis client shared by publishers, or None when Redis is not configured."""
+    if not settings.REDIS_URL:
+        return None
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+def publish_to_redis(messages: list[tuple[str, dict]]) -> int:
+    """Publish (channel, message) pairs in one round trip, returning how many were sent."""
+    client = get_redis_client()
+    if client is None or not messages:
+        return 0
+    try:
+        pipeline = client.pipeline(transaction=False)
+        for channel, message in messages:
+            pipeline.publish(channel, json.dumps(message, default=str))
+        pipeline.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to publish realtime messages: {e}")
+        return 0
+    return len(messages)
+
+
+# Publisher of this process; API processes route through their WebSocket backplane
+_publisher: Callable[[list[tuple[str, dict]]], int] = publish_to_redis
+
+
+def set_publisher(publisher: Optional[Callable[[list[tuple[str, dict]]], int]]) -> None:
+    """Route this process's messages through a publisher, or back to Redis with None."""
+    global _publisher
+    _publisher = publisher or publish_to_redis
+
+
+def publish(messages: list[tuple[str, dict]]) -> int:
+    """Publish (channel, message) pairs, returning how many were accepted.
+
+    Delivery is best effort: the API processes relay the messages to the
+    subscribed WebSocket connections, and offline users catch up over REST.
+    """
+    if not messages:
+        return 0
+    return _publisher(messages)
+
+
+def publish_to_users(messages: list[tuple[str, dict]]) -> int:
+    """Publish (user_id, message) pairs to the users' own connections."""
+    return publish([(user_channel(user_id), message) for user_id, message in messages])
+
+
+def publish_to_events(messages: list[tuple[str, dict]]) -> int:
+    """Publish (event_id, message) pairs to the connections subscribed to each event."""
+    return publish(
+        [(event_channel(event_id), message) for event_id, message in messages]
+    )
+
+
+def publish_comment_created(post) -> int:
+    """Announce a new reply to the subscribers of its parent and thread root.
+
+    Only IDs are sent, since event subscriptions are not access checked;
+    clients fetch the reply itself over REST.
+    """
+    message = {
+        "type": "comment_created",
+        "data": {
+            "post_id": post.id,
+            "parent_id": post.parent_id,
+            "root_id": post.root_id,
+            "user_id": post.user_id,
+        },
+    }
+    event_ids = dict.fromkeys([post.parent_id, post.root_id])
+    return publish_to_events([(event_id, message) for event_id in event_ids])
+
+
+def publish_reaction_change(post_id: str, stats) -> int:
+    """Announce the new reaction counts of a post to its subscribers."""
+    message = {
+        "type": "reaction_updated",
+        "data": {
+            "post_id": post_id,
+            "reaction_count": stats.reaction_count,
+            "reaction_counts": stats.reaction_counts or {},
+        },
+    }
+    return publish_to_events([(post_id, message)])
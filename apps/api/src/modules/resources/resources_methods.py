@@ -1,35 +1,14 @@
 from typing import List, Optional
 
 from sqlalchemy.orm import joinedload
-from sqlmodel import Session, desc, select
+from sqlmodel import Session, col, desc, select
 
+from src.core.pagination import keyset_filter
 from src.database.models import Resource
+from src.modules.channels.channels_methods import visible_channel_filter
 
-
-def filter_private_channel_resources(
-    resources: list[Resource],
-    current_user_id: Optional[str] = None,
-    db: Optional[Session] = None,
-) -> list[Resource]:
-    """Filter out resources from private channels where user is not a member."""
-    filtered_resources = []
-    for resource in resources:
-        # If resource's channel is public, include it
-        if resource.channel.type != "private":
-            filtered_resources.append(resource)
-            continue
-
-        # If channel is private and user is not provided, exclude the resource
-        if not current_user_id or not db:
-            continue
-
-        # If channel is private, check if user is a member
-        from src.modules.channels.channels_methods import is_member
-
-        if is_member(db, resource.channel_id, current_user_id):
-            filtered_resources.append(resource)
-
-    return filtered_resources
+# Sort key of the resource list, matching ix_resource_created_at_id
+RESOURCE_KEYSET = (col(Resource.created_at), col(Resource.id))
 
 
 def create_resource(db: Session, resource_data: dict) -> Resource:
@@ -76,12 +55,17 @@ def delete_resource(db: Session, resource_id: str) -> bool:
     return True
 
 
-def get_resources_by_user(db: Session, user_id: str) -> List[Resource]:
-    """Get all resources created by a user."""
+def get_resources_by_user(
+    db: Session, user_id: str, current_user_id: Optional[str] = None
+) -> List[Resource]:
+    """Get all resources created by a user that the current user can see."""
     statement = (
         select(Resource)
         .options(joinedload(Resource.user), joinedload(Resource.channel))
-        .where(Resource.user_id == user_id)
+        .where(
+            Resource.user_id == user_id,
+            visible_channel_filter(Resource.channel_id, current_user_id),
+        )
         .order_by(desc(Resource.created_at))
     )
     resources = list(db.exec(statement).unique().all())
@@ -100,14 +84,24 @@ def get_resources_by_channel(db: Session, channel_id: str) -> List[Resource]:
     return resources
 
 
-def get_all_resources(db: Session, skip: int = 0, limit: int = 100) -> List[Resource]:
-    """Get all resources with pagination."""
+def get_all_resources(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    current_user_id: Optional[str] = None,
+) -> List[Resource]:
+    """Get all resources visible to the user with offset or cursor pagination."""
     statement = (
         select(Resource)
         .options(joinedload(Resource.user), joinedload(Resource.channel))
-        .order_by(desc(Resource.created_at))
-        .offset(skip)
-        .limit(limit)
+        .where(visible_channel_filter(Resource.channel_id, current_user_id))
+        .order_by(desc(Resource.created_at), desc(Resource.id))
     )
+    if cursor:
+        statement = statement.where(keyset_filter(RESOURCE_KEYSET, cursor))
+    else:
+        statement = statement.offset(skip)
+    statement = statement.limit(limit)
     resources = list(db.exec(statement).unique().all())
     return resources
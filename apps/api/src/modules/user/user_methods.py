@@ -1,8 +1,42 @@
 from typing import Optional
 
+from sqlalchemy import delete, desc
 from sqlmodel import Session, col, func, select
 
-from src.database.models import Role, User
+from src.core.cache import TTLCache
+from src.core.pagination import keyset_filter
+from src.core.settings import settings
+from src.database.models import (
+    ChannelMember,
+    Media,
+    PasswordReset,
+    Post,
+    Reaction,
+    Resource,
+    Role,
+    User,
+    UserSettings,
+    UserSocial,
+)
+from src.modules.channels.channels_methods import invalidate_member_channel_ids
+from src.modules.notifications.notifications_methods import (
+    delete_notifications_involving_user,
+)
+from src.modules.post.post_methods import delete_post_trees
+from src.modules.post.post_stats_methods import (
+    get_post_ids_with_reactions_by_user,
+    get_thread_ids_above_replies_by_user,
+    refresh_post_stats,
+)
+
+# Sort key of the cursor-paginated user list, matching ix_user_created_at_id
+USER_KEYSET = (col(User.created_at), col(User.id))
+
+# Process-wide cache of user_id -> detached copy of the authenticated user
+_user_principal_cache = TTLCache(
+    maxsize=settings.USER_PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.USER_PRINCIPAL_CACHE_TTL_SECONDS,
+)
 
 
 def create_user(db: Session, user_data: dict) -> User:
@@ -31,6 +65,43 @@ def get_user_by_username(db: Session, username: str) -> Optional[User]:
     return db.exec(statement).first()
 
 
+def get_users_by_usernames(db: Session, usernames: list[str]) -> list[User]:
+    """Get the users matching any of the given usernames in one query."""
+    if not usernames:
+        return []
+    statement = select(User).where(col(User.username).in_(usernames))
+    return list(db.exec(statement).all())
+
+
+def get_users_by_ids(db: Session, user_ids: list[str]) -> list[User]:
+    """Get the users matching any of the given IDs in one query."""
+    if not user_ids:
+        return []
+    statement = select(User).where(col(User.id).in_(user_ids))
+    return list(db.exec(statement).all())
+
+
+def get_user_principal(db: Session, user_id: str) -> Optional[User]:
+    """Get the user behind an access token, served from a short-lived cache.
+
+    The cached object is a detached copy, so it is safe to share between
+    requests but its relationships are not loaded.
+    """
+    principal = _user_principal_cache.get(user_id)
+    if principal is None:
+        user = db.get(User, user_id)
+        if user is None:
+            return None
+        principal = User(**user.model_dump())
+        _user_principal_cache.set(user_id, principal)
+    return principal
+
+
+def invalidate_user_principal(user_id: str) -> None:
+    """Forget the cached principal of a user after their account changes."""
+    _user_principal_cache.pop(user_id)
+
+
 def update_user(db: Session, user_id: str, update_data: dict) -> Optional[User]:
     """Update a user by ID."""
     user = db.get(User, user_id)
@@ -39,90 +110,80 @@ def update_user(db: Session, user_id: str, update_data: dict) -> Optional[User]:
     for key, value in update_data.items():
         setattr(user, key, value)
     db.commit()
+    invalidate_user_principal(user_id)
     db.refresh(user)
     return user
 
 
-def delete_user(db: Session, user_id: str) -> bool:
-    """Delete a user by ID and all related records."""
-    from src.database.models import (
-        ChannelMember,
-        Media,
-        Notification,
-        PasswordReset,
-        Post,
-        Reaction,
-        Resource,
-        UserSettings,
-        UserSocial,
-    )
-
+def delete_user(db: Session, user_id: str) -> Optional[dict[str, int]]:
+    """Delete a user by ID and all related records, returning counts of removed rows."""
     user = db.get(User, user_id)
     if not user:
-        return False
-
-    # Delete related records in order to avoid foreign key constraint violations
-    # Delete reactions first
-    stmt = select(Reaction).where(Reaction.user_id == user_id)
-    for reaction in db.exec(stmt).all():
-        db.delete(reaction)
-
-    # Delete notifications (both sent and received)
-    stmt = select(Notification).where(
-        (Notification.sender_id == user_id) | (Notification.recipient_id == user_id)
-    )
-    for notification in db.exec(stmt).all():
-        db.delete(notification)
-
-    # Delete password resets
-    stmt = select(PasswordReset).where(PasswordReset.user_id == user_id)
-    for password_reset in db.exec(stmt).all():
-        db.delete(password_reset)
-
-    # Delete channel memberships
-    stmt = select(ChannelMember).where(ChannelMember.user_id == user_id)
-    for channel_member in db.exec(stmt).all():
-        db.delete(channel_member)
-
-    # Delete resources
-    stmt = select(Resource).where(Resource.user_id == user_id)
-    for resource in db.exec(stmt).all():
-        db.delete(resource)
-
-    # Delete media
-    stmt = select(Media).where(Media.user_id == user_id)
-    for media in db.exec(stmt).all():
-        db.delete(media)
-
-    # Delete posts
-    stmt = select(Post).where(Post.user_id == user_id)
-    for post in db.exec(stmt).all():
-        db.delete(post)
-
-    # Delete user settings
-    stmt = select(UserSettings).where(UserSettings.user_id == user_id)
-    for user_settings in db.exec(stmt).all():
-        db.delete(user_settings)
-
-    # Delete user social
-    stmt = select(UserSocial).where(UserSocial.user_id == user_id)
-    for user_social in db.exec(stmt).all():
-        db.delete(user_social)
+        return None
+
+    # Remember which remaining posts will need their counters recomputed
+    affected_post_ids = set(get_post_ids_with_reactions_by_user(db, user_id))
+    affected_post_ids.update(get_thread_ids_above_replies_by_user(db, user_id))
+
+    # The user's posts and replies go with every reply beneath them
+    counts = delete_post_trees(db, col(Post.user_id) == user_id)
+    counts["reactions"] += db.exec(
+        delete(Reaction).where(col(Reaction.user_id) == user_id)
+    ).rowcount
+    counts["media"] += db.exec(
+        delete(Media).where(col(Media.user_id) == user_id)
+    ).rowcount
+
+    # Delete the remaining related records in bulk, one statement per table
+    counts["notifications"] = delete_notifications_involving_user(db, user_id)
+    related_records = {
+        "password_resets": delete(PasswordReset).where(
+            col(PasswordReset.user_id) == user_id
+        ),
+        "channel_members": delete(ChannelMember).where(
+            col(ChannelMember.user_id) == user_id
+        ),
+        "resources": delete(Resource).where(col(Resource.user_id) == user_id),
+        "user_settings": delete(UserSettings).where(
+            col(UserSettings.user_id) == user_id
+        ),
+        "user_social": delete(UserSocial).where(col(UserSocial.user_id) == user_id),
+    }
+    for name, statement in related_records.items():
+        counts[name] = db.exec(statement).rowcount
+
+    # Recount the posts left behind before removing the user
+    if affected_post_ids:
+        remaining_post_ids = db.exec(
+            select(Post.id).where(col(Post.id).in_(affected_post_ids))
+        ).all()
+        refresh_post_stats(db, list(remaining_post_ids))
 
     # Finally, delete the user
-    db.delete(user)
+    counts["users"] = db.exec(delete(User).where(col(User.id) == user_id)).rowcount
     db.commit()
-    return True
+    invalidate_member_channel_ids(db, user_id)
+    invalidate_user_principal(user_id)
+    return counts
 
 
 def get_all_users(
-    db: Session, skip: int = 0, limit: int = 100, query: Optional[str] = None
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    query: Optional[str] = None,
+    cursor: Optional[str] = None,
 ) -> list[User]:
-    """Get all users with pagination and optional query filtering."""
+    """Get all users with offset or cursor pagination and optional query filtering."""
     statement = select(User)
     if query:
         statement = statement.where(col(User.username).ilike(f"%{query}%"))
-    statement = statement.offset(skip).limit(limit)
+    statement = statement.order_by(desc(User.created_at), desc(User.id))
+    if cursor:
+        statement = statement.where(keyset_filter(USER_KEYSET, cursor))
+    else:
+        statement = statement.offset(skip)
+    statement = statement.limit(limit)
     return list(db.exec(statement).all())
 
 
@@ -133,6 +194,7 @@ def ban_user(db: Session, user_id: str) -> Optional[User]:
         return None
     user.is_active = False
     db.commit()
+    invalidate_user_principal(user_id)
     db.refresh(user)
     return user
 
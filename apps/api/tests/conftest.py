@@ -0,0 +1,46 @@
+import pytest
+
+
+class MockAsyncSession:
+    """Async session stand-in that runs sync callbacks against a mocked db"""
+
+    def __init__(self, db=None):
+        self.db = db
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return fn(self.db, *args, **kwargs)
+
+
+@pytest.fixture
+def mock_async_session():
+    """Wrap a mocked db in an async session, e.g. for dependency overrides"""
+    return MockAsyncSession
+
+
+@pytest.fixture
+def fake_session():
+    """AsyncSession replacement recording the callbacks and commits run through it.
+
+    Calls are kept as (callback name, first argument) pairs on FakeSession.calls.
+    """
+    calls = []
+
+    class FakeSession:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *args):
+            pass
+
+        async def run_sync(self, fn, *args):
+            calls.append((fn.__name__, args[0] if args else None))
+            return 0
+
+        async def commit(self):
+            calls.append(("commit", None))
+
+    FakeSession.calls = calls
+    return FakeSession
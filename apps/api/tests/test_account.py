@@ -51,3 +51,45 @@ def test_get_account():
     app.dependency_overrides.clear()
     assert response.status_code == 200
     assert response.json()["id"] == "user123"
+
+
+def test_get_account_with_token_claims():
+    from src.database.models import User
+    from src.modules.auth.auth_methods import create_user_access_token
+
+    mock_db = MagicMock()
+    mock_user = create_mock_user()
+    user = User(id="user123", username="testuser", email="test@example.com", is_active=True)
+
+    mock_query = mock_db.query.return_value
+    mock_query.options.return_value.filter.return_value.first.return_value = mock_user
+
+    with patch("src.api.account.api.get_user_principal", return_value=user) as principal, \
+         patch("src.api.account.api.get_user_by_username") as by_username:
+        app.dependency_overrides[get_db] = lambda: mock_db
+
+        token = create_user_access_token(user)
+        response = client.get("/api/account", headers={"Authorization": f"Bearer {token}"})
+
+        app.dependency_overrides.clear()
+        assert response.status_code == 200
+        principal.assert_called_once_with(mock_db, "user123")
+        by_username.assert_not_called()
+
+
+def test_get_account_rejects_banned_user():
+    from src.database.models import User
+    from src.modules.auth.auth_methods import create_user_access_token
+
+    mock_db = MagicMock()
+    user = User(id="user123", username="testuser", email="test@example.com", is_active=True)
+    token = create_user_access_token(user)
+    user.is_active = False
+
+    with patch("src.api.account.api.get_user_principal", return_value=user):
+        app.dependency_overrides[get_db] = lambda: mock_db
+
+        response = client.get("/api/account", headers={"Authorization": f"Bearer {token}"})
+
+        app.dependency_overrides.clear()
+        assert response.status_code == 401
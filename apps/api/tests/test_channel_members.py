@@ -50,3 +50,23 @@ def test_is_member(monkeypatch):
     data = response.json()
     assert "is_member" in data
     assert data["is_member"] is True
+
+
+def test_is_member_memoizes_membership_set():
+    from src.modules.channels.channels_methods import (
+        invalidate_member_channel_ids,
+        is_member,
+    )
+
+    mock_db = MagicMock()
+    mock_db.info = {}
+    mock_db.exec.return_value.all.return_value = ["channel-a"]
+
+    assert is_member(mock_db, "channel-a", "memo-user") is True
+    assert is_member(mock_db, "channel-b", "memo-user") is False
+    assert mock_db.exec.call_count == 1
+
+    invalidate_member_channel_ids(mock_db, "memo-user")
+    mock_db.exec.return_value.all.return_value = ["channel-a", "channel-b"]
+    assert is_member(mock_db, "channel-b", "memo-user") is True
+    assert mock_db.exec.call_count == 2
@@ -7,6 +7,7 @@ from unittest.mock import MagicMock, patch
 from fastapi.testclient import TestClient
 from src.main import app
 from src.database.engine import get_session as get_db
+from src.database.routing import get_async_read_session
 from src.database.models import Channel, User
 from src.api.account.api import get_current_user
 
@@ -72,12 +73,12 @@ def test_get_channel():
         assert data["name"] == "Test Channel"
 
 
-def test_get_all_channels():
+def test_get_all_channels(mock_async_session):
     mock_db = MagicMock()
     mock_channel = create_mock_channel()
     
     with patch("src.api.channels.api.get_all_channels", return_value=[mock_channel]):
-        app.dependency_overrides[get_db] = lambda: mock_db
+        app.dependency_overrides[get_async_read_session] = lambda: mock_async_session(mock_db)
         
         response = client.get("/api/channels/")
         
@@ -2,35 +2,174 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from datetime import datetime
-from unittest.mock import MagicMock, patch
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
+from sqlalchemy import delete
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session
 from src.main import app
-from src.database.engine import get_session as get_db
+from src.database.engine import engine, get_async_session
+from src.database.models import UrlPreview
+from src.modules.extras import extras_methods
 
 client = TestClient(app)
 
 
-def test_get_url_preview_cached():
-    mock_db = MagicMock()
-    
-    # Mock cached preview
+def create_mock_preview(updated_at=None):
+    """Helper to create a mocked stored preview"""
     mock_preview = MagicMock()
     mock_preview.url = "https://example.com"
     mock_preview.title = "Example Title"
     mock_preview.description = "Example Description"
     mock_preview.image_url = "https://example.com/image.jpg"
     mock_preview.created_at = datetime.now()
-    
-    mock_db.exec.return_value.first.return_value = mock_preview
-    
-    app.dependency_overrides[get_db] = lambda: mock_db
-    
-    response = client.get("/api/url-preview", params={"url": "https://example.com"})
-    
+    mock_preview.updated_at = updated_at or datetime.utcnow()
+    return mock_preview
+
+
+@pytest.fixture(autouse=True)
+def clear_failed_urls():
+    extras_methods.failed_urls.clear()
+    yield
+    extras_methods.failed_urls.clear()
+
+
+def test_get_url_preview_cached(mock_async_session):
+    mock_db = MagicMock()
+    mock_db.exec.return_value.first.return_value = create_mock_preview()
+
+    app.dependency_overrides[get_async_session] = lambda: mock_async_session(mock_db)
+
+    with patch.object(extras_methods, "get_url_metadata", new_callable=AsyncMock) as fetch:
+        response = client.get("/api/url-preview", params={"url": "https://example.com"})
+
+    app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert response.json()["title"] == "Example Title"
+    fetch.assert_not_called()
+
+
+def test_get_url_preview_new_is_fetched_and_saved(mock_async_session):
+    mock_db = MagicMock()
+    mock_db.exec.return_value.first.return_value = None
+    metadata = {"title": "New Title", "description": None, "image_url": None}
+
+    app.dependency_overrides[get_async_session] = lambda: mock_async_session(mock_db)
+
+    with patch.object(
+        extras_methods, "get_url_metadata", new_callable=AsyncMock, return_value=metadata
+    ), patch.object(
+        extras_methods, "save_url_preview", return_value=create_mock_preview()
+    ) as save:
+        response = client.get("/api/url-preview", params={"url": "https://example.com"})
+
+    app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert save.call_args.args[1:] == ("https://example.com", metadata)
+
+
+def test_get_url_preview_serves_stale_preview_when_refresh_fails(mock_async_session):
+    mock_db = MagicMock()
+    mock_db.exec.return_value.first.return_value = create_mock_preview(
+        updated_at=datetime.utcnow() - timedelta(days=30)
+    )
+
+    app.dependency_overrides[get_async_session] = lambda: mock_async_session(mock_db)
+
+    with patch.object(
+        extras_methods,
+        "get_url_metadata",
+        new_callable=AsyncMock,
+        side_effect=HTTPException(status_code=400, detail="Unable to fetch"),
+    ) as fetch:
+        response = client.get("/api/url-preview", params={"url": "https://example.com"})
+
     app.dependency_overrides.clear()
     assert response.status_code == 200
     assert response.json()["title"] == "Example Title"
+    fetch.assert_awaited_once()
+
+
+def test_concurrent_fetches_of_a_url_are_shared():
+    calls = []
+
+    async def fake_fetch(url):
+        calls.append(url)
+        await asyncio.sleep(0.01)
+        return {"title": "Shared", "description": None, "image_url": None}
+
+    async def run():
+        return await asyncio.gather(
+            *(extras_methods.get_url_metadata("https://example.com") for _ in range(5))
+        )
+
+    with patch.object(extras_methods, "fetch_url_metadata", side_effect=fake_fetch):
+        results = asyncio.run(run())
+
+    assert calls == ["https://example.com"]
+    assert all(result["title"] == "Shared" for result in results)
+    assert extras_methods._inflight == {}
+
+
+def test_failed_fetches_are_cached():
+    fetch = AsyncMock(side_effect=HTTPException(status_code=400, detail="Unable"))
+
+    async def run():
+        for _ in range(3):
+            with pytest.raises(HTTPException):
+                await extras_methods.get_url_metadata("https://broken.example.com")
+
+    with patch.object(extras_methods, "fetch_url_metadata", fetch):
+        asyncio.run(run())
+
+    assert fetch.await_count == 1
+
+
+def test_parse_url_metadata_prefers_open_graph_tags():
+    html = b"""
+    <html><head>
+        <title>Page Title</title>
+        <meta property="og:title" content=" OG Title ">
+        <meta name="description" content="Plain description">
+        <meta property="og:image" content="/images/cover.png">
+    </head></html>
+    """
+
+    metadata = extras_methods.parse_url_metadata(html, "https://example.com/post/1")
+
+    assert metadata == {
+        "title": "OG Title",
+        "description": "Plain description",
+        "image_url": "https://example.com/images/cover.png",
+    }
+
+
+def test_save_url_preview_refreshes_loaded_preview():
+    try:
+        with engine.connect():
+            pass
+    except OperationalError:
+        pytest.skip("database is not available")
+
+    url = "https://refresh.example.com"
+    with Session(engine, expire_on_commit=False) as db:
+        try:
+            extras_methods.save_url_preview(
+                db, url, {"title": "Old", "description": None, "image_url": None}
+            )
+            stored = extras_methods.get_url_preview(db, url)
 
+            refreshed = extras_methods.save_url_preview(
+                db, url, {"title": "New", "description": "Updated", "image_url": None}
+            )
 
-# Skipping test_get_url_preview_new - requires complex database mocking
+            assert refreshed is stored
+            assert refreshed.title == "New"
+            assert refreshed.description == "Updated"
+        finally:
+            db.exec(delete(UrlPreview).where(UrlPreview.url == url))
+            db.commit()
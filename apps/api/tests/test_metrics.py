@@ -0,0 +1,45 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from unittest.mock import MagicMock
+from fastapi.testclient import TestClient
+from src.main import app
+from src.api.account.api import get_current_admin
+from src.database.pool import PoolMetrics
+
+client = TestClient(app)
+
+
+def test_get_database_pool_metrics():
+    app.dependency_overrides[get_current_admin] = lambda: MagicMock(id="admin123")
+
+    response = client.get("/api/metrics/database-pool")
+
+    app.dependency_overrides.clear()
+    assert response.status_code == 200
+    data = response.json()
+    assert data["engine"]["pool_class"] == "InstrumentedQueuePool"
+    assert data["async_engine"]["pool_class"] == "InstrumentedAsyncAdaptedQueuePool"
+    assert "checked_out" in data["engine"]
+    assert "wait_histogram" in data["async_engine"]
+
+
+def test_get_database_pool_metrics_requires_auth():
+    response = client.get("/api/metrics/database-pool")
+    assert response.status_code in (401, 403)
+
+
+def test_pool_metrics_histogram():
+    metrics = PoolMetrics()
+    metrics.observe(0.0005)
+    metrics.observe(0.2)
+    metrics.observe(30.0, timed_out=True)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["checkouts"] == 2
+    assert snapshot["timeouts"] == 1
+    assert snapshot["max_wait_seconds"] == 30.0
+    assert snapshot["wait_histogram"]["le_0.001"] == 1
+    assert snapshot["wait_histogram"]["le_0.25"] == 1
+    assert snapshot["wait_histogram"]["le_inf"] == 1
@@ -7,7 +7,8 @@ from unittest.mock import MagicMock, patch
 from fastapi.testclient import TestClient
 from src.main import app
 from src.database.engine import get_session as get_db
-from src.api.account.api import get_current_user
+from src.database.routing import get_async_read_session
+from src.api.account.api import get_current_user, get_current_user_async
 
 client = TestClient(app)
 
@@ -34,14 +35,14 @@ def create_mock_notification(notification_id="notif123", recipient_id="user123")
     return mock_notif
 
 
-def test_get_notifications():
+def test_get_notifications(mock_async_session):
     mock_db = MagicMock()
     mock_user = create_mock_user()
     mock_notification = create_mock_notification()
     
     with patch("src.modules.notifications.notifications_methods.get_notifications_by_user", return_value=[mock_notification]):
-        app.dependency_overrides[get_db] = lambda: mock_db
-        app.dependency_overrides[get_current_user] = lambda: mock_user
+        app.dependency_overrides[get_async_read_session] = lambda: mock_async_session(mock_db)
+        app.dependency_overrides[get_current_user_async] = lambda: mock_user
         
         response = client.get("/api/notifications")
         
@@ -51,3 +52,81 @@ def test_get_notifications():
 
 
 # Skipping test_mark_notification_as_read - complex validation requirements
+
+
+def test_create_mention_notifications_task_batches_recipients():
+    from src.modules.notifications import notification_tasks
+
+    sender = create_mock_user(user_id="sender123")
+    alice = create_mock_user(user_id="alice123")
+    bob = create_mock_user(user_id="bob123")
+    mock_db = MagicMock()
+    mock_session = MagicMock()
+    mock_session.__enter__.return_value = mock_db
+
+    with patch.object(notification_tasks, "Session", return_value=mock_session), \
+         patch.object(notification_tasks, "get_users_by_usernames", return_value=[sender, alice, bob]) as lookup, \
+         patch.object(notification_tasks, "publish_to_users", return_value=2) as publish:
+        result = notification_tasks.create_mention_notifications_task(
+            sender_id="sender123",
+            usernames=["testuser", "alice", "bob"],
+            data={"post_id": "post123"},
+        )
+
+    lookup.assert_called_once_with(mock_db, ["testuser", "alice", "bob"])
+    mock_db.add_all.assert_called_once()
+    inserted = mock_db.add_all.call_args.args[0]
+    assert [n.recipient_id for n in inserted] == ["alice123", "bob123"]
+    mock_db.commit.assert_called_once()
+    assert [user_id for user_id, _ in publish.call_args.args[0]] == ["alice123", "bob123"]
+    assert result["success"] is True
+    assert result["pushed"] == 2
+
+
+def test_get_unread_count(mock_async_session):
+    mock_db = MagicMock()
+    mock_user = create_mock_user()
+
+    with patch("src.api.notifications.api.get_unread_notification_count", return_value=7) as count:
+        app.dependency_overrides[get_async_read_session] = lambda: mock_async_session(mock_db)
+        app.dependency_overrides[get_current_user_async] = lambda: mock_user
+
+        response = client.get("/api/notifications/unread-count")
+
+        app.dependency_overrides.clear()
+        assert response.status_code == 200
+        assert response.json() == {"unread_count": 7}
+        count.assert_called_once_with(mock_db, mock_user.id)
+
+
+def test_mark_all_notifications_as_read():
+    mock_db = MagicMock()
+    mock_user = create_mock_user()
+
+    with patch("src.api.notifications.api.mark_all_notifications_as_read", return_value=3), \
+         patch("src.api.notifications.api.get_unread_notification_count", return_value=0):
+        app.dependency_overrides[get_db] = lambda: mock_db
+        app.dependency_overrides[get_current_user] = lambda: mock_user
+
+        response = client.post("/api/notifications/read-all")
+
+        app.dependency_overrides.clear()
+        assert response.status_code == 200
+        assert response.json() == {"marked_count": 3, "unread_count": 0}
+
+
+def test_mark_other_users_notification_as_read_is_forbidden():
+    mock_db = MagicMock()
+    mock_user = create_mock_user()
+    mock_notification = create_mock_notification(recipient_id="someone_else")
+
+    with patch("src.api.notifications.api.get_notification", return_value=mock_notification), \
+         patch("src.api.notifications.api.mark_notification_as_read") as mark:
+        app.dependency_overrides[get_db] = lambda: mock_db
+        app.dependency_overrides[get_current_user] = lambda: mock_user
+
+        response = client.post("/api/notifications/notif123/read")
+
+        app.dependency_overrides.clear()
+        assert response.status_code == 403
+        mark.assert_not_called()
@@ -7,6 +7,7 @@ from unittest.mock import MagicMock, patch
 from fastapi.testclient import TestClient
 from src.main import app
 from src.database.engine import get_session as get_db
+from src.database.routing import get_async_read_session
 from src.database.models import Post, User
 from src.api.account.api import get_current_user
 
@@ -49,6 +50,8 @@ def create_mock_post(post_id="post123", title="Test Post", content="Test content
     mock_post.user_id = user_id
     mock_post.channel_id = None
     mock_post.parent_id = None
+    mock_post.root_id = post_id
+    mock_post.depth = 0
     mock_post.is_pinned = False
     mock_post.created_at = datetime.now()
     mock_post.updated_at = datetime.now()
@@ -81,12 +84,37 @@ def test_create_post():
         assert response.status_code in [200, 422]
 
 
-def test_get_post():
+def test_create_post_enqueues_one_mention_task():
+    mock_db = MagicMock()
+    mock_user = create_mock_user()
+    mock_post = create_mock_post(content="Hi @alice and @bob, ping @alice")
+
+    with patch("src.api.post.api.create_post", return_value=mock_post), \
+         patch("src.api.post.api.get_post", return_value=mock_post), \
+         patch("src.api.post.api.create_mention_notifications_task") as mock_task:
+        app.dependency_overrides[get_db] = lambda: mock_db
+        app.dependency_overrides[get_current_user] = lambda: mock_user
+
+        response = client.post("/api/posts/", json={
+            "content": "Hi @alice and @bob, ping @alice",
+            "user_id": mock_user.id,
+        })
+
+        app.dependency_overrides.clear()
+        assert response.status_code in [200, 422]
+        mock_task.delay.assert_called_once()
+        kwargs = mock_task.delay.call_args.kwargs
+        assert sorted(kwargs["usernames"]) == ["alice", "bob"]
+        assert kwargs["sender_id"] == mock_user.id
+        assert kwargs["data"]["post_id"] == mock_post.id
+
+
+def test_get_post(mock_async_session):
     mock_db = MagicMock()
     mock_post = create_mock_post()
     
     with patch("src.api.post.api.get_post", return_value=mock_post):
-        app.dependency_overrides[get_db] = lambda: mock_db
+        app.dependency_overrides[get_async_read_session] = lambda: mock_async_session(mock_db)
         
         response = client.get("/api/posts/post123")
         
@@ -96,11 +124,11 @@ def test_get_post():
         assert data["id"] == "post123"
 
 
-def test_get_all_posts():
+def test_get_all_posts(mock_async_session):
     mock_db = MagicMock()
     
     with patch("src.api.post.api.get_all_posts", return_value=[]):
-        app.dependency_overrides[get_db] = lambda: mock_db
+        app.dependency_overrides[get_async_read_session] = lambda: mock_async_session(mock_db)
         
         response = client.get("/api/posts/")
         
@@ -109,6 +137,66 @@ def test_get_all_posts():
         assert isinstance(response.json(), list)
 
 
+def test_get_post_replies(mock_async_session):
+    mock_db = MagicMock()
+    root = create_mock_post()
+    reply = create_mock_post(post_id="reply1")
+    nested = create_mock_post(post_id="reply2")
+    tree = [
+        {
+            "post": reply,
+            "replies": [
+                {
+                    "post": nested,
+                    "replies": [],
+                    "has_more_replies": True,
+                    "replies_cursor": None,
+                }
+            ],
+            "has_more_replies": True,
+            "replies_cursor": "next",
+        }
+    ]
+
+    with patch("src.api.post.api.get_post", return_value=root), \
+         patch("src.api.post.api.get_reply_tree", return_value=tree) as mock_tree:
+        app.dependency_overrides[get_async_read_session] = lambda: mock_async_session(mock_db)
+
+        response = client.get("/api/posts/post123/replies?limit=1&depth=2&replies_limit=1")
+
+        app.dependency_overrides.clear()
+        assert response.status_code == 200
+        mock_tree.assert_called_once_with(mock_db, "post123", None, 1, 2, 1, None)
+        data = response.json()
+        assert data[0]["id"] == "reply1"
+        assert data[0]["replies_cursor"] == "next"
+        assert data[0]["replies"][0]["id"] == "reply2"
+        assert data[0]["replies"][0]["has_more_replies"] is True
+        assert response.headers.get("X-Next-Cursor")
+
+
+def test_get_posts_by_parent_lists_whole_thread(mock_async_session):
+    mock_db = MagicMock()
+    replies = [create_mock_post(post_id=f"reply{i}") for i in range(8)]
+
+    with patch("src.api.post.api.get_all_replies", return_value=replies) as mock_replies:
+        app.dependency_overrides[get_async_read_session] = lambda: mock_async_session(mock_db)
+
+        response = client.get("/api/posts/?parent_id=post123&limit=5")
+
+        app.dependency_overrides.clear()
+        assert response.status_code == 200
+        mock_replies.assert_called_once_with(mock_db, "post123", None)
+        assert [post["id"] for post in response.json()] == [
+            f"reply{i}" for i in range(8)
+        ]
+
+
+def test_get_post_replies_rejects_unbounded_depth():
+    response = client.get("/api/posts/post123/replies?depth=50")
+    assert response.status_code == 422
+
+
 def test_update_post():
     mock_db = MagicMock()
     mock_user = create_mock_user()
@@ -125,15 +213,34 @@ def test_update_post():
             assert response.status_code == 200
 
 
+def test_update_post_rejects_moving_under_own_reply():
+    mock_db = MagicMock()
+    mock_user = create_mock_user()
+    mock_post = create_mock_post()
+    error = ValueError("A post cannot be moved under its own replies")
+
+    with patch("src.api.post.api.get_post", return_value=mock_post):
+        with patch("src.api.post.api.update_post", side_effect=error):
+            app.dependency_overrides[get_db] = lambda: mock_db
+            app.dependency_overrides[get_current_user] = lambda: mock_user
+
+            response = client.put("/api/posts/post123", json={"parent_id": "reply1"})
+
+            app.dependency_overrides.clear()
+            assert response.status_code == 400
+
+
 def test_delete_post():
     mock_db = MagicMock()
     mock_user = create_mock_user()
     
-    with patch("src.api.post.api.delete_post", return_value=True):
+    deleted = {"posts": 3, "media": 1, "reactions": 2}
+    with patch("src.api.post.api.delete_post", return_value=deleted):
         app.dependency_overrides[get_db] = lambda: mock_db
         app.dependency_overrides[get_current_user] = lambda: mock_user
         
         response = client.delete("/api/posts/post123")
         
         app.dependency_overrides.clear()
-        assert response.status_code == 200
\ No newline at end of file
+        assert response.status_code == 200
+        assert response.json()["deleted"] == deleted
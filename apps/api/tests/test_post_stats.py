@@ -0,0 +1,142 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, col, select
+from src.core.common import generate_id
+from src.database.engine import engine
+from src.database.models import Post, PostStats, User
+from src.modules.post import post_methods, post_stats_methods
+
+
+# These tests exercise the counters against Postgres, since the locking and the
+# path range queries cannot be reproduced with a mocked session
+
+
+@pytest.fixture
+def user_ids():
+    try:
+        with engine.connect():
+            pass
+    except OperationalError:
+        pytest.skip("database is not available")
+
+    ids = [generate_id(), generate_id()]
+    with Session(engine) as db:
+        for user_id in ids:
+            db.add(
+                User(
+                    id=user_id,
+                    username=f"stats-{user_id}",
+                    email=f"stats-{user_id}@example.com",
+                    password=None,
+                )
+            )
+        db.commit()
+
+    yield ids
+
+    with Session(engine) as db:
+        post_methods.delete_post_trees(db, col(Post.user_id).in_(ids))
+        db.exec(delete(User).where(col(User.id).in_(ids)))
+        db.commit()
+
+
+def create_post(user_id, parent_id=None):
+    with Session(engine) as db:
+        post = post_methods.create_post(
+            db, {"content": "stats", "user_id": user_id, "parent_id": parent_id}
+        )
+        return post.id
+
+
+def get_counts(post_id):
+    with Session(engine) as db:
+        stats = db.exec(select(PostStats).where(PostStats.post_id == post_id)).one()
+        return stats.comment_count, stats.commenter_count
+
+
+def test_create_reply_counts_comments_and_commenters(user_ids):
+    alice, bob = user_ids
+    root_id = create_post(alice)
+    reply_id = create_post(bob, root_id)
+    create_post(bob, reply_id)
+    create_post(alice, reply_id)
+
+    assert get_counts(root_id) == (3, 2)
+    assert get_counts(reply_id) == (2, 2)
+
+
+def test_delete_reply_recounts_thread(user_ids):
+    alice, bob = user_ids
+    root_id = create_post(alice)
+    reply_id = create_post(bob, root_id)
+    create_post(bob, reply_id)
+    other_id = create_post(alice, root_id)
+
+    with Session(engine) as db:
+        post_methods.delete_post(db, reply_id)
+
+    assert get_counts(root_id) == (1, 1)
+    assert get_counts(other_id) == (0, 0)
+
+
+def test_concurrent_replies_are_all_counted(user_ids):
+    alice, bob = user_ids
+    root_id = create_post(alice)
+
+    first = Session(engine)
+    second = Session(engine)
+    try:
+        first_reply = Post(content="first", user_id=alice, parent_id=root_id)
+        second_reply = Post(content="second", user_id=bob, parent_id=root_id)
+        for db, reply in ((first, first_reply), (second, second_reply)):
+            db.add(reply)
+            db.add(PostStats(post_id=reply.id))
+            db.flush()
+
+        post_stats_methods.add_reply_stats(first, first_reply)
+
+        # The second writer has to wait for the first one's lock on the root
+        def count_second():
+            post_stats_methods.add_reply_stats(second, second_reply)
+            second.commit()
+
+        worker = threading.Thread(target=count_second)
+        worker.start()
+        time.sleep(0.2)
+        assert worker.is_alive()
+
+        first.commit()
+        worker.join(timeout=5)
+        assert not worker.is_alive()
+    finally:
+        first.close()
+        second.close()
+
+    assert get_counts(root_id) == (2, 2)
+
+
+def test_rebuild_post_stats_repairs_counters(user_ids):
+    alice, bob = user_ids
+    root_id = create_post(alice)
+    reply_id = create_post(bob, root_id)
+
+    with Session(engine) as db:
+        for stats in db.exec(
+            select(PostStats).where(col(PostStats.post_id).in_([root_id, reply_id]))
+        ).all():
+            stats.comment_count = 7
+            stats.commenter_count = 7
+            db.add(stats)
+        db.commit()
+
+        assert post_stats_methods.rebuild_post_stats(db, batch_size=2) >= 2
+
+    assert get_counts(root_id) == (1, 1)
+    assert get_counts(reply_id) == (0, 0)
@@ -7,7 +7,8 @@ from unittest.mock import MagicMock, patch
 from fastapi.testclient import TestClient
 from src.main import app
 from src.database.engine import get_session as get_db
-from src.api.account.api import get_current_user
+from src.database.routing import get_read_session
+from src.api.account.api import get_current_user, get_current_user_optional
 
 client = TestClient(app)
 
@@ -54,6 +55,14 @@ def create_mock_reaction(reaction_id="reaction123", user_id="user123", post_id="
     return mock_reaction
 
 
+def create_mock_stats(reaction_counts=None):
+    """Helper to create mocked post counters"""
+    mock_stats = MagicMock()
+    mock_stats.reaction_counts = reaction_counts or {"👍": 1}
+    mock_stats.reaction_count = sum(mock_stats.reaction_counts.values())
+    return mock_stats
+
+
 def test_create_reaction():
     mock_db = MagicMock()
     mock_user = create_mock_user()
@@ -62,7 +71,7 @@ def test_create_reaction():
     mock_post.id = "post123"
     mock_post.user_id = "post_owner_id"
     
-    with patch("src.api.reaction.api.create_reaction", return_value=mock_reaction), \
+    with patch("src.api.reaction.api.create_reaction", return_value=(mock_reaction, create_mock_stats())), \
          patch("src.api.reaction.api.get_post", return_value=mock_post), \
          patch("src.api.reaction.api.create_notification_task") as mock_notify:
         app.dependency_overrides[get_db] = lambda: mock_db
@@ -76,13 +85,36 @@ def test_create_reaction():
         app.dependency_overrides.clear()
         assert response.status_code == 200
         mock_notify.delay.assert_called_once()
+        assert response.json()["reaction_count"] == 1
+        assert response.json()["summary"] == [{"emoji": "👍", "count": 1, "me": True}]
+
+
+def test_toggle_off_reaction_returns_counts():
+    mock_db = MagicMock()
+    mock_user = create_mock_user()
+
+    with patch("src.api.reaction.api.create_reaction", return_value=(None, create_mock_stats({"🔥": 2}))), \
+         patch("src.api.reaction.api.create_notification_task") as mock_notify:
+        app.dependency_overrides[get_db] = lambda: mock_db
+        app.dependency_overrides[get_current_user] = lambda: mock_user
+
+        response = client.post("/api/reactions/", json={"post_id": "post123", "emoji": "👍"})
+
+        app.dependency_overrides.clear()
+        assert response.status_code == 200
+        mock_notify.delay.assert_not_called()
+        assert response.json() == {
+            "message": "Reaction removed",
+            "reaction_count": 2,
+            "summary": [{"emoji": "🔥", "count": 2, "me": False}],
+        }
 
 
 def test_delete_reaction():
     mock_db = MagicMock()
     mock_user = create_mock_user()
     
-    with patch("src.modules.reaction.reaction_methods.delete_reaction", return_value=True):
+    with patch("src.modules.reaction.reaction_methods.delete_reaction", return_value=create_mock_stats()):
         app.dependency_overrides[get_db] = lambda: mock_db
         app.dependency_overrides[get_current_user] = lambda: mock_user
         
@@ -91,3 +123,44 @@ def test_delete_reaction():
         app.dependency_overrides.clear()
         assert response.status_code == 200
         assert "message" in response.json()
+
+
+def test_reactions_summary_for_many_posts():
+    mock_db = MagicMock()
+    mock_user = create_mock_user()
+    summaries = {
+        "post1": {"summary": [{"emoji": "👍", "count": 2, "me": True}], "user_reaction_ids": ["user123_emoji_👍"]},
+        "post2": {"summary": [], "user_reaction_ids": []},
+    }
+
+    with patch("src.api.reaction.api.get_reactions_summaries_for_posts", return_value=summaries) as mock_summaries:
+        app.dependency_overrides[get_read_session] = lambda: mock_db
+        app.dependency_overrides[get_current_user_optional] = lambda: mock_user
+
+        response = client.post("/api/reactions/summary", json={"post_ids": ["post1", "post2"]})
+
+        app.dependency_overrides.clear()
+        assert response.status_code == 200
+        mock_summaries.assert_called_once_with(mock_db, ["post1", "post2"], "user123")
+        assert response.json()["post1"]["summary"][0]["count"] == 2
+
+
+def test_reactions_summary_rejects_too_many_posts():
+    response = client.post("/api/reactions/summary", json={"post_ids": [f"post{i}" for i in range(101)]})
+    assert response.status_code == 422
+
+
+def test_get_reactors_page():
+    mock_db = MagicMock()
+    reactions = [create_mock_reaction(reaction_id=f"reaction{i}") for i in range(2)]
+
+    with patch("src.api.reaction.api.get_reactors", return_value=reactions) as mock_reactors:
+        app.dependency_overrides[get_read_session] = lambda: mock_db
+
+        response = client.get("/api/reactions/post123/users", params={"emoji": "👍", "limit": 2})
+
+        app.dependency_overrides.clear()
+        assert response.status_code == 200
+        mock_reactors.assert_called_once_with(mock_db, "post123", "👍", 2, None)
+        assert len(response.json()) == 2
+        assert response.headers.get("X-Next-Cursor")
@@ -0,0 +1,116 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jwt
+from unittest.mock import MagicMock
+from fastapi.testclient import TestClient
+from src.main import app
+from src.core.settings import settings
+from src.database import routing
+from src.database.engine import engine, get_read_engine, get_session as get_db
+from src.database.models import User
+from src.database.routing import get_read_session, is_pinned_to_primary
+from src.modules.auth.auth_methods import create_user_access_token
+
+client = TestClient(app)
+
+
+def test_reads_use_primary_without_replicas():
+    assert get_read_engine() is engine
+    assert get_read_engine(use_primary=True) is engine
+
+
+def test_write_pins_user_to_primary(monkeypatch):
+    mock_db = MagicMock()
+    mock_member = {"id": "member123", "channel_id": "test-channel-id", "user_id": "writer123"}
+    monkeypatch.setattr("src.api.channel_members.api.add_member", lambda *args, **kwargs: mock_member)
+    app.dependency_overrides[get_db] = lambda: mock_db
+    token = create_user_access_token(User(id="writer123", username="writer", email="writer@example.com"))
+
+    assert not is_pinned_to_primary("user:writer123")
+    response = client.post(
+        "/api/channel-members/",
+        params={"channel_id": "test-channel-id", "user_id": "writer123"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert is_pinned_to_primary("user:writer123")
+
+
+def test_failed_write_does_not_pin_user():
+    token = create_user_access_token(User(id="reader123", username="reader", email="reader@example.com"))
+
+    # Missing query parameters fail validation before anything is written
+    response = client.post("/api/channel-members/", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code >= 400
+    assert not is_pinned_to_primary("user:reader123")
+
+
+def test_read_only_post_does_not_pin_user(monkeypatch):
+    monkeypatch.setattr("src.api.reaction.api.get_reactions_summaries_for_posts", lambda *args: {})
+    app.dependency_overrides[get_read_session] = lambda: MagicMock()
+    token = create_user_access_token(User(id="browser123", username="browser", email="browser@example.com"))
+
+    response = client.post(
+        "/api/reactions/summary",
+        json={"post_ids": ["post123"]},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert not is_pinned_to_primary("user:browser123")
+
+
+class FakeRedis:
+    """Redis stand-in holding the keys pins are shared through"""
+
+    def __init__(self):
+        self.keys = {}
+
+    def set(self, key, value, ex=None):
+        self.keys[key] = (value, ex)
+
+    def exists(self, key):
+        return int(key in self.keys)
+
+
+def test_pins_are_shared_through_redis(monkeypatch):
+    shared = FakeRedis()
+    monkeypatch.setattr(routing, "get_redis_client", lambda: shared)
+
+    routing.pin_to_primary("user:shared123")
+    assert shared.keys["db:primary-pin:user:shared123"] == (
+        1,
+        settings.DB_READ_YOUR_WRITES_SECONDS,
+    )
+
+    # Another process has no local pin but finds the shared one
+    routing._primary_pins.pop("user:shared123")
+    assert is_pinned_to_primary("user:shared123")
+    assert not is_pinned_to_primary("user:other123")
+
+
+def test_token_without_user_id_is_pinned(monkeypatch):
+    mock_db = MagicMock()
+    mock_member = {"id": "member123", "channel_id": "test-channel-id", "user_id": "writer123"}
+    monkeypatch.setattr("src.api.channel_members.api.add_member", lambda *args, **kwargs: mock_member)
+    app.dependency_overrides[get_db] = lambda: mock_db
+    token = jwt.encode({"sub": "service"}, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+    client.post(
+        "/api/channel-members/",
+        params={"channel_id": "test-channel-id", "user_id": "writer123"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    app.dependency_overrides.clear()
+    request = MagicMock()
+    request.headers = {"Authorization": f"Bearer {token}"}
+    caller = routing.get_request_caller(request)
+    assert caller.startswith("token:")
+    assert is_pinned_to_primary(caller)
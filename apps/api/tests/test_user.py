@@ -3,9 +3,11 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from unittest.mock import MagicMock, patch
+import pytest
 from fastapi.testclient import TestClient
 from src.main import app
 from src.database.engine import get_session as get_db
+from src.database.routing import get_read_session
 from src.database.models import Role, User, UserSettings, UserSocial
 from src.api.account.api import get_current_admin
 
@@ -90,7 +92,7 @@ def test_get_all_users():
     mock_db = MagicMock()
     
     with patch("src.modules.user.user_methods.get_all_users", return_value=[]):
-        app.dependency_overrides[get_db] = lambda: mock_db
+        app.dependency_overrides[get_read_session] = lambda: mock_db
         
         response = client.get("/api/users/")
         
@@ -134,4 +136,45 @@ def test_delete_user():
 # Skipping ban_user test due to serialization complexity
 # The ban functionality is tested manually and works correctly
 # def test_ban_user():
-#     pass
\ No newline at end of file
+#     pass
+
+def test_get_all_users_invalid_cursor():
+    mock_db = MagicMock()
+    app.dependency_overrides[get_read_session] = lambda: mock_db
+
+    response = client.get("/api/users/", params={"cursor": "not-a-cursor"})
+
+    app.dependency_overrides.clear()
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+@pytest.mark.parametrize("values", [[5, "user123"], ["2026-01-01T00:00:00", ["user123"]]])
+def test_get_all_users_crafted_cursor(values):
+    from src.core.pagination import encode_cursor
+
+    mock_db = MagicMock()
+    app.dependency_overrides[get_read_session] = lambda: mock_db
+
+    response = client.get("/api/users/", params={"cursor": encode_cursor(*values)})
+
+    app.dependency_overrides.clear()
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_get_all_users_next_cursor_header():
+    from src.core.pagination import decode_cursor
+
+    mock_db = MagicMock()
+    mock_user = create_mock_user()
+
+    with patch("src.api.user.api.get_all_users", return_value=[mock_user]):
+        app.dependency_overrides[get_read_session] = lambda: mock_db
+
+        response = client.get("/api/users/", params={"limit": 1})
+
+        app.dependency_overrides.clear()
+        assert response.status_code == 200
+        cursor = response.headers["X-Next-Cursor"]
+        assert decode_cursor(cursor)[1] == "user123"
@@ -0,0 +1,561 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from src.main import app
+from src.database.engine import get_session as get_db
+from src.api.websocket.connection_manager import manager
+from src.api.websocket.backplane import LocalBackplane, deliver_locally
+from src.modules.realtime import realtime_methods
+
+client = TestClient(app)
+
+
+def create_mock_user(user_id="user123"):
+    """Helper to create a mocked user object"""
+    mock_user = MagicMock()
+    mock_user.id = user_id
+    mock_user.username = "testuser"
+    return mock_user
+
+
+def test_authenticated_connection_receives_own_notifications():
+    app.dependency_overrides[get_db] = lambda: MagicMock()
+
+    with patch("src.api.websocket.api.authenticate_token", return_value=create_mock_user()):
+        with client.websocket_connect("/api/ws?user_id=spoofed&token=valid") as websocket:
+            connected = websocket.receive_json()
+            assert connected["data"]["user_id"] == "user123"
+            assert any(
+                metadata["user_id"] == "user123"
+                for metadata in manager.connection_metadata.values()
+            )
+            assert manager.user_subscriptions.get("user123")
+
+    app.dependency_overrides.clear()
+
+
+def test_invalid_token_is_rejected():
+    from fastapi import HTTPException
+
+    app.dependency_overrides[get_db] = lambda: MagicMock()
+
+    with patch("src.api.websocket.api.authenticate_token", side_effect=HTTPException(status_code=401)):
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect("/api/ws?user_id=user123&token=bad") as websocket:
+                websocket.receive_json()
+
+    app.dependency_overrides.clear()
+
+
+def test_cannot_subscribe_to_another_users_topic():
+    app.dependency_overrides[get_db] = lambda: MagicMock()
+
+    with client.websocket_connect("/api/ws?user_id=user123") as websocket:
+        websocket.receive_json()
+        websocket.send_json({
+            "type": "subscribe",
+            "data": {"subscription_type": "user", "target_id": "victim123"},
+        })
+        response = websocket.receive_json()
+        assert response["type"] == "error"
+        assert "victim123" not in manager.user_subscriptions
+
+    app.dependency_overrides.clear()
+
+
+def test_relay_routes_published_messages_to_topics():
+    message = {"type": "notification", "data": {}}
+
+    with patch.object(manager, "broadcast_to_user_subscribers", new_callable=AsyncMock) as to_user, \
+         patch.object(manager, "broadcast_to_event_subscribers", new_callable=AsyncMock) as to_event:
+        asyncio.run(deliver_locally(realtime_methods.user_channel("user123"), message))
+        asyncio.run(deliver_locally(realtime_methods.event_channel("post123"), message))
+
+    to_user.assert_awaited_once_with("user123", message)
+    to_event.assert_awaited_once_with("post123", message)
+
+
+def test_comment_created_is_published_to_parent_and_root():
+    reply = MagicMock(id="reply123", parent_id="parent123", root_id="root123", user_id="user123")
+
+    with patch.object(realtime_methods, "publish", return_value=2) as publish:
+        realtime_methods.publish_comment_created(reply)
+
+    channels = [channel for channel, _ in publish.call_args.args[0]]
+    assert channels == [
+        realtime_methods.event_channel("parent123"),
+        realtime_methods.event_channel("root123"),
+    ]
+
+
+def test_local_backplane_delivers_published_messages_in_batches():
+    received = []
+
+    async def deliver(channel, message):
+        received.append((channel, message))
+
+    async def run():
+        backplane = LocalBackplane(deliver=deliver, batch_size=2, batch_delay=0)
+        flushed = []
+        original_flush = backplane._flush
+
+        async def record_flush(batch):
+            flushed.append(len(batch))
+            await original_flush(batch)
+
+        backplane._flush = record_flush
+        await backplane.start()
+        backplane.publish([("realtime:event:a", {"n": 1}), ("realtime:event:b", {"n": 2}), ("realtime:event:c", {"n": 3})])
+        for _ in range(20):
+            await asyncio.sleep(0)
+        await backplane.stop()
+        return flushed
+
+    flushed = asyncio.run(run())
+    assert [message["n"] for _, message in received] == [1, 2, 3]
+    assert flushed == [2, 1]
+
+
+def test_backplane_drops_messages_when_queue_is_full():
+    async def deliver(channel, message):
+        pass
+
+    async def run():
+        backplane = LocalBackplane(deliver=deliver, max_queue_size=2, batch_delay=0)
+        await backplane.start()
+        backplane.publish([("realtime:event:a", {}) for _ in range(5)])
+        await asyncio.sleep(0)
+        stats = backplane.stats()
+        await backplane.stop()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats["dropped_outbound"] == 3
+
+
+def test_redis_backplane_skips_malformed_messages():
+    from src.api.websocket import backplane as backplane_module
+
+    received = []
+
+    async def deliver(channel, message):
+        received.append((channel, message))
+
+    class FakePubSub:
+        def __init__(self):
+            self.items = [
+                {"channel": b"realtime:event:a", "data": b"not json"},
+                {"channel": b"realtime:event:a", "data": b'{"n": 1}'},
+            ]
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *args):
+            pass
+
+        async def subscribe(self, *channels):
+            pass
+
+        async def unsubscribe(self, *channels):
+            pass
+
+        async def get_message(self, ignore_subscribe_messages, timeout):
+            if self.items:
+                return self.items.pop(0)
+            await asyncio.sleep(timeout)
+
+    client = MagicMock()
+    client.pubsub.return_value = FakePubSub()
+    client.aclose = AsyncMock()
+
+    async def run():
+        backplane = backplane_module.RedisBackplane("redis://unused", batch_delay=0, deliver=deliver)
+        backplane.subscribe("realtime:event:a")
+        await backplane.start()
+        for _ in range(20):
+            await asyncio.sleep(0)
+        subscriber_alive = not backplane._tasks[-1].done()
+        await backplane.stop()
+        return subscriber_alive
+
+    with patch.object(backplane_module.aioredis.Redis, "from_url", return_value=client):
+        assert asyncio.run(run())
+    assert received == [("realtime:event:a", {"n": 1})]
+
+
+def test_manager_subscribes_backplane_to_topics_of_local_sockets():
+    backplane = LocalBackplane()
+    manager.backplane = backplane
+    try:
+        manager.subscribe_to_event("conn1", "post123")
+        manager.subscribe_to_event("conn2", "post123")
+        assert backplane.channels == {realtime_methods.event_channel("post123")}
+
+        manager.unsubscribe_from_event("conn1", "post123")
+        assert backplane.channels == {realtime_methods.event_channel("post123")}
+
+        manager.disconnect("conn2")
+        assert backplane.channels == set()
+    finally:
+        manager.backplane = None
+
+
+class FakeWebSocket:
+    """WebSocket stand-in whose sends can be made to stall"""
+
+    def __init__(self, send_delay=0):
+        self.send_delay = send_delay
+        self.sent = []
+        self.closed_with = None
+        self.client_state = MagicMock()
+        self.client_state.name = "CONNECTED"
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        await asyncio.sleep(self.send_delay)
+        self.sent.append(message)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+def test_manager_indexes_connections_by_user_and_topic():
+    from src.api.websocket.connection_manager import ConnectionManager
+
+    async def run():
+        local_manager = ConnectionManager()
+        await local_manager.connect(FakeWebSocket(), "conn1", "user123")
+        await local_manager.connect(FakeWebSocket(), "conn2", "user123")
+        local_manager.subscribe_to_user("conn1", "user123")
+        local_manager.subscribe_to_event("conn1", "post123")
+        local_manager.subscribe_to_event("conn2", "post123")
+
+        assert sorted(local_manager.get_user_connections("user123")) == ["conn1", "conn2"]
+        assert local_manager.connection_event_subscriptions["conn1"] == {"post123"}
+
+        local_manager.disconnect("conn1")
+        assert local_manager.get_user_connections("user123") == ["conn2"]
+        assert "user123" not in local_manager.user_subscriptions
+        assert local_manager.event_subscriptions == {"post123": {"conn2"}}
+        assert "conn1" not in local_manager.connection_event_subscriptions
+
+        local_manager.disconnect("conn2")
+        assert local_manager.get_active_users() == set()
+        assert local_manager.event_subscriptions == {}
+        assert local_manager.writer_tasks == {}
+
+    asyncio.run(run())
+
+
+def test_slow_subscriber_does_not_delay_others():
+    from src.api.websocket.connection_manager import ConnectionManager
+
+    async def run():
+        local_manager = ConnectionManager()
+        fast, slow = FakeWebSocket(), FakeWebSocket(send_delay=10)
+        await local_manager.connect(fast, "fast", "user1")
+        await local_manager.connect(slow, "slow", "user2")
+        local_manager.subscribe_to_event("fast", "post123")
+        local_manager.subscribe_to_event("slow", "post123")
+
+        await asyncio.wait_for(
+            local_manager.broadcast_to_event_subscribers("post123", {"n": 1}), 0.1
+        )
+        await asyncio.sleep(0.01)
+        assert fast.sent == [{"n": 1}]
+        assert slow.sent == []
+        local_manager.disconnect("fast")
+        local_manager.disconnect("slow")
+
+    asyncio.run(run())
+
+
+def test_timed_out_send_closes_socket():
+    from src.api.websocket.connection_manager import ConnectionManager
+
+    async def run():
+        local_manager = ConnectionManager()
+        stalled = FakeWebSocket(send_delay=10)
+        await local_manager.connect(stalled, "stalled", "user1")
+        local_manager.subscribe_to_event("stalled", "post123")
+
+        await local_manager.broadcast_to_event_subscribers("post123", {"n": 1})
+        await asyncio.sleep(0.05)
+        return local_manager, stalled
+
+    with patch("src.api.websocket.connection_manager.settings") as mock_settings:
+        mock_settings.WEBSOCKET_SEND_QUEUE_MAX_SIZE = 10
+        mock_settings.WEBSOCKET_SEND_TIMEOUT_SECONDS = 0.01
+        local_manager, stalled = asyncio.run(run())
+
+    assert "stalled" not in local_manager.active_connections
+    assert stalled.closed_with == 1011
+
+
+@pytest.mark.parametrize("policy", ["close", "drop"])
+def test_overflowing_subscriber_is_closed_or_dropped(policy):
+    from src.api.websocket.connection_manager import ConnectionManager
+
+    async def run():
+        local_manager = ConnectionManager()
+        slow = FakeWebSocket(send_delay=10)
+        await local_manager.connect(slow, "slow", "user1")
+        local_manager.subscribe_to_event("slow", "post123")
+
+        for n in range(5):
+            await local_manager.broadcast_to_event_subscribers("post123", {"n": n})
+        await asyncio.sleep(0)
+        return local_manager, slow
+
+    with patch("src.api.websocket.connection_manager.settings") as mock_settings:
+        mock_settings.WEBSOCKET_SEND_QUEUE_MAX_SIZE = 2
+        mock_settings.WEBSOCKET_SEND_TIMEOUT_SECONDS = 30
+        mock_settings.WEBSOCKET_SLOW_CONSUMER_POLICY = policy
+        local_manager, slow = asyncio.run(run())
+
+    if policy == "close":
+        assert local_manager.evicted_connections == 1
+        assert "slow" not in local_manager.active_connections
+        assert slow.closed_with == 1013
+    else:
+        assert local_manager.dropped_messages > 0
+        assert "slow" in local_manager.active_connections
+
+
+def test_presence_writer_batches_connects_and_disconnects(fake_session):
+    from datetime import datetime, timedelta, timezone
+    from src.api.websocket import presence_writer
+
+    calls = fake_session.calls
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    async def run():
+        writer = presence_writer.PresenceWriter(flush_interval=60, max_events=100)
+        writer.record_connect("conn1", "user1", start)
+        writer.record_connect("conn2", "user2", start)
+        writer.record_disconnect("conn2", start + timedelta(seconds=5), 5.0)
+        writer.record_disconnect("conn0", start + timedelta(seconds=7), 7.0)
+        await writer.flush()
+        return writer
+
+    with patch.object(presence_writer, "AsyncSession", fake_session):
+        writer = asyncio.run(run())
+
+    assert [name for name, _ in calls] == ["insert_presences", "close_presences", "commit"]
+    inserted = {row["connection_id"]: row for row in calls[0][1]}
+    assert "disconnected_at" not in inserted["conn1"]
+    assert inserted["conn2"]["duration_seconds"] == 5.0
+    assert [row["connection_id"] for row in calls[1][1]] == ["conn0"]
+    assert writer.stats() == {"pending": 0, "flushed": 3, "failed": 0, "dropped": 0}
+
+
+def test_presence_writer_requeues_failed_batch(fake_session):
+    from datetime import datetime, timedelta, timezone
+    from src.api.websocket import presence_writer
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    writer = presence_writer.PresenceWriter(
+        flush_interval=60, max_events=100, max_pending=3
+    )
+
+    class FailingSession(fake_session):
+        async def run_sync(self, fn, rows):
+            # Changes recorded while the batch is being written
+            writer.record_disconnect("conn1", start + timedelta(seconds=5), 5.0)
+            writer.record_connect("conn2", "user2", start)
+            writer.record_connect("conn3", "user3", start)
+            raise ConnectionError("database is down")
+
+    async def run():
+        writer.record_connect("conn1", "user1", start)
+        writer.record_disconnect("conn0", start, 1.0)
+        with patch.object(presence_writer, "AsyncSession", FailingSession):
+            return await writer.flush()
+
+    assert asyncio.run(run()) is False
+    # The close of conn0 is dropped to stay within max_pending
+    assert list(writer._opened) == ["conn1", "conn2", "conn3"]
+    assert writer._opened["conn1"]["duration_seconds"] == 5.0
+    assert writer._closed == {}
+    assert writer.stats() == {"pending": 3, "flushed": 0, "failed": 2, "dropped": 1}
+
+
+def test_presence_writer_flushes_early_when_full():
+    from datetime import datetime, timezone
+    from src.api.websocket import presence_writer
+
+    async def run():
+        writer = presence_writer.PresenceWriter(flush_interval=60, max_events=2)
+        with patch.object(writer, "flush", new_callable=AsyncMock) as flush:
+            await writer.start()
+            writer.record_connect("conn1", "user1", datetime.now(timezone.utc))
+            writer.record_connect("conn2", "user2", datetime.now(timezone.utc))
+            await asyncio.sleep(0.01)
+            writer._task.cancel()
+            return flush.await_count
+
+    assert asyncio.run(run()) == 1
+
+
+def test_manager_orders_connections_by_last_heartbeat():
+    from datetime import datetime, timedelta, timezone
+    from src.api.websocket.connection_manager import ConnectionManager
+
+    async def run():
+        local_manager = ConnectionManager()
+        await local_manager.connect(FakeWebSocket(), "conn1", "user1")
+        await local_manager.connect(FakeWebSocket(), "conn2", "user2")
+        local_manager.update_heartbeat("conn1")
+
+        cutoff = datetime.now(timezone.utc) + timedelta(seconds=1)
+        assert list(local_manager.last_seen) == ["conn2", "conn1"]
+        assert local_manager.get_stale_connections(cutoff) == ["conn2", "conn1"]
+        assert local_manager.get_stale_connections(cutoff - timedelta(minutes=1)) == []
+
+        local_manager.disconnect("conn1")
+        local_manager.disconnect("conn2")
+        assert not local_manager.last_seen
+
+    asyncio.run(run())
+
+
+def test_presence_monitor_sweep_closes_stale_connections(fake_session):
+    from datetime import datetime, timedelta, timezone
+    from src.api.websocket import presence_monitor
+    from src.api.websocket.connection_manager import ConnectionManager
+
+    calls = fake_session.calls
+    local_manager = ConnectionManager()
+    stale, live = FakeWebSocket(), FakeWebSocket()
+
+    async def run():
+        await local_manager.connect(stale, "stale", "user1")
+        await local_manager.connect(live, "live", "user2")
+        local_manager.last_seen["stale"] = datetime.now(timezone.utc) - timedelta(
+            minutes=5
+        )
+        local_manager.last_seen.move_to_end("stale", last=False)
+
+        monitor = presence_monitor.PresenceMonitor(ttl=90, redis_url="")
+        await monitor.sweep()
+        await asyncio.sleep(0)
+        sessions = await monitor.online_sessions()
+        local_manager.disconnect("live")
+        return monitor, sessions
+
+    with patch.object(presence_monitor, "manager", local_manager), patch.object(
+        presence_monitor, "AsyncSession", fake_session
+    ):
+        monitor, sessions = asyncio.run(run())
+
+    assert stale.closed_with == 1001
+    assert monitor.stats()["expired_connections"] == 1
+    assert [session["connection_id"] for session in sessions] == ["live"]
+    assert [name for name, _ in calls] == [
+        "touch_presences",
+        "close_stale_presences",
+        "commit",
+    ]
+    assert calls[0][1] == ["live"]
+
+
+def test_active_now_lists_live_sessions_from_memory():
+    mock_user = create_mock_user("user1")
+    mock_user.name = "Test User"
+    sessions = [
+        {
+            "user_id": "user1",
+            "connection_id": "conn1",
+            "connected_at": "2026-01-01T00:00:00+00:00",
+            "last_seen": "2026-01-01T00:01:00+00:00",
+        }
+    ]
+    app.dependency_overrides[get_db] = lambda: MagicMock()
+
+    with patch(
+        "src.api.presence.api.get_online_sessions", new_callable=AsyncMock
+    ) as get_online_sessions, patch(
+        "src.api.presence.api.get_users_by_ids", return_value=[mock_user]
+    ):
+        get_online_sessions.return_value = sessions
+        response = client.get("/api/presence/active-now")
+
+    app.dependency_overrides.clear()
+    assert response.status_code == 200
+    data = response.json()
+    assert data["active_count"] == 1
+    assert data["active_users"][0]["username"] == "testuser"
+    assert data["active_users"][0]["connection_id"] == "conn1"
+
+
+def test_presence_timeseries_reads_rollups(mock_async_session):
+    from src.database.routing import get_async_read_session
+
+    series = [
+        {
+            "timestamp": "2026-01-05T00:00:00+00:00",
+            "session_count": 4,
+            "unique_users": 2,
+            "total_duration_seconds": 100.0,
+            "average_duration_seconds": 25.0,
+        }
+    ]
+    app.dependency_overrides[get_async_read_session] = lambda: mock_async_session()
+    with patch(
+        "src.api.presence.api.get_presence_series", return_value=series
+    ) as get_presence_series:
+        response = client.get(
+            "/api/presence/timeseries",
+            params={
+                "start_date": "2026-01-01T00:00:00Z",
+                "end_date": "2026-01-31T00:00:00",
+                "interval": "week",
+            },
+        )
+    app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json()["data"] == series
+    _, interval, start, end = get_presence_series.call_args.args
+    assert interval == "week"
+    assert start.isoformat() == "2026-01-01T00:00:00+00:00"
+    assert end.isoformat() == "2026-01-31T00:00:00+00:00"
+
+
+def test_compact_presence_task_rolls_up_before_pruning():
+    from datetime import datetime, timezone
+    from src.modules.presence import presence_tasks
+
+    calls = []
+    watermark = datetime(2026, 1, 2, tzinfo=timezone.utc)
+    horizon = datetime(2025, 12, 3, tzinfo=timezone.utc)
+
+    with patch.object(presence_tasks, "Session"), patch.object(
+        presence_tasks, "get_rollup_watermark", return_value=watermark
+    ), patch.object(
+        presence_tasks, "retention_horizon", return_value=horizon
+    ), patch.object(
+        presence_tasks,
+        "rollup_presences",
+        side_effect=lambda db, since, until: calls.append(("rollup", since, until)) or 3,
+    ), patch.object(
+        presence_tasks,
+        "prune_presences",
+        side_effect=lambda db, until: calls.append(("prune", until)) or 7,
+    ):
+        result = presence_tasks.compact_presence_task()
+
+    assert result["success"] is True
+    assert result["rolled_up_hours"] == 3 and result["pruned"] == 7
+    assert calls[0][0] == "rollup" and calls[0][1] < watermark
+    assert calls[0][2] == horizon
+    assert calls[1] == ("prune", horizon)
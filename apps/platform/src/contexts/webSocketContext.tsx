@@ -1,4 +1,5 @@
-import { createContext, type ReactNode, useContext } from "react";
+import { useQueryClient } from "@tanstack/react-query";
+import { createContext, type ReactNode, useCallback, useContext } from "react";
 import { useAccount } from "../features/auth/hooks/useAccount";
 import { useWebSocket } from "../utils/useWebSocket";
 
@@ -14,6 +15,17 @@ const WebSocketContext = createContext<WebSocketContextType | null>(null);
 
 export const WebSocketProvider = ({ children }: { children: ReactNode }) => {
 	const { account } = useAccount();
+	const queryClient = useQueryClient();
+
+	// Refresh notifications when the server pushes one instead of polling
+	const handleMessage = useCallback(
+		(message: { type: string }) => {
+			if (message.type === "notification") {
+				queryClient.invalidateQueries({ queryKey: ["notifications"] });
+			}
+		},
+		[queryClient],
+	);
 
 	// Use account.id directly - no intermediate state needed
 	// WebSocket will only connect when user is logged in (account.id exists)
@@ -25,7 +37,7 @@ export const WebSocketProvider = ({ children }: { children: ReactNode }) => {
 		sendMessage,
 	} = useWebSocket({
 		userId: account?.id || "",
-		onMessage: () => {},
+		onMessage: handleMessage,
 		onConnect: () => {
 			console.info("[WebSocket] Connected - User presence tracking active");
 		},
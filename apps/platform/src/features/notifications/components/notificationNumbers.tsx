@@ -1,19 +1,13 @@
-import { useNotifications } from "../hooks/useNotifications";
+import { useUnreadNotificationCount } from "../hooks/useNotifications";
 
 export const NotificationNumbers = () => {
-	const { notifications } = useNotifications();
+	const { unreadCount } = useUnreadNotificationCount();
 
-	if (
-		notifications.filter((notification) => notification.is_read === false)
-			.length === 0
-	) {
+	if (unreadCount === 0) {
 		return null;
 	}
 
-	if (
-		notifications.filter((notification) => notification.is_read === false)
-			.length > 99
-	) {
+	if (unreadCount > 99) {
 		return (
 			<div className="ml-1 flex size-5 items-center justify-center rounded-md bg-primary font-medium text-[9px]">
 				99+
@@ -23,10 +17,7 @@ export const NotificationNumbers = () => {
 
 	return (
 		<div className="ml-1 flex size-5 items-center justify-center rounded-md bg-primary font-medium text-[9px]">
-			{
-				notifications.filter((notification) => notification.is_read === false)
-					.length
-			}
+			{unreadCount}
 		</div>
 	);
 };
@@ -1,6 +1,7 @@
 import {
 	useInfiniteQuery,
 	useMutation,
+	useQuery,
 	useQueryClient,
 } from "@tanstack/react-query";
 import { HTTPError } from "ky";
@@ -54,6 +55,27 @@ export const useNotifications = (limit: number = 20) => {
 	};
 };
 
+export const useUnreadNotificationCount = () => {
+	const { data, isLoading } = useQuery({
+		enabled: localStorage.getItem("token") !== null,
+		queryKey: ["notifications", "unread-count"],
+		queryFn: async () => {
+			return await api.notifications.getUnreadCount();
+		},
+		retry: (failureCount, error) => {
+			if (error instanceof HTTPError && error.response.status === 401) {
+				return false;
+			}
+			return failureCount < 3;
+		},
+	});
+
+	return {
+		unreadCount: data?.unread_count ?? 0,
+		isUnreadCountLoading: isLoading,
+	};
+};
+
 export const useMarkNotificationAsRead = () => {
 	const queryClient = useQueryClient();
 
@@ -59,7 +59,12 @@ export const useWebSocket = ({
 		const apiUrl = import.meta.env.VITE_API_URL || "http://localhost:8000/api";
 		const wsProtocol = apiUrl.startsWith("https") ? "wss" : "ws";
 		const wsUrl = apiUrl.replace(/^https?/, wsProtocol);
-		return `${wsUrl}/ws?user_id=${userIdRef.current}`;
+		const params = new URLSearchParams({ user_id: userIdRef.current });
+		const token = localStorage.getItem("token");
+		if (token) {
+			params.set("token", token);
+		}
+		return `${wsUrl}/ws?${params.toString()}`;
 	}, []);
 
 	const startHeartbeat = useCallback(() => {
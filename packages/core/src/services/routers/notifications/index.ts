@@ -1,5 +1,9 @@
 import { BaseRouter } from "../../../utils/baseRouter";
-import type { Notification } from "../../types";
+import type {
+	MarkAllReadResponse,
+	Notification,
+	UnreadCountResponse,
+} from "../../types";
 
 export class NotificationsRouter extends BaseRouter {
 	async getAll(skip: number = 0, limit: number = 100): Promise<Notification[]> {
@@ -17,4 +21,12 @@ export class NotificationsRouter extends BaseRouter {
 			`notifications/${notificationId}/read`,
 		);
 	}
+
+	async getUnreadCount(): Promise<UnreadCountResponse> {
+		return this.client.get<UnreadCountResponse>("notifications/unread-count");
+	}
+
+	async markAllAsRead(): Promise<MarkAllReadResponse> {
+		return this.client.post<MarkAllReadResponse>("notifications/read-all");
+	}
 }
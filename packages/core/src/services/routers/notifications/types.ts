@@ -24,3 +24,12 @@ export interface Notification {
 	created_at: string;
 	updated_at: string;
 }
+
+export interface UnreadCountResponse {
+	unread_count: number;
+}
+
+export interface MarkAllReadResponse {
+	marked_count: number;
+	unread_count: number;
+}